@@ -1 +1,3 @@
-# resonance_sandbox package
\ No newline at end of file
+# resonance_sandbox package
+
+__version__ = "0.2.0"
@@ -0,0 +1,200 @@
+# resonance_sandbox/cache.py
+"""
+Content-addressed on-disk cache for deterministic CLI and script results.
+
+A result is stored under the SHA-256 of everything that determines it: the
+command and its arguments, the full config, the seed, the package version
+and a digest of the operator weights. Entries are written atomically and
+the cache is kept under `max_bytes` by evicting the least recently used
+entries (access time is tracked through the file mtime).
+
+Only seeded runs are cacheable; with `seed=None` the results are random and
+`ResultCache.key` returns None.
+"""
+
+import io
+import os
+import sys
+import json
+import hashlib
+import zipfile
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from . import __version__
+from .checkpoint import atomic_write_bytes
+from .operator import ResonanceOperator
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "resonance")
+
+
+def operator_digest(op: ResonanceOperator) -> str:
+    """SHA-256 of an operator's kind, shape, damping and weights."""
+    h = hashlib.sha256()
+    h.update(json.dumps([op.kind, op.flux_dim, op.manifold_size, op.damping]).encode("utf-8"))
+    if op.kind == "dense":
+        h.update(np.ascontiguousarray(op.W, dtype=np.float64).tobytes())
+    else:
+        h.update(op.to_json().encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of byte blobs in `directory`.
+
+    Args:
+        directory: Cache directory (created on first write).
+        max_bytes: Total size above which the oldest entries are evicted.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = 256 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        command: str,
+        config: Optional[Dict[str, Any]],
+        seed: Optional[int],
+        operator: Optional[ResonanceOperator] = None,
+        **args: Any
+    ) -> Optional[str]:
+        """Content key of a run, or None if it is not reproducible (no seed)."""
+        if seed is None:
+            return None
+        canon = json.dumps({
+            "command": command,
+            "args": args,
+            "config": config,
+            "seed": seed,
+            "version": __version__,
+            "operator": operator_digest(operator) if operator is not None else None,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, key: Optional[str]) -> Optional[bytes]:
+        """Return the cached bytes for `key` (marking them recently used), or None."""
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: Optional[str], data: bytes) -> None:
+        """Atomically store `data` under `key`, then evict down to `max_bytes`."""
+        if key is None:
+            return
+        atomic_write_bytes(self._path(key), data)
+        self.evict()
+
+    def get_json(self, key: Optional[str]) -> Any:
+        data = self.get(key)
+        return None if data is None else json.loads(data.decode("utf-8"))
+
+    def put_json(self, key: Optional[str], value: Any) -> None:
+        self.put(key, json.dumps(value).encode("utf-8"))
+
+    def get_files(self, key: Optional[str]) -> Optional[Dict[str, bytes]]:
+        """Return a bundle stored with `put_files` as {name: bytes}, or None."""
+        data = self.get(key)
+        if data is None:
+            return None
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            return {name: zf.read(name) for name in zf.namelist()}
+
+    def put_files(self, key: Optional[str], files: Dict[str, bytes]) -> None:
+        """Store several named blobs as one (uncompressed zip) entry."""
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+            for name, data in files.items():
+                zf.writestr(name, data)
+        self.put(key, buf.getvalue())
+
+    def run(self, key: Optional[str], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Replay the cached stdout of `fn(*args, **kwargs)`, or run it, echo
+        its output and cache that output. Uncacheable keys just run `fn`.
+        """
+        if key is None:
+            fn(*args, **kwargs)
+            return
+        cached = self.get(key)
+        if cached is not None:
+            sys.stdout.write(cached.decode("utf-8"))
+            return
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            fn(*args, **kwargs)
+        out = buf.getvalue()
+        sys.stdout.write(out)
+        self.put(key, out.encode("utf-8"))
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for sub in os.scandir(self.directory):
+            if sub.is_dir() and len(sub.name) == 2:
+                for entry in os.scandir(sub.path):
+                    if entry.is_file() and not entry.name.startswith(".tmp-"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under `max_bytes`; returns the count."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def info(self) -> Dict[str, Any]:
+        """Entry count and total bytes currently in the cache."""
+        entries = self._entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for _, _, path in self._entries():
+            os.remove(path)
+
+
+def cache_from_config(cfg: Dict[str, Any], enabled: Optional[bool] = None) -> Optional[ResultCache]:
+    """
+    Build the cache described by the `cache:` config section, or None when
+    caching is off. `enabled` (from --cache/--no-cache) overrides the config.
+    """
+    section = cfg.get("cache") or {}
+    if enabled is None:
+        enabled = bool(section.get("enabled", False))
+    if not enabled:
+        return None
+    return ResultCache(
+        section.get("dir", DEFAULT_CACHE_DIR),
+        int(section.get("max_mb", 256)) * 2**20,
+    )
@@ -0,0 +1,107 @@
+# resonance_sandbox/checkpoint.py
+
+import io
+import os
+import json
+import tempfile
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_META_KEY = "__meta__"
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Write `data` to `path` atomically.
+
+    The bytes go to a temporary file in the same directory, are fsync'ed and
+    then renamed over the target, so readers see either the old or the new
+    file and never a partial one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def save_checkpoint(
+    path: str,
+    arrays: Dict[str, np.ndarray],
+    meta: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Atomically save named arrays plus a JSON-serializable metadata dict.
+
+    Arrays are stored uncompressed in NumPy's binary ``.npz`` format, so
+    floating-point state round-trips bit-for-bit.
+    """
+    meta_bytes = json.dumps(meta or {}).encode("utf-8")
+    payload = dict(arrays)
+    payload[_META_KEY] = np.frombuffer(meta_bytes, dtype=np.uint8)
+
+    buf = io.BytesIO()
+    np.savez(buf, **payload)
+    atomic_write_bytes(path, buf.getvalue())
+
+
+def load_checkpoint(path: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Load a checkpoint written by `save_checkpoint`.
+
+    Returns:
+        (arrays, meta) tuple.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {k: data[k] for k in data.files if k != _META_KEY}
+        meta = json.loads(data[_META_KEY].tobytes().decode("utf-8"))
+    return arrays, meta
+
+
+def append_history(path: str, record: Dict[str, Any]) -> None:
+    """Append one record to a JSON-lines history file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def iter_history(path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily iterate over the records of a JSON-lines history file."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_history(path: str) -> List[Dict[str, Any]]:
+    """Load every record of a JSON-lines history file."""
+    return list(iter_history(path))
+
+
+def truncate_history(path: str, count: int) -> None:
+    """
+    Keep only the first `count` records of a history file.
+
+    Used on resume to drop generations that were logged after the last
+    checkpoint was written.
+    """
+    if not os.path.exists(path):
+        return
+    kept: List[bytes] = []
+    with open(path, "rb") as f:
+        for line in f:
+            if len(kept) >= count:
+                break
+            if line.endswith(b"\n"):
+                kept.append(line)
+    atomic_write_bytes(path, b"".join(kept))
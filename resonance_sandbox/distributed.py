@@ -0,0 +1,523 @@
+# resonance_sandbox/distributed.py
+
+import json
+import time
+import base64
+import socket
+import struct
+import logging
+import threading
+import socketserver
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import operator_digest
+from .operator import ResonanceOperator
+from .meta_learning import _dense_start, evaluate_candidates, perturbed_candidate
+from .sweep import ResultsTable, expand_points, pending_points, _run_chunk
+
+logger = logging.getLogger(__name__)
+
+# Wire format: 8-byte big-endian length prefix + UTF-8 JSON body.
+# JSON (never pickle) keeps workers from executing anything the coordinator
+# sends; still, only run the protocol on trusted networks.
+_LENGTH = struct.Struct("!Q")
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    """Send one length-prefixed JSON message."""
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Receive one message, or None if the peer closed the connection."""
+    header = _recv_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    body = _recv_exact(sock, _LENGTH.unpack(header)[0])
+    return None if body is None else json.loads(body.decode("utf-8"))
+
+
+def encode_array(array: np.ndarray) -> Dict[str, Any]:
+    """Pack a float64 array as {"shape", "data": base64 bytes} for the wire."""
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    return {"shape": list(array.shape),
+            "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def decode_array(packed: Dict[str, Any]) -> np.ndarray:
+    """Inverse of `encode_array`."""
+    data = base64.b64decode(packed["data"])
+    return np.frombuffer(data, dtype=np.float64).reshape(packed["shape"]).copy()
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split 'host:port' into (host, port)."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+# ---------------------------------------------------------------------------
+# Coordinator
+# ---------------------------------------------------------------------------
+
+class UnitFailedError(RuntimeError):
+    """A work unit failed on every attempt (see Coordinator.max_attempts)."""
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        coord: Coordinator = self.server.coordinator  # type: ignore[attr-defined]
+        worker = None
+        try:
+            while True:
+                message = recv_message(self.request)
+                if message is None:
+                    break
+                if message["type"] == "hello":
+                    worker = message.get("worker") or "%s:%d" % self.client_address
+                    reply = {"type": "welcome", "heartbeat": coord.heartbeat_interval}
+                else:
+                    reply = coord._handle(worker, message)
+                send_message(self.request, reply)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if worker is not None:
+                coord._worker_lost(worker)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator:
+    """
+    Work-queue coordinator serving units to remote workers over TCP.
+
+    Units are JSON payloads handed out one at a time on request. A handed-out
+    unit is leased to its worker; the worker's heartbeats extend the lease.
+    Units whose lease expires, or whose worker disconnects, go back on the
+    queue and are re-dispatched. The first result for a unit wins.
+
+    A unit that raises on a worker comes back as an error and is retried;
+    after `max_attempts` dispatches (errors, expired leases or lost workers)
+    it is failed and `as_completed`/`gather` raise UnitFailedError instead
+    of waiting for it forever.
+
+    Data that many units read (e.g. the base weights of a search) is
+    registered once with `share(key, array)`; units carry only the key and
+    workers fetch and cache the array the first time they need it.
+
+    Usage:
+        coord = Coordinator(port=5555).start()
+        ids = coord.submit(payloads)
+        for unit_id, result in coord.as_completed(ids): ...
+        coord.shutdown()
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        lease_timeout: float = 30.0,
+        heartbeat_interval: float = 5.0,
+        max_attempts: int = 3
+    ):
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.max_attempts = max_attempts
+        self._server = _Server((host, port), _Handler)
+        self._server.coordinator = self  # type: ignore[attr-defined]
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._pending: deque = deque()
+        self._leases: Dict[int, Tuple[str, float]] = {}
+        self._results: Dict[int, Any] = {}
+        self._attempts: Dict[int, int] = {}
+        self._failed: Dict[int, str] = {}
+        self._done: set = set()
+        self._shared: Dict[str, Dict[str, Any]] = {}
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self.redispatched = 0
+        self.fetches = 0
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> 'Coordinator':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Coordinator listening on %s:%d", *self.address)
+        return self
+
+    def submit(self, payloads: List[Dict[str, Any]]) -> List[int]:
+        """Queue payloads as work units and return their ids."""
+        with self._cond:
+            ids = []
+            for payload in payloads:
+                unit_id = self._next_id
+                self._next_id += 1
+                self._payloads[unit_id] = payload
+                self._pending.append(unit_id)
+                ids.append(unit_id)
+            self._cond.notify_all()
+        return ids
+
+    def share(self, key: str, array: np.ndarray) -> str:
+        """Make `array` fetchable by workers under `key`; returns the key."""
+        with self._cond:
+            self._shared[key] = encode_array(array)
+        return key
+
+    def unshare(self, key: str) -> None:
+        """Forget a shared array once no pending unit refers to it."""
+        with self._cond:
+            self._shared.pop(key, None)
+
+    def _retry(self, unit_id: int, reason: str) -> None:
+        """Re-queue a unit that did not produce a result, or fail it for good."""
+        self._leases.pop(unit_id, None)
+        if unit_id in self._done:
+            return
+        if self._attempts.get(unit_id, 0) >= self.max_attempts:
+            logger.error("Unit %d failed after %d attempts: %s", unit_id,
+                         self._attempts[unit_id], reason)
+            self._done.add(unit_id)
+            self._failed[unit_id] = reason
+            self._payloads.pop(unit_id, None)
+        else:
+            logger.warning("Unit %d: %s; re-dispatching", unit_id, reason)
+            self._pending.appendleft(unit_id)
+            self.redispatched += 1
+        self._cond.notify_all()
+
+    def _requeue_expired(self) -> None:
+        now = time.monotonic()
+        for unit_id, (worker, deadline) in list(self._leases.items()):
+            if deadline < now:
+                self._retry(unit_id, f"lease expired on {worker}")
+
+    def _worker_lost(self, worker: str) -> None:
+        with self._cond:
+            for unit_id, (owner, _) in list(self._leases.items()):
+                if owner == worker:
+                    self._retry(unit_id, f"worker {worker} lost")
+            self._cond.notify_all()
+
+    def _handle(self, worker: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        kind = message["type"]
+        with self._cond:
+            if kind == "request":
+                self._requeue_expired()
+                while self._pending:
+                    unit_id = self._pending.popleft()
+                    if unit_id in self._done:
+                        continue
+                    self._leases[unit_id] = (worker, time.monotonic() + self.lease_timeout)
+                    self._attempts[unit_id] = self._attempts.get(unit_id, 0) + 1
+                    return {"type": "unit", "unit_id": unit_id, "payload": self._payloads[unit_id]}
+                if self._closing:
+                    return {"type": "done"}
+                return {"type": "wait", "delay": min(1.0, self.heartbeat_interval)}
+            if kind == "heartbeat":
+                unit_id = message["unit_id"]
+                if self._leases.get(unit_id, (None,))[0] == worker:
+                    self._leases[unit_id] = (worker, time.monotonic() + self.lease_timeout)
+                return {"type": "ack"}
+            if kind == "result":
+                unit_id = message["unit_id"]
+                self._leases.pop(unit_id, None)
+                if unit_id not in self._done:
+                    self._done.add(unit_id)
+                    self._results[unit_id] = message["result"]
+                    self._payloads.pop(unit_id, None)
+                self._cond.notify_all()
+                return {"type": "ack"}
+            if kind == "fetch":
+                key = message["key"]
+                if key not in self._shared:
+                    return {"type": "error", "error": f"no shared array {key!r}"}
+                self.fetches += 1
+                return {"type": "shared", "key": key, "array": self._shared[key]}
+            if kind == "error":
+                unit_id = message["unit_id"]
+                if self._leases.get(unit_id, (None,))[0] == worker:
+                    self._retry(unit_id, f"error on {worker}: {message.get('error')}")
+                return {"type": "ack"}
+        return {"type": "error", "error": f"unknown message type {kind!r}"}
+
+    def as_completed(
+        self,
+        unit_ids: List[int],
+        timeout: Optional[float] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (unit_id, result) as results arrive, re-dispatching lost units.
+        Raises UnitFailedError if one of them exhausts its attempts.
+        """
+        remaining = set(unit_ids)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while remaining:
+            with self._cond:
+                failed = sorted(u for u in remaining if u in self._failed)
+                if failed:
+                    raise UnitFailedError(f"Unit {failed[0]} failed after "
+                                          f"{self._attempts[failed[0]]} attempts: "
+                                          f"{self._failed[failed[0]]}")
+                ready = [u for u in remaining if u in self._results]
+                if not ready:
+                    self._requeue_expired()
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise TimeoutError(f"{len(remaining)} units still pending")
+                    self._cond.wait(timeout=min(1.0, self.lease_timeout))
+                    continue
+                results = [(u, self._results.pop(u)) for u in ready]
+            for unit_id, result in results:
+                remaining.discard(unit_id)
+                yield unit_id, result
+
+    def gather(self, unit_ids: List[int], timeout: Optional[float] = None) -> List[Any]:
+        """Block until all units are done; results in the order of `unit_ids`."""
+        results = dict(self.as_completed(unit_ids, timeout=timeout))
+        return [results[u] for u in unit_ids]
+
+    def shutdown(self, grace: float = 0.0) -> None:
+        """Tell polling workers to exit, then stop serving."""
+        with self._cond:
+            self._closing = True
+        if grace:
+            time.sleep(grace)
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+def execute_unit(
+    payload: Dict[str, Any],
+    shared: Optional[Callable[[str], np.ndarray]] = None
+) -> Any:
+    """
+    Evaluate one work unit with the local package code.
+
+    Unit kinds:
+      - "sweep_chunk": {task, options, chunk} → list of sweep result rows.
+      - "candidates": {operator, damping, seeds, noise_scale, null_penalty} →
+        list of candidate scores (see meta_learning.evaluate_candidates);
+        `operator` is the key of the shared base weights, resolved with
+        `shared`.
+    """
+    kind = payload["kind"]
+    if kind == "sweep_chunk":
+        return _run_chunk(payload["task"], payload.get("options") or {}, payload["chunk"])
+    if kind == "candidates":
+        if shared is None:
+            raise ValueError("Candidate units need access to the coordinator's shared arrays")
+        return evaluate_candidates(
+            shared(payload["operator"]), payload["damping"], payload["seeds"],
+            noise_scale=payload["noise_scale"], null_penalty=payload["null_penalty"]
+        )
+    raise ValueError(f"Unknown unit kind: {kind}")
+
+
+def run_worker(
+    host: str,
+    port: int,
+    name: Optional[str] = None,
+    connect_timeout: float = 10.0
+) -> int:
+    """
+    Connect to a coordinator and evaluate units until told to stop.
+
+    A background thread sends heartbeats for the unit in progress. Shared
+    arrays are fetched on first use and cached for the worker's lifetime.
+    Returns the number of units completed.
+    """
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+    name = name or f"{socket.gethostname()}-{threading.get_ident()}-{time.time_ns()}"
+    lock = threading.Lock()
+
+    def exchange(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with lock:
+            send_message(sock, message)
+            return recv_message(sock)
+
+    arrays: Dict[str, np.ndarray] = {}
+
+    def shared(key: str) -> np.ndarray:
+        if key not in arrays:
+            reply = exchange({"type": "fetch", "key": key})
+            if reply is None:
+                raise ConnectionError("coordinator closed the connection")
+            if reply["type"] != "shared":
+                raise KeyError(reply.get("error", key))
+            arrays[key] = decode_array(reply["array"])
+        return arrays[key]
+
+    completed = 0
+    try:
+        welcome = exchange({"type": "hello", "worker": name})
+        if welcome is None:
+            return 0
+        interval = welcome["heartbeat"]
+        while True:
+            reply = exchange({"type": "request"})
+            if reply is None or reply["type"] == "done":
+                break
+            if reply["type"] == "wait":
+                time.sleep(reply["delay"])
+                continue
+            unit_id = reply["unit_id"]
+            stop = threading.Event()
+
+            def beat() -> None:
+                while not stop.wait(interval):
+                    try:
+                        exchange({"type": "heartbeat", "unit_id": unit_id})
+                    except OSError:
+                        return
+
+            beater = threading.Thread(target=beat, daemon=True)
+            beater.start()
+            try:
+                result = execute_unit(reply["payload"], shared)
+                message = {"type": "result", "unit_id": unit_id, "result": result}
+            except Exception as e:
+                # Report the failure and keep serving; the coordinator decides
+                # whether to retry the unit elsewhere
+                logger.error("Unit %d failed on %s", unit_id, name, exc_info=True)
+                message = {"type": "error", "unit_id": unit_id, "error": f"{type(e).__name__}: {e}"}
+            finally:
+                stop.set()
+                beater.join()
+            if exchange(message) is None:
+                break
+            if message["type"] == "result":
+                completed += 1
+    except (ConnectionError, OSError):
+        logger.warning("Worker %s lost its coordinator connection", name)
+    finally:
+        sock.close()
+    return completed
+
+
+# ---------------------------------------------------------------------------
+# Distributed drivers
+# ---------------------------------------------------------------------------
+
+def distributed_sweep(
+    coordinator: Coordinator,
+    spec: Dict[str, Any],
+    results_path: Optional[str] = None,
+    chunksize: int = 16
+) -> Dict[str, Any]:
+    """
+    Run a sweep spec through the coordinator's workers, appending each
+    finished chunk to the results table (same format and restart semantics
+    as `sweep.run_sweep`).
+    """
+    task = spec.get("task", "stability")
+    results_path = results_path or spec.get("results", "sweeps/results.rtab")
+    table = ResultsTable(results_path)
+    total = len(expand_points(spec))
+    items = pending_points(spec, table)
+    payloads = [
+        {"kind": "sweep_chunk", "task": task, "options": spec.get("options") or {},
+         "chunk": items[i:i + chunksize]}
+        for i in range(0, len(items), chunksize)
+    ]
+    completed = 0
+    for _, rows in coordinator.as_completed(coordinator.submit(payloads)):
+        table.append(rows)
+        completed += len(rows)
+    return {
+        "task": task,
+        "total": total,
+        "skipped": total - len(items),
+        "completed": completed,
+        "results": results_path,
+    }
+
+
+def distributed_random_search(
+    coordinator: Coordinator,
+    flux_dim: int,
+    manifold_size: int,
+    base_operator: Optional[ResonanceOperator] = None,
+    iterations: int = 50,
+    pop_size: int = 20,
+    noise_scale: float = 0.1,
+    null_penalty: float = 10.0,
+    batch_size: int = 5,
+    seed: Optional[int] = None
+) -> Tuple[ResonanceOperator, float, List[Dict[str, Any]]]:
+    """
+    Random search whose candidate evaluations run on remote workers.
+
+    The base weights are shared once under their `operator_digest`; each
+    generation's candidates are identified by integer seeds and shipped in
+    batches of `batch_size`, and the winning candidate is rebuilt locally
+    from its seed. Returns (best_operator, best_fitness, history) like
+    `random_search`.
+    """
+    op_seed, search_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(search_seed)
+    op = _dense_start(base_operator, flux_dim, manifold_size, op_seed)
+    best_op, best_fitness = op, float('-inf')
+    history: List[Dict[str, Any]] = []
+    key = coordinator.share(operator_digest(op), op.W)
+
+    try:
+        for gen in range(1, iterations + 1):
+            seeds = [int(s) for s in rng.integers(0, 2 ** 63 - 1, size=pop_size)]
+            payloads = [
+                {"kind": "candidates", "operator": key, "damping": op.damping,
+                 "seeds": seeds[i:i + batch_size], "noise_scale": noise_scale,
+                 "null_penalty": null_penalty}
+                for i in range(0, pop_size, batch_size)
+            ]
+            scores = [s for batch in coordinator.gather(coordinator.submit(payloads)) for s in batch]
+            gen_best = max(scores, key=lambda s: s["fitness"])
+            if gen_best["fitness"] > best_fitness:
+                best_fitness = gen_best["fitness"]
+                best_op, _ = perturbed_candidate(op.W, op.damping, gen_best["seed"], noise_scale)
+            logger.info("Gen %d/%d | fitness=%.4f", gen, iterations, gen_best["fitness"])
+            history.append({
+                "generation": gen,
+                "fitness": gen_best["fitness"],
+                "positive": gen_best["positive"],
+                "null": gen_best["null"],
+                "energy": gen_best["energy"],
+            })
+    finally:
+        coordinator.unshare(key)
+    return best_op, best_fitness, history
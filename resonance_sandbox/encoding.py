@@ -0,0 +1,194 @@
+# resonance_sandbox/encoding.py
+"""
+Streaming text encoders.
+
+`text_to_flux` hashes every character of a string into one of `dim` buckets
+(code point mod dim). The functions here compute the same bucket counts for
+inputs too large to hold in memory: files are read through a memory map (or
+plain fixed-size reads), decoded incrementally so multi-byte characters may
+span chunk boundaries, and each chunk's counts are accumulated with one
+vectorized `np.bincount` (or, per segment, one sort of the chunk's nonzero
+(segment, bucket) keys). Peak memory is O(chunk_size + dim) regardless of
+file size or of the number of segments per chunk.
+"""
+
+import os
+import mmap
+import codecs
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+from .flux import RelationalFlux
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def codepoints(text: str) -> np.ndarray:
+    """Code points of `text` as a uint32 array (equal to `ord` per character)."""
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+
+
+def bucket_counts(text: str, dim: int) -> np.ndarray:
+    """Per-bucket character counts of `text`: bincount of ord(c) % dim."""
+    return np.bincount(codepoints(text) % dim, minlength=dim)
+
+
+def flux_from_counts(
+    counts: np.ndarray,
+    dim: int,
+    normalize: bool = True,
+    distribution: Optional[str] = "uniform",
+    **dist_kwargs: Any
+) -> RelationalFlux:
+    """
+    Turn bucket counts into a flux, optionally normalized and blended with
+    10% noise from `RelationalFlux.random(dim, distribution, **dist_kwargs)`.
+    """
+    # Same arithmetic as RelationalFlux.normalize/add/scale, but on the raw
+    # vector so per-segment encoding builds a single RelationalFlux
+    vec = np.asarray(counts, dtype=float)
+    if normalize:
+        vec = _unit(vec)
+
+    if distribution:
+        # blend original with random noise from chosen distribution
+        noise = RelationalFlux.random(dim, distribution, **dist_kwargs).vector
+        vec = _unit(vec + noise * 0.1)
+
+    return RelationalFlux(dim, vector=vec)
+
+
+def _unit(vec: np.ndarray) -> np.ndarray:
+    mag = float(np.linalg.norm(vec))
+    return vec / mag if mag else np.zeros_like(vec)
+
+
+def iter_text_chunks(
+    path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    use_mmap: bool = True
+) -> Iterator[str]:
+    """
+    Yield the decoded text of a file in pieces of at most `chunk_size` bytes.
+
+    With `use_mmap` the file is memory-mapped and sliced; otherwise it is
+    read with fixed-size `read` calls. Decoding is incremental, so a
+    character split across two chunks is emitted once, whole.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, size, chunk_size):
+                    text = decoder.decode(mm[start:start + chunk_size])
+                    if text:
+                        yield text
+        else:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                text = decoder.decode(block)
+                if text:
+                    yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def stream_counts(chunks: Iterable[str], dim: int) -> np.ndarray:
+    """Total bucket counts over an iterable of text chunks."""
+    counts = np.zeros(dim, dtype=np.int64)
+    for text in chunks:
+        counts += bucket_counts(text, dim)
+    return counts
+
+
+def file_to_flux(
+    path: str,
+    dim: int,
+    normalize: bool = True,
+    distribution: Optional[str] = "uniform",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    **dist_kwargs: Any
+) -> RelationalFlux:
+    """
+    Encode a whole file as one flux; equal to `text_to_flux` of its contents
+    with the same options, without ever holding the contents in memory.
+    """
+    counts = stream_counts(iter_text_chunks(path, chunk_size, encoding, errors), dim)
+    return flux_from_counts(counts, dim, normalize, distribution, **dist_kwargs)
+
+
+def iter_segment_counts(
+    chunks: Iterable[str],
+    dim: int,
+    window: Optional[int] = None,
+    lines: bool = False
+) -> Iterator[np.ndarray]:
+    """
+    Yield bucket counts for consecutive segments of a chunked text stream:
+    windows of `window` characters, or lines (split on '\\n', which is not
+    counted). Segments may span chunks; only their counts are carried over,
+    never their text. A trailing partial window or unterminated line is
+    yielded last.
+    """
+    if lines == (window is not None):
+        raise ValueError("Specify exactly one of window or lines")
+    if window is not None and window < 1:
+        raise ValueError(f"Window must be positive, got {window}")
+    carry = np.zeros(dim, dtype=np.int64)
+    carry_len = 0
+    for text in chunks:
+        cps = codepoints(text)
+        if not len(cps):
+            continue
+        if lines:
+            breaks = cps == 10
+            ends = np.flatnonzero(breaks)
+            closed = len(ends)
+            seg = (np.cumsum(breaks) - breaks)[~breaks]
+            cps = cps[~breaks]
+            carry_len = len(breaks) - 1 - ends[-1] if closed else carry_len + len(breaks)
+        else:
+            seg = (np.arange(len(cps)) + carry_len) // window
+            closed = (len(cps) + carry_len) // window
+            carry_len = (len(cps) + carry_len) % window
+        # Count the distinct (segment, bucket) keys of the chunk; a dense row
+        # is only built for the segment being yielded
+        keys, freq = np.unique(seg.astype(np.int64) * dim + cps % dim, return_counts=True)
+        rows, buckets = np.divmod(keys, dim)
+        bounds = np.searchsorted(rows, np.arange(closed + 2))
+        for k in range(closed + 1):
+            row = carry if k == 0 else np.zeros(dim, dtype=np.int64)
+            row[buckets[bounds[k]:bounds[k + 1]]] += freq[bounds[k]:bounds[k + 1]]
+            if k < closed:
+                yield row
+        carry = row
+    if carry_len:
+        yield carry
+
+
+def iter_fluxes(
+    path: str,
+    dim: int,
+    window: Optional[int] = None,
+    lines: bool = False,
+    normalize: bool = True,
+    distribution: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    errors: str = "strict",
+    **dist_kwargs: Any
+) -> Iterator[RelationalFlux]:
+    """
+    Lazily yield one flux per window of `window` characters or per line of a
+    file. Each flux equals `text_to_flux(segment, dim, normalize,
+    distribution, ...)`; noise blending is off by default here.
+    """
+    chunks = iter_text_chunks(path, chunk_size, encoding, errors)
+    for counts in iter_segment_counts(chunks, dim, window=window, lines=lines):
+        yield flux_from_counts(counts, dim, normalize, distribution, **dist_kwargs)
@@ -1,15 +1,7 @@
 # resonance_sandbox/energy.py
 
-import numpy as np
 from typing import Union, Dict
 
-# Try to import NetworkX for graph‐based metrics; optional dependency
-try:
-    import networkx as nx
-    _HAS_NETWORKX = True
-except ImportError:
-    _HAS_NETWORKX = False
-
 from .manifold import ContextualManifold
 
 def compute_energy(
@@ -39,11 +31,9 @@ def compute_energy(
           - node_count: int                       # number of nodes
           - edge_count: int                       # number of edges
     """
-    # Convert adjacency to NumPy array
-    W = np.array(manifold.adj, dtype=float)
-
-    # Core energy: Frobenius norm
-    fro_norm = float(np.linalg.norm(W))
+    # Every quantity below is memoized on the manifold until its next
+    # deformation, so repeated calls between deformations are O(1).
+    fro_norm = manifold.frobenius_norm()
 
     if not full:
         return fro_norm
@@ -52,36 +42,13 @@ def compute_energy(
     metrics: Dict[str, float] = {'frobenius_norm': fro_norm}
 
     # Spectral radius (largest absolute eigenvalue)
-    try:
-        eigs = np.linalg.eigvals(W)
-        metrics['spectral_radius'] = float(np.max(np.abs(eigs)))
-    except Exception:
-        metrics['spectral_radius'] = float('nan')
+    metrics['spectral_radius'] = manifold.spectral_radius()
 
     # Upper‐triangle edge weights (excludes diagonal)
-    triu_i, triu_j = np.triu_indices_from(W, k=1)
-    edge_weights = W[triu_i, triu_j]
-    if edge_weights.size > 0:
-        metrics['avg_edge_weight'] = float(np.mean(edge_weights))
-        metrics['var_edge_weight'] = float(np.var(edge_weights))
-    else:
-        metrics['avg_edge_weight'] = 0.0
-        metrics['var_edge_weight'] = 0.0
+    metrics['avg_edge_weight'], metrics['var_edge_weight'] = manifold.edge_stats()
 
-    # Graph‐based metrics if NetworkX is installed
-    if _HAS_NETWORKX:
-        try:
-            G = nx.from_numpy_array(W)
-            metrics['node_count'] = G.number_of_nodes()
-            metrics['edge_count'] = G.number_of_edges()
-        except Exception:
-            metrics['node_count'] = 0
-            metrics['edge_count'] = 0
-    else:
-        # Fallback counts from raw matrix
-        n = W.shape[0]
-        metrics['node_count'] = n
-        # count nonzero off-diagonal entries as edges
-        metrics['edge_count'] = int(np.count_nonzero(edge_weights))
+    # Graph counts with NetworkX semantics (self-loops are edges)
+    metrics['node_count'] = manifold.size
+    metrics['edge_count'] = manifold.edge_count()
 
     return metrics
@@ -0,0 +1,243 @@
+# resonance_sandbox/eventlog.py
+
+import io
+import os
+import re
+import json
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from .manifold import ContextualManifold
+from .sparse_manifold import make_manifold
+from .checkpoint import atomic_write_bytes
+
+_SNAPSHOT_RE = re.compile(r"^snap_(\d+)\.np[yz]$")
+
+
+def _manifold_options(manifold: ContextualManifold) -> Dict[str, Any]:
+    """Backend and pruning settings that `make_manifold` rebuilds from."""
+    if manifold.backend == "dense":
+        return {"backend": "dense"}
+    return {"backend": manifold.backend, "threshold": manifold.threshold,
+            "top_k": manifold.top_k}
+
+
+class DeformationLog:
+    """
+    Append-only, event-sourced record of the deformations applied to one
+    ContextualManifold.
+
+    Every `ResonanceOperator.operate` deformation is damping · δδᵀ, so a step
+    is stored as a single binary record [damping, δ_0 … δ_{n-1}] (O(n)
+    float64 values). Snapshots of the adjacency are written every
+    `snapshot_every` steps; `replay(t)` loads the nearest snapshot at or
+    before t and applies the remaining deformations as one rank-k update.
+
+    A sparse manifold is pruned after every deformation, so its backend,
+    threshold and top_k are recorded by `start`, its snapshots hold the CSR
+    arrays, and replay applies its deformations one at a time.
+
+    On-disk layout of the log directory:
+      - log.json             size, snapshot interval and manifold backend
+      - deltas.f8            fixed-size float64 records, one per step
+      - snap_<step>.npy      dense adjacency after <step> deformations
+      - snap_<step>.npz      CSR arrays (indptr, indices, data) instead
+    """
+
+    def __init__(self, path: str, size: int, snapshot_every: int = 100):
+        """
+        Create a new log directory or reopen an existing one for appending.
+
+        Args:
+            path: Log directory.
+            size: Manifold size (must match an existing log).
+            snapshot_every: Snapshot interval in steps.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "log.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["size"] != size:
+                raise ValueError(f"Log at {path} has size {meta['size']}, not {size}")
+            snapshot_every = meta["snapshot_every"]
+        else:
+            meta = {"size": size, "snapshot_every": snapshot_every}
+            atomic_write_bytes(meta_path, json.dumps(meta).encode("utf-8"))
+        self._meta_path = meta_path
+        self._meta = meta
+        self.size = size
+        self.snapshot_every = snapshot_every
+        self._record_bytes = (size + 1) * 8
+        self._deltas_path = os.path.join(path, "deltas.f8")
+
+        # Drop a partially written trailing record left by a crash
+        existing = os.path.getsize(self._deltas_path) if os.path.exists(self._deltas_path) else 0
+        self.steps = existing // self._record_bytes
+        if existing != self.steps * self._record_bytes:
+            os.truncate(self._deltas_path, self.steps * self._record_bytes)
+        self._file = open(self._deltas_path, "ab")
+
+    @classmethod
+    def open(cls, path: str) -> 'DeformationLog':
+        """Reopen an existing log directory."""
+        with open(os.path.join(path, "log.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(path, meta["size"], meta["snapshot_every"])
+
+    @property
+    def manifold_options(self) -> Dict[str, Any]:
+        """Backend and pruning settings of the logged manifold."""
+        return dict(self._meta.get("manifold") or {"backend": "dense"})
+
+    def start(self, manifold: ContextualManifold) -> None:
+        """
+        Record the backend of `manifold` and its initial state as the
+        step-0 snapshot.
+        """
+        if self.steps != 0:
+            raise ValueError("start() must be called before any step is recorded")
+        if manifold.size != self.size:
+            raise ValueError(f"Manifold has size {manifold.size}, log has {self.size}")
+        self._meta["manifold"] = _manifold_options(manifold)
+        atomic_write_bytes(self._meta_path, json.dumps(self._meta).encode("utf-8"))
+        self.snapshot(manifold)
+
+    def _check_manifold(self, manifold: ContextualManifold) -> None:
+        options = _manifold_options(manifold)
+        if options != self.manifold_options:
+            raise ValueError(
+                f"Manifold {options} does not match the logged manifold {self.manifold_options}"
+            )
+
+    def record(
+        self,
+        delta: np.ndarray,
+        damping: float,
+        manifold: Optional[ContextualManifold] = None
+    ) -> int:
+        """
+        Append one deformation (damping · δδᵀ) and return its step number.
+
+        If `manifold` is given (it must match the backend recorded by
+        `start`) and the step falls on the snapshot interval, a snapshot of
+        its (already deformed) adjacency is written.
+        """
+        vec = np.asarray(delta, dtype=np.float64)
+        if vec.shape != (self.size,):
+            raise ValueError(f"Delta must have shape ({self.size},), got {vec.shape}")
+        if manifold is not None:
+            self._check_manifold(manifold)
+        record = np.empty(self.size + 1, dtype=np.float64)
+        record[0] = damping
+        record[1:] = vec
+        self._file.write(record.tobytes())
+        self._file.flush()
+        self.steps += 1
+        if manifold is not None and self.steps % self.snapshot_every == 0:
+            self.snapshot(manifold)
+        return self.steps
+
+    def snapshot(self, manifold: ContextualManifold) -> None:
+        """
+        Write a snapshot of `manifold` at the current step: the dense
+        adjacency, or the CSR arrays of a sparse manifold (O(nnz)).
+        """
+        self._check_manifold(manifold)
+        buf = io.BytesIO()
+        if manifold.backend == "dense":
+            np.save(buf, np.asarray(manifold.adj, dtype=np.float64))
+            name = f"snap_{self.steps:010d}.npy"
+        else:
+            indptr, indices, data = manifold.csr
+            np.savez(buf, indptr=indptr, indices=indices, data=data)
+            name = f"snap_{self.steps:010d}.npz"
+        atomic_write_bytes(os.path.join(self.path, name), buf.getvalue())
+
+    def snapshot_steps(self) -> List[int]:
+        """Sorted list of steps that have a snapshot."""
+        steps = []
+        for name in os.listdir(self.path):
+            match = _SNAPSHOT_RE.match(name)
+            if match:
+                steps.append(int(match.group(1)))
+        return sorted(steps)
+
+    def deltas(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Memory-mapped (stop - start, size + 1) view of the records
+        [damping, δ...] for steps start+1 … stop.
+        """
+        stop = self.steps if stop is None else stop
+        if not 0 <= start <= stop <= self.steps:
+            raise ValueError(f"Invalid step range [{start}, {stop}] for {self.steps} steps")
+        if stop == start:
+            return np.empty((0, self.size + 1))
+        self._file.flush()
+        return np.memmap(
+            self._deltas_path, dtype=np.float64, mode="r",
+            offset=start * self._record_bytes, shape=(stop - start, self.size + 1)
+        )
+
+    def replay(self, step: Optional[int] = None) -> ContextualManifold:
+        """
+        Rebuild the manifold state after `step` deformations (default: all).
+
+        Starts from the nearest snapshot at or before `step` (an empty
+        manifold of the logged backend if there is none). Dense manifolds
+        take the remaining deformations as a single rank-k update, so the
+        result matches sequential application up to floating-point rounding;
+        sparse ones apply them one at a time, pruning after each exactly as
+        `operate` did.
+        """
+        step = self.steps if step is None else step
+        if not 0 <= step <= self.steps:
+            raise ValueError(f"Step must be in [0, {self.steps}], got {step}")
+        options = self.manifold_options
+        backend = options.pop("backend")
+        base = max((s for s in self.snapshot_steps() if s <= step), default=None)
+        if base is None:
+            manifold = make_manifold(self.size, backend, **options)
+            base = 0
+        elif backend == "dense":
+            manifold = ContextualManifold(
+                self.size, np.load(os.path.join(self.path, f"snap_{base:010d}.npy"))
+            )
+        else:
+            with np.load(os.path.join(self.path, f"snap_{base:010d}.npz")) as csr:
+                manifold = ContextualManifold.from_json(dict(
+                    options, backend=backend, size=self.size, indptr=csr["indptr"],
+                    indices=csr["indices"], data=csr["data"]
+                ))
+        records = self.deltas(base, step)
+        if not len(records):
+            return manifold
+        if backend == "dense":
+            manifold.apply_low_rank(records[:, 1:], records[:, 0])
+        else:
+            for record in records:
+                manifold.apply_low_rank(record[None, 1:], record[0])
+        return manifold
+
+    def info(self) -> Dict[str, Any]:
+        """Summary of the log: steps, snapshots and bytes on disk."""
+        return {
+            "size": self.size,
+            "steps": self.steps,
+            "snapshot_every": self.snapshot_every,
+            "snapshots": self.snapshot_steps(),
+            "delta_bytes": self.steps * self._record_bytes,
+        }
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'DeformationLog':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"DeformationLog(path={self.path!r}, size={self.size}, steps={self.steps})"
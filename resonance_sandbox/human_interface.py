@@ -9,15 +9,10 @@ from .flux import RelationalFlux
 from .manifold import ContextualManifold
 from .operator import ResonanceOperator
 from .energy import compute_energy
+from .encoding import bucket_counts, flux_from_counts
 
-# configure module‐level logger
+# Handlers are configured by the application (see logger.setup_logger)
 logger = logging.getLogger(__name__)
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    fmt = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s")
-    handler.setFormatter(fmt)
-    logger.addHandler(handler)
-logger.setLevel(logging.INFO)
 
 
 def text_to_flux(
@@ -31,7 +26,8 @@ def text_to_flux(
     Convert an input string into a RelationalFlux vector.
 
     Each character is hashed into one of `dim` buckets, then optionally
-    normalized or resampled from a distribution.
+    normalized or resampled from a distribution. For files too large to
+    load, see `encoding.file_to_flux` and `encoding.iter_fluxes`.
 
     Args:
         text: The input text to encode.
@@ -43,25 +39,7 @@ def text_to_flux(
     Returns:
         A RelationalFlux instance representing the text.
     """
-    vec = np.zeros(dim, dtype=float)
-    for i, c in enumerate(text):
-        idx = ord(c) % dim
-        vec[idx] += 1.0
-
-    flux = RelationalFlux(dim, vector=vec)
-    logger.debug(f"Raw text flux (pre‐normalize): magnitude={flux.magnitude():.4f}")
-
-    if normalize:
-        flux = flux.normalize()
-        logger.debug(f"Normalized flux: magnitude={flux.magnitude():.4f}")
-
-    if distribution:
-        # blend original with random noise from chosen distribution
-        random_flux = RelationalFlux.random(dim, distribution, **dist_kwargs)
-        flux = flux.add(random_flux.scale(0.1)).normalize()
-        logger.debug(f"Blended with {distribution} noise, new magnitude={flux.magnitude():.4f}")
-
-    return flux
+    return flux_from_counts(bucket_counts(text, dim), dim, normalize, distribution, **dist_kwargs)
 
 
 def human_test(
@@ -70,7 +48,10 @@ def human_test(
     manifold_size: int = 8,
     damping: float = 1e-3,
     snippet_size: int = 3,
-    include_metrics: bool = False
+    include_metrics: bool = False,
+    flux: Optional[RelationalFlux] = None,
+    seed: Optional[int] = None,
+    operator: Optional[ResonanceOperator] = None
 ) -> Dict[str, Any]:
     """
     Run a single human‐oriented test: convert text to flux, operate the resonance,
@@ -83,6 +64,11 @@ def human_test(
         damping: Damping factor for ResonanceOperator.
         snippet_size: Number of top‐left rows/cols to include in snippet.
         include_metrics: If True, include full energy diagnostics.
+        flux: Pre-encoded flux (e.g. from `encoding.file_to_flux`); `text`
+            is then only used as a label.
+        seed: Seed for the text noise and operator, for reproducible runs.
+        operator: Existing operator to apply; its flux_dim, manifold_size
+            and damping then replace the arguments above.
 
     Returns:
         A dict with keys:
@@ -90,13 +76,18 @@ def human_test(
           - "flux": List[float] full flux vector.
           - "metrics": Dict[str, float] if include_metrics, else None.
     """
-    logger.info(f"Human test on text: '{text}'")
+    logger.info("Human test on text: '%s'", text)
+    op_seed, noise_seed = np.random.SeedSequence(seed).spawn(2)
+    if operator is not None:
+        flux_dim, manifold_size = operator.flux_dim, operator.manifold_size
     # 1) Encode text → flux
-    flux = text_to_flux(text, flux_dim)
-    logger.info(f"Flux vector magnitude: {flux.magnitude():.4f}")
+    if flux is None:
+        flux = text_to_flux(text, flux_dim, seed=noise_seed)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Flux vector magnitude: %.4f", flux.magnitude())
 
     # 2) Initialize operator & manifold
-    op = ResonanceOperator(flux_dim, manifold_size, damping=damping)
+    op = operator or ResonanceOperator(flux_dim, manifold_size, damping=damping, seed=op_seed)
     manifold = ContextualManifold(manifold_size)
 
     # 3) Apply resonance
@@ -105,7 +96,7 @@ def human_test(
 
     # 4) Capture adjacency snippet
     snippet = [
-        [round(manifold.adj[i][j], 6) for j in range(snippet_size)]
+        [round(float(manifold.adj[i][j]), 6) for j in range(snippet_size)]
         for i in range(snippet_size)
     ]
 
@@ -119,6 +110,6 @@ def human_test(
     if include_metrics:
         energy_info = compute_energy(manifold, full=True)
         result["metrics"] = energy_info
-        logger.info(f"Computed full energy metrics: {energy_info}")
+        logger.info("Computed full energy metrics: %s", energy_info)
 
     return result
@@ -0,0 +1,314 @@
+# resonance_sandbox/index.py
+"""
+Nearest-neighbour index over flux vectors and manifold signatures.
+
+Entries are (integer id, vector) pairs stored in one contiguous row-major
+array. Queries are answered in batches with matrix products over blocks of
+rows, so memory stays bounded at millions of entries. Deletes leave
+tombstones that are skipped by queries and reclaimed by `compact()`.
+
+An optional random-hyperplane LSH layer (`lsh_bits > 0`) hashes every entry
+into `lsh_tables` bucket tables; queries then rerank only the entries that
+share a bucket with them, falling back to an exact scan when fewer than `k`
+candidates are found.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .checkpoint import save_checkpoint, load_checkpoint
+from .manifold import ContextualManifold
+
+METRICS = ("cosine", "l2")
+
+
+def manifold_signature(manifold: ContextualManifold, k: Optional[int] = None) -> np.ndarray:
+    """
+    Compact, permutation-invariant signature of a manifold: its `k` largest
+    singular values (all of them by default), sorted descending.
+
+    Singular values are continuous in the adjacency, so nearly identical
+    manifolds get nearby signatures whether or not they are exactly
+    symmetric; for symmetric ones they equal |eigenvalues| and come from
+    the cheaper `eigvalsh`.
+    """
+    adj = manifold.adj
+    if manifold.is_symmetric():
+        sv = np.sort(np.abs(np.linalg.eigvalsh(adj)))[::-1]
+    else:
+        sv = np.linalg.svd(adj, compute_uv=False)
+    return sv[:k] if k is not None else sv
+
+
+class VectorIndex:
+    """
+    Top-k cosine or L2 index with incremental inserts/deletes and optional LSH.
+
+    Args:
+        dim: Vector dimensionality (e.g. flux_dim, or manifold size for
+            `manifold_signature` vectors).
+        metric: "cosine" (scores are similarities, higher is closer) or
+            "l2" (scores are Euclidean distances, lower is closer).
+        lsh_bits: Hyperplanes per LSH table; 0 disables LSH.
+        lsh_tables: Number of independent LSH tables.
+        seed: Seed for the LSH hyperplanes.
+        dtype: Storage dtype; float32 halves memory at large scale.
+        block_rows: Rows scored per matrix product during a scan.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        metric: str = "cosine",
+        lsh_bits: int = 0,
+        lsh_tables: int = 4,
+        seed: Optional[int] = None,
+        dtype: Union[str, type] = np.float32,
+        block_rows: int = 65536,
+        capacity: int = 1024
+    ):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (expected one of {METRICS})")
+        if not 0 <= lsh_bits <= 62:
+            raise ValueError(f"lsh_bits must be in [0, 62], got {lsh_bits}")
+        self.dim = dim
+        self.metric = metric
+        self.block_rows = block_rows
+        self._dtype = np.dtype(dtype)
+        self._data = np.empty((capacity, dim), dtype=self._dtype)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._sqnorm = np.empty(capacity, dtype=self._dtype)
+        self._rows = 0
+        self._row_of: Dict[int, int] = {}
+
+        self.lsh_bits = lsh_bits
+        self.lsh_tables = lsh_tables if lsh_bits else 0
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((self.lsh_tables, dim, lsh_bits)).astype(self._dtype)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.lsh_tables)]
+
+    # -- storage ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, id_: int) -> bool:
+        return int(id_) in self._row_of
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=self._dtype))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Vectors must have {self.dim} columns, got {vectors.shape[1]}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._rows + extra
+        if needed <= len(self._ids):
+            return
+        capacity = max(needed, 2 * len(self._ids))
+        for name in ("_data", "_ids", "_alive", "_sqnorm"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._rows] = old[:self._rows]
+            setattr(self, name, new)
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, lsh_tables) integer bucket codes of prepared vectors."""
+        weights = 1 << np.arange(self.lsh_bits, dtype=np.int64)
+        bits = np.einsum("nd,tdb->ntb", vectors, self._planes) > 0
+        return bits.astype(np.int64) @ weights
+
+    def add(self, ids: Union[int, Sequence[int]], vectors: np.ndarray) -> None:
+        """Insert a batch of entries; an existing id is replaced."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        vectors = self._prepare(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Duplicate ids in one batch")
+        self.remove([i for i in ids.tolist() if i in self._row_of])
+
+        self._reserve(len(ids))
+        start, stop = self._rows, self._rows + len(ids)
+        self._data[start:stop] = vectors
+        self._ids[start:stop] = ids
+        self._alive[start:stop] = True
+        self._sqnorm[start:stop] = np.einsum("ij,ij->i", vectors, vectors)
+        self._row_of.update(zip(ids.tolist(), range(start, stop)))
+        self._rows = stop
+        if self.lsh_tables:
+            self._index_rows(start, stop)
+
+    def _index_rows(self, start: int, stop: int) -> None:
+        codes = self._codes(self._data[start:stop])
+        for t, table in enumerate(self._buckets):
+            for row, code in zip(range(start, stop), codes[:, t].tolist()):
+                table.setdefault(code, []).append(row)
+
+    def remove(self, ids: Union[int, Iterable[int]]) -> int:
+        """Delete entries by id (unknown ids are ignored); returns the count removed."""
+        removed = 0
+        for id_ in np.atleast_1d(np.asarray(ids, dtype=np.int64)).tolist():
+            row = self._row_of.pop(id_, None)
+            if row is not None:
+                self._alive[row] = False
+                removed += 1
+        if self._rows and len(self) < self._rows // 2:
+            self.compact()
+        return removed
+
+    def compact(self) -> None:
+        """Drop tombstoned rows and rebuild the LSH buckets."""
+        keep = np.flatnonzero(self._alive[:self._rows])
+        n = len(keep)
+        for name in ("_data", "_ids", "_alive", "_sqnorm"):
+            arr = getattr(self, name)
+            arr[:n] = arr[keep]
+        self._alive[n:self._rows] = False
+        self._rows = n
+        self._row_of = dict(zip(self._ids[:n].tolist(), range(n)))
+        self._buckets = [{} for _ in range(self.lsh_tables)]
+        if self.lsh_tables:
+            self._index_rows(0, n)
+
+    def get(self, id_: int) -> np.ndarray:
+        """Stored vector of an id (unit-normalized for the cosine metric)."""
+        return self._data[self._row_of[int(id_)]].copy()
+
+    # -- queries ------------------------------------------------------------
+
+    def _scores(self, queries: np.ndarray, rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """Larger-is-closer scores of every query against `rows`."""
+        scores = queries @ self._data[rows].T
+        if self.metric == "l2":
+            # -||q - x||² up to the per-query constant ||q||²
+            scores *= 2
+            scores -= self._sqnorm[rows]
+        scores[:, ~self._alive[rows]] = -np.inf
+        return scores
+
+    def _finish(self, queries: np.ndarray, rows: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(-scores, axis=1, kind="stable")
+        rows = np.take_along_axis(rows, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1).astype(np.float64)
+        ids = np.where(np.isfinite(scores), self._ids[rows], -1)
+        if self.metric == "l2":
+            qn = np.einsum("ij,ij->i", queries, queries).astype(np.float64)
+            scores = np.sqrt(np.maximum(qn[:, None] - scores, 0.0))
+            scores[ids < 0] = np.inf
+        else:
+            scores[ids < 0] = -np.inf
+        return ids, scores
+
+    def _exact(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        q = len(queries)
+        best_rows = np.zeros((q, 0), dtype=np.int64)
+        best = np.zeros((q, 0), dtype=self._dtype)
+        for start in range(0, self._rows, self.block_rows):
+            stop = min(start + self.block_rows, self._rows)
+            scores = np.concatenate([best, self._scores(queries, slice(start, stop))], axis=1)
+            rows = np.concatenate(
+                [best_rows, np.broadcast_to(np.arange(start, stop), (q, stop - start))], axis=1)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best, best_rows = scores, rows
+        return self._finish(queries, best_rows, best)
+
+    def _candidates(self, codes: np.ndarray) -> np.ndarray:
+        found = [self._buckets[t].get(code, ()) for t, code in enumerate(codes.tolist())]
+        rows = np.unique(np.fromiter((r for bucket in found for r in bucket), dtype=np.int64))
+        return rows[self._alive[rows]]
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        exact: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the `k` nearest entries for each query.
+
+        Args:
+            queries: One vector (dim,) or a batch (q, dim).
+            k: Neighbours per query.
+            exact: Ignore the LSH layer and scan every entry.
+
+        Returns:
+            (ids, scores), each of shape (q, k) and sorted closest first;
+            cosine similarities or L2 distances. Missing neighbours (fewer
+            than k entries) have id -1.
+        """
+        queries = self._prepare(queries)
+        if k < 1:
+            raise ValueError(f"k must be positive, got {k}")
+        k = min(k, max(self._rows, 1))
+        if self._rows == 0:
+            return self._finish(queries, np.zeros((len(queries), 1), dtype=np.int64),
+                                np.full((len(queries), 1), -np.inf, dtype=self._dtype))
+        if exact or not self.lsh_tables:
+            return self._exact(queries, k)
+
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.empty((len(queries), k))
+        codes = self._codes(queries)
+        for i, query in enumerate(queries):
+            rows = self._candidates(codes[i])
+            if len(rows) >= k:
+                q = query[None, :]
+                s = self._scores(q, rows)
+                top = np.argpartition(-s, k - 1, axis=1)[:, :k]
+                ids[i], scores[i] = (a[0] for a in self._finish(
+                    q, rows[top], np.take_along_axis(s, top, axis=1)))
+            else:
+                ids[i], scores[i] = (a[0] for a in self._exact(query[None, :], k))
+        return ids, scores
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Compact and atomically write the index to an uncompressed .npz file."""
+        self.compact()
+        save_checkpoint(path, {
+            "ids": self._ids[:self._rows],
+            "vectors": self._data[:self._rows],
+            "planes": self._planes,
+        }, {
+            "dim": self.dim,
+            "metric": self.metric,
+            "lsh_bits": self.lsh_bits,
+            "lsh_tables": self.lsh_tables,
+            "dtype": self._dtype.str,
+            "block_rows": self.block_rows,
+        })
+
+    @classmethod
+    def load(cls, path: str) -> 'VectorIndex':
+        """Load an index written by `save`."""
+        arrays, meta = load_checkpoint(path)
+        index = cls(meta["dim"], meta["metric"], meta["lsh_bits"], meta["lsh_tables"] or 4,
+                    dtype=meta["dtype"], block_rows=meta["block_rows"],
+                    capacity=max(len(arrays["ids"]), 1))
+        index._planes = arrays["planes"].astype(index._dtype)
+        if len(arrays["ids"]):
+            # Vectors are stored already normalized; skip _prepare's rescaling
+            n = len(arrays["ids"])
+            index._data[:n] = arrays["vectors"]
+            index._ids[:n] = arrays["ids"]
+            index._alive[:n] = True
+            index._sqnorm[:n] = np.einsum("ij,ij->i", index._data[:n], index._data[:n])
+            index._rows = n
+            index._row_of = dict(zip(arrays["ids"].tolist(), range(n)))
+            if index.lsh_tables:
+                index._index_rows(0, n)
+        return index
+
+    def __repr__(self) -> str:
+        return (f"VectorIndex(dim={self.dim}, metric={self.metric!r}, entries={len(self)}, "
+                f"lsh_bits={self.lsh_bits}, lsh_tables={self.lsh_tables})")
@@ -0,0 +1,159 @@
+# resonance_sandbox/invariants.py
+
+import numpy as np
+from typing import Any, Dict, Optional
+
+from .flux import RelationalFlux
+from .manifold import ContextualManifold
+from .operator import ResonanceOperator
+
+# Upper bound on batch_size * flux_dim elements held in memory at once
+_MAX_BATCH_ELEMENTS = 4_000_000
+
+_EPSILON = 1e-6
+
+
+def _worst(entry: Dict[str, Any], value: float, index: int, flux: np.ndarray) -> None:
+    """Record (value, index, flux) in `entry` if it is worse than the current worst."""
+    if entry["index"] is None or value > entry["value"]:
+        entry.update(value=float(value), index=int(index), flux=flux.tolist())
+
+
+def check_invariants(
+    op: ResonanceOperator,
+    manifold: Optional[ContextualManifold] = None,
+    n_fluxes: int = 1000,
+    batch_size: int = 256,
+    tol: float = 1e-8,
+    operate_samples: int = 32,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Verify the operator's invariants by running `op.operate` on copies of the
+    manifold, with a batched closed-form pre-screen over many random fluxes.
+
+    Checked properties (all measured on the manifold `operate` returns):
+      - null_flux: a zero flux deforms the manifold by at most `tol`.
+      - positivity: every checked flux changes at least one entry (> 0).
+      - symmetry: the deformed manifold stays symmetric to within `tol`.
+      - energy_monotonicity: the Frobenius norm does not drop by more than
+        `tol`.
+
+    The pre-screen predicts max-|Δ| and the energy change of all `n_fluxes`
+    from A·d (c d dᵀ is the intended update), in batches. It only selects
+    fluxes: the first `operate_samples` fluxes plus the predicted worst
+    cases for positivity and energy are then applied with the real
+    `operate` (dense, tiled or sparse path) and checked.
+
+    Args:
+        op: Operator under test (any kind).
+        manifold: Base manifold (any backend); defaults to a zero manifold.
+            It is never modified.
+        n_fluxes: Number of standard-normal fluxes to screen.
+        batch_size: Fluxes per batch (capped to bound memory at large flux_dim).
+        tol: Tolerance for null/symmetry/energy checks.
+        operate_samples: Screened fluxes that are always run through `operate`.
+        seed: RNG seed; the worst-case fluxes are reported for reproduction.
+
+    Returns:
+        A dict with an overall "passed" flag, "operated" (the number of real
+        `operate` calls) and, per invariant, the worst observed "value",
+        "passed", and the offending flux "index"/"flux" (index -1 is the
+        zero flux). For positivity the "value" is the smallest max-|Δ| seen.
+    """
+    rng = np.random.default_rng(seed)
+    n, f, c = op.manifold_size, op.flux_dim, op.damping
+    base = ContextualManifold(n) if manifold is None else manifold
+    if base.size != n:
+        raise ValueError(f"Manifold must be {n}x{n}, got {base.size}x{base.size}")
+    A = np.array(base.adj, dtype=float)
+    batch_size = max(1, min(batch_size, _MAX_BATCH_ELEMENTS // max(f, 1)))
+
+    # -- closed-form pre-screen: pick the fluxes worth operating on ---------
+    E0_sq = float(np.sum(A * A))
+    selected: Dict[int, np.ndarray] = {}
+    screen_pos: Dict[str, Any] = {"value": None, "index": None, "flux": None}
+    screen_energy: Dict[str, Any] = {"value": None, "index": None, "flux": None}
+    for start in range(0, n_fluxes, batch_size):
+        X = rng.standard_normal((min(batch_size, n_fluxes - start), f))
+        for j in range(max(0, min(operate_samples - start, len(X)))):
+            selected[start + j] = X[j]
+        D = op.project(X) + _EPSILON                      # (b, n)
+
+        # max |c d_i d_j| = |c| max_i d_i^2; the smallest is the worst case
+        max_delta = abs(c) * np.max(D * D, axis=1)
+        i = int(np.argmin(max_delta))
+        _worst(screen_pos, -max_delta[i], start + i, X[i])
+
+        # ||A + c dd^T||^2 = ||A||^2 + 2c d^T A d + c^2 ||d||^4
+        dAd = np.einsum('bi,bi->b', D @ A, D)
+        norms_sq = np.einsum('bi,bi->b', D, D)
+        E1_sq = np.maximum(E0_sq + 2.0 * c * dAd + (c * norms_sq) ** 2, 0.0)
+        drop = np.sqrt(E0_sq) - np.sqrt(E1_sq)
+        i = int(np.argmax(drop))
+        _worst(screen_energy, drop[i], start + i, X[i])
+    for entry in (screen_pos, screen_energy):
+        if entry["index"] is not None:
+            selected[entry["index"]] = np.asarray(entry["flux"])
+
+    # -- real operate on copies ---------------------------------------------
+    E0 = base.frobenius_norm()
+    base_asym = float(np.max(np.abs(A - A.T))) if n else 0.0
+
+    def apply(index: int, vector: np.ndarray) -> np.ndarray:
+        m = base.copy()
+        op.operate(RelationalFlux(f, vector=vector), m)
+        adj = np.asarray(m.adj, dtype=float)
+        asym = float(np.max(np.abs(adj - adj.T))) if n else 0.0
+        _worst(symmetry, asym, index, vector)
+        _worst(energy, E0 - m.frobenius_norm(), index, vector)
+        return adj
+
+    symmetry: Dict[str, Any] = {"value": base_asym, "index": None, "flux": None}
+    energy: Dict[str, Any] = {"value": None, "index": None, "flux": None}
+    positivity: Dict[str, Any] = {"value": None, "index": None, "flux": None}
+
+    null_value = float(np.max(np.abs(apply(-1, np.zeros(f)) - A))) if n else 0.0
+    for index, vector in sorted(selected.items()):
+        moved = float(np.max(np.abs(apply(index, vector) - A))) if n else 0.0
+        if positivity["index"] is None or moved < positivity["value"]:
+            positivity.update(value=moved, index=int(index), flux=vector.tolist())
+
+    report: Dict[str, Any] = {
+        "n_fluxes": n_fluxes,
+        "operated": len(selected) + 1,
+        "null_flux": {"value": null_value, "passed": null_value <= tol},
+        "positivity": dict(positivity, passed=positivity["value"] is None or positivity["value"] > 0.0),
+        "symmetry": dict(symmetry, passed=symmetry["value"] <= tol),
+        "energy_monotonicity": dict(
+            energy, passed=energy["value"] is None or energy["value"] <= tol
+        ),
+    }
+    report["passed"] = all(
+        report[k]["passed"]
+        for k in ("null_flux", "positivity", "symmetry", "energy_monotonicity")
+    )
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a check_invariants report as short human-readable lines."""
+    lines = [f"Invariants over {report['n_fluxes']} fluxes: "
+             f"{'PASS' if report['passed'] else 'FAIL'}"]
+    for key in ("null_flux", "positivity", "symmetry", "energy_monotonicity"):
+        entry = report[key]
+        index = entry.get("index")
+        where = "" if index is None else " (zero flux)" if index == -1 else f" (flux #{index})"
+        value = entry["value"]
+        shown = "n/a" if value is None else f"{value:.6g}"
+        lines.append(f"  {key:<20} {'ok  ' if entry['passed'] else 'FAIL'} "
+                     f"worst={shown}{where}")
+    return "\n".join(lines)
+
+
+def assert_invariants(op: ResonanceOperator, **kwargs: Any) -> Dict[str, Any]:
+    """Run check_invariants and raise AssertionError with the report on failure."""
+    report = check_invariants(op, **kwargs)
+    if not report["passed"]:
+        raise AssertionError(format_report(report))
+    return report
@@ -1,10 +1,14 @@
 import os
 import sys
 import json
+import time
+import queue
+import atexit
 import logging
+import threading
 from logging import Logger
-from logging.handlers import RotatingFileHandler
-from typing import Optional, Dict, Any
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional, Dict, Any, Callable, Hashable, List, Tuple
 
 # ANSI color codes for futuristic terminal styling
 _RESET = "\x1b[0m"
@@ -17,12 +21,23 @@ _LEVEL_COLORS = {
 }
 
 class _ColoredFormatter(logging.Formatter):
-    """Formatter that adds ANSI colors based on log level."""
+    """
+    Formatter that adds ANSI colors based on log level, and notes how many
+    records a RateLimitFilter dropped before this one.
+    """
     def format(self, record: logging.LogRecord) -> str:
         level = record.levelname
         color = _LEVEL_COLORS.get(level, _RESET)
+        # Color a copy: the same record also reaches the file handler, and
+        # its args must not be applied twice
+        record = logging.makeLogRecord(record.__dict__)
+        message = record.getMessage()
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            message = f"{message} (+{suppressed} suppressed)"
         record.levelname = f"{color}{level}{_RESET}"
-        record.msg = f"{color}{record.getMessage()}{_RESET}"
+        record.msg = f"{color}{message}{_RESET}"
+        record.args = None
         return super().format(record)
 
 class _JSONFormatter(logging.Formatter):
@@ -37,40 +52,220 @@ class _JSONFormatter(logging.Formatter):
             "funcName": record.funcName,
             "lineno": record.lineno,
         }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
         return json.dumps(entry, ensure_ascii=False)
 
+# Immutable argument types that are safe to format later, on the listener thread
+_LAZY_ARG_TYPES = (str, int, float, bool, type(None))
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-message-key rate limiting and sampling.
+
+    A record's key is its `log_key` attribute (pass `extra={"log_key": ...}`)
+    or, by default, its logger name and unformatted message template, so a
+    hot loop logging "Gen %d ..." shares one budget. Each key keeps every
+    `sample`-th record and then spends a token from a bucket refilled at
+    `rate` records per second (up to `burst`). Records at `exempt_level`
+    and above always pass. The next record that passes for a key carries the
+    number dropped since in `record.suppressed`.
+
+    Args:
+        rate: Records per second per key; None disables rate limiting.
+        burst: Bucket capacity (records allowed back to back).
+        sample: Keep one record in `sample` per key.
+        exempt_level: Records at or above this level are never dropped.
+        clock: Monotonic time source (for tests).
+    """
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 10,
+        sample: int = 1,
+        exempt_level: int = logging.WARNING,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__()
+        if sample < 1:
+            raise ValueError(f"sample must be >= 1, got {sample}")
+        self.rate = rate
+        self.burst = burst
+        self.sample = sample
+        self.exempt_level = exempt_level
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> [tokens, last refill time, records seen, suppressed since last pass]
+        self._state: Dict[Hashable, List[Any]] = {}
+
+    @staticmethod
+    def key(record: logging.LogRecord) -> Hashable:
+        key = getattr(record, "log_key", None)
+        if key is not None:
+            return key
+        return (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        # One decision per record, even when the filter sits on several handlers
+        decided = getattr(record, "_rate_keep", None)
+        if decided is not None:
+            return decided
+        key = self.key(record)
+        now = self.clock()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [float(self.burst), now, 0, 0]
+            state[2] += 1
+            keep = (state[2] - 1) % self.sample == 0
+            if keep and self.rate is not None:
+                state[0] = min(float(self.burst), state[0] + (now - state[1]) * self.rate)
+                state[1] = now
+                keep = state[0] >= 1.0
+                if keep:
+                    state[0] -= 1.0
+            record._rate_keep = keep
+            if not keep:
+                state[3] += 1
+                return False
+            record.suppressed, state[3] = state[3], 0
+        return True
+
+    def suppressed(self) -> Dict[Hashable, int]:
+        """Records dropped per key since each key's last emitted record."""
+        with self._lock:
+            return {key: state[3] for key, state in self._state.items() if state[3]}
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    Non-blocking QueueHandler that defers message formatting.
+
+    The stdlib handler formats every record in the calling thread so it can
+    be pickled; for an in-process queue it is enough to snapshot the args,
+    and only records with mutable args (or exceptions) are formatted
+    eagerly. When the queue is full the record is dropped and counted
+    instead of blocking the caller.
+    """
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if record.exc_info or not (args is None or isinstance(args, tuple)
+                                   and all(isinstance(a, _LAZY_ARG_TYPES) for a in args)):
+            return super().prepare(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+# name -> (queue handler, listener) of loggers set up with queued=True
+_QUEUED: Dict[str, Tuple[_LazyQueueHandler, QueueListener]] = {}
+
+def shutdown_logging(name: Optional[str] = None) -> None:
+    """Flush and stop the background listener of `name` (default: all)."""
+    names = list(_QUEUED) if name is None else [name]
+    for n in names:
+        entry = _QUEUED.pop(n, None)
+        if entry is None:
+            continue
+        handler, listener = entry
+        logging.getLogger(n).removeHandler(handler)
+        listener.stop()
+        for h in listener.handlers:
+            h.close()
+
+atexit.register(shutdown_logging)
+
 def setup_logger(
     name: str = "resonance",
-    log_file: str = "logs/resonance.log",
+    log_file: Optional[str] = "logs/resonance.log",
     max_bytes: int = 5 * 1024 * 1024,
-    backup_count: int = 5
+    backup_count: int = 5,
+    level: int = logging.INFO,
+    queued: bool = False,
+    queue_size: int = 10000,
+    rate: Optional[float] = None,
+    burst: int = 10,
+    sample: int = 1
 ) -> Logger:
     """
     Create a layered logger with:
-      - Colored console output at INFO level and above.
-      - Rotating JSON file output at DEBUG level and above.
-      - Automatically creates 'logs/' directory.
+      - Colored console output at `level` and above.
+      - Rotating JSON file output at DEBUG level and above (skipped when
+        `log_file` is None); automatically creates its directory.
+      - With `queued`, the caller only enqueues records (formatting lazily,
+        never blocking) and a background QueueListener thread formats and
+        writes them; stop it with `shutdown_logging`.
+      - With `rate` or `sample`, a RateLimitFilter drops excess records per
+        message key before they are enqueued or formatted.
     """
+    shutdown_logging(name)
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+    # Records below every handler's level are rejected before they are built
+    logger.setLevel(logging.DEBUG if log_file else level)
     # Clear existing handlers
     logger.handlers.clear()
 
+    handlers: List[logging.Handler] = []
+
     # 1) Console handler (layer 1)
     ch = logging.StreamHandler(sys.stdout)
-    ch.setLevel(logging.INFO)
+    ch.setLevel(level)
     ch_fmt = "[%(asctime)s] %(levelname)s %(name)s → %(message)s"
     ch.setFormatter(_ColoredFormatter(ch_fmt, datefmt="%H:%M:%S"))
-    logger.addHandler(ch)
+    handlers.append(ch)
 
     # 2) Rotating file handler (layer 2)
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    fh = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
-    fh.setLevel(logging.DEBUG)
-    fh_fmt = "%(asctime)s %(levelname)s %(name)s %(module)s:%(lineno)d - %(message)s"
-    fh.setFormatter(_JSONFormatter(fh_fmt, datefmt="%Y-%m-%dT%H:%M:%S"))
-    logger.addHandler(fh)
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        fh = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        fh.setLevel(logging.DEBUG)
+        fh_fmt = "%(asctime)s %(levelname)s %(name)s %(module)s:%(lineno)d - %(message)s"
+        fh.setFormatter(_JSONFormatter(fh_fmt, datefmt="%Y-%m-%dT%H:%M:%S"))
+        handlers.append(fh)
+
+    limiter = RateLimitFilter(rate, burst, sample) if rate is not None or sample > 1 else None
+    if queued:
+        qh = _LazyQueueHandler(queue.Queue(queue_size))
+        if limiter is not None:
+            qh.addFilter(limiter)
+        logger.addHandler(qh)
+        listener = QueueListener(qh.queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _QUEUED[name] = (qh, listener)
+    else:
+        for h in handlers:
+            if limiter is not None:
+                h.addFilter(limiter)
+            logger.addHandler(h)
 
     # Wrap with LoggerAdapter for structured context
     adapter = logging.LoggerAdapter(logger, {"layer": "core"})
     return adapter
+
+def logging_from_config(cfg: Dict[str, Any], name: str = "resonance_sandbox") -> Optional[Logger]:
+    """
+    Set up the package logger from the `logging:` config section, or return
+    None when the section is absent.
+    """
+    section = cfg.get("logging")
+    if not section:
+        return None
+    return setup_logger(
+        name,
+        log_file=section.get("file"),
+        level=logging.getLevelName(str(section.get("level", "INFO")).upper()),
+        queued=bool(section.get("queued", True)),
+        queue_size=int(section.get("queue_size", 10000)),
+        rate=section.get("rate"),
+        burst=int(section.get("burst", 10)),
+        sample=int(section.get("sample", 1)),
+    )
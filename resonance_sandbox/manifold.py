@@ -1,15 +1,30 @@
 import numpy as np
-import networkx as nx
 import json
-from typing import List, Optional, Union, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .tiled import get_engine
 
 class ContextualManifold:
     """
     Represents a dynamic contextual manifold as an adjacency matrix.
     Nodes correspond to dimension indices; edges encode relational intensity.
     Supports deformations, energy computations, spectral analysis, and serialization.
+
+    Derived quantities (energy, spectral radius, edge statistics, degrees) are
+    memoized and invalidated whenever the adjacency is mutated, so repeated
+    reads between deformations are O(1). `adj` is exposed read-only; all
+    mutation goes through `apply_deformation` or assignment to `adj`.
+
+    Manifolds at or above the tiled engine's `min_size` run deformations and
+    energy on its thread pool (see `resonance_sandbox.tiled`). For a pruned
+    CSR backend see `resonance_sandbox.sparse_manifold`.
     """
 
+    # Serialization tag; from_json dispatches on it
+    backend = "dense"
+    # Whether operators should always send rank-one updates via apply_low_rank
+    low_rank_updates = False
+
     def __init__(
         self,
         size: int,
@@ -22,14 +37,73 @@ class ContextualManifold:
             size: Number of nodes (dimensions).
             adj: Optional adjacency matrix (list-of-lists or numpy array).
         """
+        self._cache: Dict[str, Any] = {}
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
         if adj is None:
             # Zero-initialize adjacency
-            self.adj: List[List[float]] = [[0.0] * size for _ in range(size)]
+            self._adj = np.zeros((size, size), dtype=float)
         else:
             arr = np.array(adj, dtype=float)
             if arr.shape != (size, size):
                 raise ValueError(f"Adjacency must be {size}x{size}, got {arr.shape}")
-            self.adj = arr.tolist()
+            self._adj = arr
+
+    @property
+    def adj(self) -> np.ndarray:
+        """Read-only view of the adjacency matrix."""
+        view = self._adj.view()
+        view.flags.writeable = False
+        return view
+
+    @adj.setter
+    def adj(self, value: Union[List[List[float]], np.ndarray]) -> None:
+        arr = np.array(value, dtype=float)
+        if arr.shape != self._adj.shape:
+            raise ValueError(f"Adjacency must be {self._adj.shape}, got {arr.shape}")
+        self._store(arr)
+
+    @property
+    def size(self) -> int:
+        return self._adj.shape[0]
+
+    @property
+    def version(self) -> int:
+        """Counter incremented on every mutation of the adjacency."""
+        return self._version
+
+    def invalidate(self) -> None:
+        """Drop all memoized quantities; call after mutating the data in place."""
+        self._version += 1
+        self._cache.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return cache hit/miss counters and the current data version."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "entries": len(self._cache),
+            "version": self._version,
+        }
+
+    def copy(self) -> 'ContextualManifold':
+        """Independent copy of the manifold (same backend and options)."""
+        return ContextualManifold(self.size, self._adj)
+
+    def _store(self, adj: np.ndarray) -> None:
+        """Install a new adjacency and invalidate derived quantities."""
+        self._adj = adj
+        self.invalidate()
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        if key in self._cache:
+            self._hits += 1
+            return self._cache[key]
+        self._misses += 1
+        value = compute()
+        self._cache[key] = value
+        return value
 
     def apply_deformation(
         self,
@@ -41,42 +115,141 @@ class ContextualManifold:
         Args:
             delta_matrix: Deformation matrix; only symmetric component is applied.
         """
-        mat = np.array(delta_matrix, dtype=float)
-        size = len(self.adj)
+        mat = np.asarray(delta_matrix, dtype=float)
+        size = self.size
         if mat.shape != (size, size):
             raise ValueError(f"Delta must be {size}x{size}, got {mat.shape}")
-        # Symmetrically apply
-        for i in range(size):
-            for j in range(size):
-                sym = (mat[i, j] + mat[j, i]) / 2.0
-                self.adj[i][j] += sym
+        # Symmetrically apply; a new buffer keeps earlier views of `adj` intact
+        symmetric = self.is_symmetric()
+        engine = get_engine()
+        if engine.accepts(size):
+            self._store(engine.deform(self._adj, mat, symmetric=symmetric))
+        else:
+            # In-place halving and accumulation keep one temporary alive
+            sym = mat + mat.T
+            sym *= 0.5
+            sym += self._adj
+            self._store(sym)
+        self._keep_symmetric(symmetric)
+
+    def apply_low_rank(
+        self,
+        vectors: np.ndarray,
+        coeffs: Union[float, np.ndarray] = 1.0
+    ) -> None:
+        """
+        Apply a batch of outer-product deformations in one rank-k update:
+        A += sum_k coeffs[k] · v_k v_k^T.
+
+        Args:
+            vectors: Array of shape (k, size), one deformation vector per row.
+            coeffs: Scalar or per-vector weights of shape (k,).
+        """
+        V = np.atleast_2d(np.asarray(vectors, dtype=float))
+        if V.shape[1] != self.size:
+            raise ValueError(f"Vectors must have {self.size} columns, got {V.shape[1]}")
+        if V.shape[0] == 0:
+            return
+        c = np.broadcast_to(np.asarray(coeffs, dtype=float), (V.shape[0],))
+        symmetric = self.is_symmetric()
+        engine = get_engine()
+        if engine.accepts(self.size):
+            self._store(engine.low_rank(self._adj, V, c, symmetric=symmetric))
+        else:
+            update = (V.T * c) @ V
+            self._store(self._adj + (update + update.T) / 2.0)
+        self._keep_symmetric(symmetric)
+
+    def _keep_symmetric(self, symmetric: bool) -> None:
+        # A symmetric update of a symmetric matrix stays exactly symmetric
+        if symmetric:
+            self._cache["symmetric"] = True
+
+    def quadratic_form(self, vectors: np.ndarray) -> np.ndarray:
+        """vᵀ A v for each row v of a (batch, size) array, without copying A."""
+        V = np.atleast_2d(np.asarray(vectors, dtype=float))
+        return np.einsum("bi,bi->b", V @ self._adj.T, V)
+
+    def is_symmetric(self) -> bool:
+        """True if the adjacency equals its transpose exactly."""
+        return self._cached("symmetric", lambda: bool(np.array_equal(self._adj, self._adj.T)))
 
     def energy(self) -> float:
         """
         Compute the Frobenius energy of the adjacency matrix.
         Returns the sum of squares of all entries.
         """
-        arr = np.array(self.adj, dtype=float)
-        return float(np.sum(arr * arr))
+        def compute() -> float:
+            engine = get_engine()
+            if engine.accepts(self.size):
+                return engine.energy(self._adj, symmetric=self.is_symmetric())
+            return float(np.sum(self._adj * self._adj))
+        return self._cached("energy", compute)
+
+    def frobenius_norm(self) -> float:
+        """Frobenius norm (square root of `energy`)."""
+        def compute() -> float:
+            if get_engine().accepts(self.size):
+                return float(np.sqrt(self.energy()))
+            return float(np.linalg.norm(self._adj))
+        return self._cached("frobenius_norm", compute)
+
+    def spectral_radius(self) -> float:
+        """Largest absolute eigenvalue (NaN if the decomposition fails)."""
+        def compute() -> float:
+            if self.size == 0:
+                return 0.0
+            try:
+                if self.is_symmetric():
+                    eigs = np.linalg.eigvalsh(self._adj)
+                else:
+                    eigs = np.linalg.eigvals(self._adj)
+                return float(np.max(np.abs(eigs)))
+            except np.linalg.LinAlgError:
+                return float('nan')
+        return self._cached("spectral_radius", compute)
+
+    def edge_stats(self) -> Tuple[float, float]:
+        """Mean and variance of the upper-triangle (off-diagonal) weights."""
+        def compute() -> Tuple[float, float]:
+            weights = self._adj[np.triu_indices(self.size, k=1)]
+            if weights.size == 0:
+                return 0.0, 0.0
+            return float(np.mean(weights)), float(np.var(weights))
+        return self._cached("edge_stats", compute)
+
+    def degrees(self) -> np.ndarray:
+        """
+        Node degrees of the undirected graph with an edge wherever either
+        A[i, j] or A[j, i] is non-zero; self-loops count twice (NetworkX
+        convention).
+        """
+        def compute() -> np.ndarray:
+            nz = (self._adj != 0) | (self._adj.T != 0)
+            deg = nz.sum(axis=1) + np.diagonal(nz)
+            deg.flags.writeable = False
+            return deg
+        return self._cached("degrees", compute)
+
+    def edge_count(self) -> int:
+        """Number of undirected edges, self-loops included."""
+        def compute() -> int:
+            nz = (self._adj != 0) | (self._adj.T != 0)
+            return int(np.count_nonzero(np.triu(nz)))
+        return self._cached("edge_count", compute)
 
     def spectral_diagnostics(self) -> Dict[str, Any]:
         """
         Compute advanced diagnostics including spectral radius,
         node/edge counts, and average degree.
         """
-        arr = np.array(self.adj, dtype=float)
-        energy = float(np.sum(arr * arr))
-        eigs = np.linalg.eigvals(arr)
-        radius = float(np.max(np.abs(eigs)))
-        G = nx.from_numpy_array(arr)
-        node_count = G.number_of_nodes()
-        edge_count = G.number_of_edges()
-        avg_degree = float(sum(dict(G.degree()).values()) / node_count) if node_count else 0.0
+        node_count = self.size
+        avg_degree = float(self.degrees().sum() / node_count) if node_count else 0.0
         return {
-            "energy": energy,
-            "spectral_radius": radius,
+            "energy": self.energy(),
+            "spectral_radius": self.spectral_radius(),
             "node_count": node_count,
-            "edge_count": edge_count,
+            "edge_count": self.edge_count(),
             "avg_degree": avg_degree
         }
 
@@ -85,8 +258,8 @@ class ContextualManifold:
         Serialize the manifold to a JSON string.
         """
         return json.dumps({
-            "size": len(self.adj),
-            "adj": self.adj
+            "size": self.size,
+            "adj": self._adj.tolist()
         })
 
     @classmethod
@@ -95,11 +268,17 @@ class ContextualManifold:
         data: Union[str, Dict[str, Any]]
     ) -> 'ContextualManifold':
         """
-        Deserialize from JSON string or dict.
+        Deserialize from JSON string or dict. The optional "backend" field
+        selects the manifold class, so sparse manifolds round-trip too.
         """
         obj = json.loads(data) if isinstance(data, str) else data
+        backend = obj.get("backend", "dense")
+        if backend != cls.backend:
+            from .sparse_manifold import MANIFOLD_BACKENDS
+            if backend not in MANIFOLD_BACKENDS:
+                raise ValueError(f"Unknown manifold backend: {backend}")
+            return MANIFOLD_BACKENDS[backend].from_json(obj)
         return cls(obj["size"], adj=obj["adj"])
 
     def __repr__(self) -> str:
-        size = len(self.adj)
-        return f"ContextualManifold(size={size}, energy={self.energy():.4f})"
+        return f"ContextualManifold(size={self.size}, energy={self.energy():.4f})"
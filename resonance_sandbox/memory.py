@@ -0,0 +1,327 @@
+# resonance_sandbox/memory.py
+"""
+Memory accounting: per-stage measurements and a predictive estimator.
+
+`MemoryTracker.stage(name)` measures a block of work: the peak and net
+bytes traced by `tracemalloc` (NumPy buffers included), the resident set
+size after it and the process-wide peak RSS. Repeated stages with the same
+name are aggregated. Stages must not be nested (tracemalloc has one peak).
+
+`estimate_memory(cfg)` predicts the peak footprint of a run from the config
+alone (flux_dim, manifold_size, operator kind, manifold backend and batch
+size; with `assets=True` the graph that `generate_assets` draws; with
+`workers` one working set per process), `estimate_sweep_memory` does the
+same for the largest point of a sweep spec, and `check_budget` warns or
+raises `MemoryBudgetError` when an estimate exceeds `memory.budget_mb`.
+"""
+
+import os
+import sys
+import time
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_FLOAT = 8
+_INDEX = 8
+# Dense manifolds from this size deform through the tiled engine (one new
+# buffer); smaller ones build the outer product and a symmetrized sum
+_TILED_MIN_SIZE = 2048
+# Measured cost of one rendered asset (networkx graph plus the matplotlib
+# artists nx.draw creates): per undirected edge, per labelled node, per figure
+_ASSET_EDGE_BYTES = 1100
+_ASSET_NODE_BYTES = 12 * 1024
+_ASSET_FIGURE_BYTES = 2 * 2**20
+# Rows of a sparse manifold densified at a time when writing its CSV
+_CSV_BLOCK_ROWS = 1024
+
+
+class MemoryBudgetError(MemoryError):
+    """Raised when a run's estimated peak memory exceeds the configured budget."""
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None if unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def format_bytes(n: Optional[float]) -> str:
+    if n is None:
+        return "n/a"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+    return f"{n:.1f} TiB"
+
+
+class MemoryTracker:
+    """
+    Collects per-stage memory measurements.
+
+    Args:
+        trace: Trace Python/NumPy allocations with tracemalloc (adds some
+            overhead); with False only RSS is reported.
+    """
+
+    def __init__(self, trace: bool = True):
+        self.trace = trace
+        self._started = False
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> "MemoryTracker":
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def stop(self) -> None:
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the enclosed block under `name`."""
+        tracing = self.trace and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            traced_peak = traced_net = None
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                traced_peak, traced_net = peak - before, current - before
+            entry = self._stages.setdefault(name, {
+                "stage": name, "calls": 0, "seconds": 0.0,
+                "traced_peak": None, "traced_net": None,
+            })
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            if traced_peak is not None:
+                entry["traced_peak"] = max(entry["traced_peak"] or 0, traced_peak)
+                entry["traced_net"] = (entry["traced_net"] or 0) + traced_net
+            rss, peak_resident = current_rss(), peak_rss()
+            entry["rss"] = rss
+            # /proc and getrusage round differently; the peak is never below RSS
+            entry["peak_rss"] = max(rss, peak_resident) if None not in (rss, peak_resident) else peak_resident
+
+    def report(self) -> List[Dict[str, Any]]:
+        """One dict per stage, in first-seen order."""
+        return [dict(entry) for entry in self._stages.values()]
+
+
+def format_memory_report(records: List[Dict[str, Any]]) -> str:
+    """Render `MemoryTracker.report()` as a table."""
+    lines = [f"{'stage':<20} {'calls':>5} {'seconds':>8} {'traced peak':>12} "
+             f"{'traced net':>12} {'rss':>12} {'peak rss':>12}"]
+    for r in records:
+        lines.append(
+            f"{r['stage']:<20} {r['calls']:>5} {r['seconds']:>8.3f} "
+            f"{format_bytes(r['traced_peak']):>12} {format_bytes(r['traced_net']):>12} "
+            f"{format_bytes(r['rss']):>12} {format_bytes(r['peak_rss']):>12}"
+        )
+    return "\n".join(lines)
+
+
+def _operator_bytes(kind: str, flux_dim: int, manifold_size: int, options: Dict[str, Any]) -> int:
+    if kind == "sparse":
+        density = options.get("density") or 1.0 / max(flux_dim, 1) ** 0.5
+        # row, col and value per stored weight
+        return int(manifold_size * flux_dim * density) * (2 * _INDEX + _FLOAT)
+    if kind == "hashing":
+        return flux_dim * (_INDEX + _FLOAT)
+    if kind == "srht":
+        return flux_dim + manifold_size * _INDEX
+    return manifold_size * flux_dim * _FLOAT
+
+
+def estimate_memory(
+    cfg: Dict[str, Any],
+    batch_size: Optional[int] = None,
+    workers: int = 1,
+    assets: bool = False
+) -> Dict[str, Any]:
+    """
+    Predict the peak memory of a run described by `cfg`.
+
+    Components (bytes):
+      - baseline: current RSS (interpreter, NumPy, this package)
+      - operator: stored weights for `operator.kind`
+      - manifold: adjacency for `manifold.backend` (sparse: 2·top_k·n
+        entries, or n² when only a threshold bounds it)
+      - deformation: temporaries of one `operate` (outer product and
+        symmetrized sum below the tiled size, one new buffer above it;
+        candidate arrays for the sparse backend)
+      - batch: `batch_size` fluxes and their projections
+      - meta_learning: the trainer's working set (random search scores
+        two fresh dense manifolds per candidate; gradient training keeps W,
+        the best W, its gradient and two Adam moments)
+      - assets (with `assets=True`): one `generate_assets` render, i.e. the
+        networkx graph and drawn artists for every nonzero edge (n(n+1)/2
+        for a dense manifold, about nnz/2 for a sparse one) plus the CSV
+        row blocks of a sparse manifold
+
+    `peak` is baseline + operator + manifold + the largest transient, times
+    `workers` (sweep processes each hold their own copy of all of it).
+    """
+    n = int(cfg.get("manifold_size", 8))
+    f = int(cfg.get("flux_dim", 16))
+    op_cfg = dict(cfg.get("operator") or {})
+    kind = op_cfg.pop("kind", "dense")
+    manifold_cfg = cfg.get("manifold") or {}
+    backend = manifold_cfg.get("backend", "dense")
+    meta_cfg = cfg.get("meta_learning") or {}
+    mem_cfg = cfg.get("memory") or {}
+    if batch_size is None:
+        batch_size = int(mem_cfg.get("batch_size", meta_cfg.get("batch_size", 32)))
+    tiled_min = int((cfg.get("tiling") or {}).get("min_size", _TILED_MIN_SIZE))
+
+    dense_matrix = n * n * _FLOAT
+    if backend in ("sparse", "csr"):
+        top_k = manifold_cfg.get("top_k")
+        nnz = min(n * n, 2 * int(top_k) * n) if top_k else n * n
+        manifold = nnz * (_INDEX + _FLOAT) + (n + 1) * _INDEX
+        # candidates (row, col, value) plus sort keys and permutations
+        deformation = 3 * nnz * (4 * _INDEX + _FLOAT)
+        edges = nnz // 2 + n
+        csv_block = min(n, _CSV_BLOCK_ROWS) * n * _FLOAT
+    else:
+        manifold = dense_matrix
+        deformation = dense_matrix if n >= tiled_min else 2 * dense_matrix
+        edges = n * (n + 1) // 2
+        csv_block = 0
+
+    operator = _operator_bytes(kind, f, n, op_cfg)
+    batch = batch_size * (f + n) * _FLOAT * 2
+    if meta_cfg.get("method", "random") == "gradient":
+        meta = 5 * n * f * _FLOAT + 2 * batch_size * (f + n) * _FLOAT
+    else:
+        meta = n * f * _FLOAT + 2 * dense_matrix + (dense_matrix if n >= tiled_min else 2 * dense_matrix)
+
+    components = {
+        "baseline": current_rss() or 0,
+        "operator": operator,
+        "manifold": manifold,
+        "deformation": deformation,
+        "batch": batch,
+        "meta_learning": meta,
+    }
+    if assets:
+        components["assets"] = (edges * _ASSET_EDGE_BYTES + n * _ASSET_NODE_BYTES
+                                + _ASSET_FIGURE_BYTES + csv_block)
+    transient = max(v for k, v in components.items()
+                    if k not in ("baseline", "operator", "manifold"))
+    workers = max(1, int(workers))
+    peak = workers * (components["baseline"] + operator + manifold + transient)
+    return {
+        "flux_dim": f,
+        "manifold_size": n,
+        "batch_size": batch_size,
+        "operator_kind": kind,
+        "manifold_backend": backend,
+        "workers": workers,
+        "components": components,
+        "peak": peak,
+    }
+
+
+def estimate_sweep_memory(
+    cfg: Dict[str, Any],
+    spec: Dict[str, Any],
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Estimate for a sweep spec: the largest point of its grid or random
+    samples (each runs on a fresh dense manifold with the point's operator),
+    times the worker count (`workers`, else spec["workers"], 0 meaning all
+    cores, as in `sweep.run_sweep`).
+    """
+    from .sweep import expand_points
+
+    workers = spec.get("workers") if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    options = spec.get("options") or {}
+    worst: Optional[Dict[str, Any]] = None
+    for point in expand_points(spec):
+        params = dict(options, **point)
+        point_cfg = dict(
+            cfg,
+            flux_dim=params.get("flux_dim", 16),
+            manifold_size=params.get("manifold_size", 8),
+            operator={"kind": params.get("kind", "dense")},
+            manifold={"backend": "dense"},
+            meta_learning=dict(cfg.get("meta_learning") or {}, method="random"),
+        )
+        estimate = estimate_memory(point_cfg, workers=workers)
+        if worst is None or estimate["peak"] > worst["peak"]:
+            worst = estimate
+    if worst is None:
+        return estimate_memory(cfg, workers=workers)
+    return worst
+
+
+def format_estimate(estimate: Dict[str, Any]) -> str:
+    parts = ", ".join(f"{k}={format_bytes(v)}" for k, v in estimate["components"].items())
+    return (f"Estimated peak memory: {format_bytes(estimate['peak'])} "
+            f"(flux_dim={estimate['flux_dim']}, manifold_size={estimate['manifold_size']}, "
+            f"batch={estimate['batch_size']}, {estimate['operator_kind']} operator, "
+            f"{estimate['manifold_backend']} manifold, {estimate['workers']} process(es))"
+            f"\n  {parts}")
+
+
+def check_budget(
+    estimate: Dict[str, Any],
+    budget_mb: Optional[float],
+    on_exceed: str = "warn"
+) -> bool:
+    """
+    Compare an estimate with a budget in MiB. Returns True if it fits (or
+    there is no budget); otherwise logs a warning, or raises
+    MemoryBudgetError when `on_exceed` is "refuse".
+    """
+    if on_exceed not in ("warn", "refuse"):
+        raise ValueError(f"on_exceed must be 'warn' or 'refuse', got {on_exceed!r}")
+    if budget_mb is None:
+        return True
+    budget = float(budget_mb) * 2**20
+    if estimate["peak"] <= budget:
+        return True
+    message = (f"Estimated peak memory {format_bytes(estimate['peak'])} exceeds the "
+               f"budget of {format_bytes(budget)}")
+    if on_exceed == "refuse":
+        raise MemoryBudgetError(message)
+    logger.warning(message)
+    return False
+
+
+def budget_from_config(cfg: Dict[str, Any], budget_mb: Optional[float] = None) -> Optional[float]:
+    """`budget_mb` if given (e.g. from --memory-budget), else `memory.budget_mb`."""
+    if budget_mb is not None:
+        return budget_mb
+    return (cfg.get("memory") or {}).get("budget_mb")
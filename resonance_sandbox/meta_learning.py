@@ -1,5 +1,6 @@
 # resonance_sandbox/meta_learning.py
 
+import os
 import numpy as np
 import logging
 from typing import Optional, Tuple, List, Dict, Any
@@ -8,10 +9,104 @@ from .flux import RelationalFlux
 from .manifold import ContextualManifold
 from .operator import ResonanceOperator
 from .energy import compute_energy
+from .checkpoint import (
+    save_checkpoint,
+    load_checkpoint,
+    append_history,
+    read_history,
+    truncate_history,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def score_candidate(
+    candidate: ResonanceOperator,
+    flux: RelationalFlux,
+    null_penalty: float = 10.0
+) -> Dict[str, float]:
+    """
+    Score one candidate operator: total positive deformation for `flux`
+    minus `null_penalty` times the deformation caused by a zero flux.
+
+    Returns a dict with "fitness", "positive", "null" and "energy".
+    """
+    flux_dim, manifold_size = candidate.flux_dim, candidate.manifold_size
+
+    # Null-flux test: expect zero deformation
+    zero_flux = RelationalFlux(flux_dim, vector=[0.0] * flux_dim)
+    m_null = ContextualManifold(manifold_size)
+    candidate.operate(zero_flux, m_null)
+    null_violation = sum(abs(v) for row in m_null.adj for v in row)
+
+    # Positive-flux test: expect substantial deformation
+    m_pos = ContextualManifold(manifold_size)
+    candidate.operate(flux, m_pos)
+    positive_delta = sum(abs(m_pos.adj[i][j])
+                         for i in range(manifold_size)
+                         for j in range(manifold_size))
+
+    # Compute energy impact
+    energy = compute_energy(m_pos)
+
+    # Fitness: reward positive effect, penalize null violations
+    return {
+        "fitness": positive_delta - null_penalty * null_violation,
+        "positive": positive_delta,
+        "null": null_violation,
+        "energy": energy,
+    }
+
+
+def perturbed_candidate(
+    base_W: np.ndarray,
+    damping: float,
+    seed: int,
+    noise_scale: float = 0.1
+) -> Tuple[ResonanceOperator, RelationalFlux]:
+    """
+    Deterministically rebuild the candidate (and its test flux) derived from
+    `base_W` by `seed`, so remote workers and the coordinator agree on it.
+    """
+    manifold_size, flux_dim = base_W.shape
+    rng = np.random.default_rng(seed)
+    candidate = ResonanceOperator.__new__(ResonanceOperator)
+    candidate.flux_dim, candidate.manifold_size = flux_dim, manifold_size
+    candidate.damping = damping
+    candidate.rng = rng
+    candidate.W = base_W + rng.standard_normal((manifold_size, flux_dim)) * noise_scale
+    flux = RelationalFlux(flux_dim, vector=rng.standard_normal(flux_dim))
+    return candidate, flux
+
+
+def evaluate_candidates(
+    base_W: np.ndarray,
+    damping: float,
+    seeds: List[int],
+    noise_scale: float = 0.1,
+    null_penalty: float = 10.0
+) -> List[Dict[str, float]]:
+    """Score the seed-derived candidates of `base_W` (one work unit)."""
+    results = []
+    for seed in seeds:
+        candidate, flux = perturbed_candidate(base_W, damping, seed, noise_scale)
+        scores = score_candidate(candidate, flux, null_penalty)
+        scores["seed"] = seed
+        results.append(scores)
+    return results
+
+
+def _dense_start(
+    base_operator: Optional[ResonanceOperator],
+    flux_dim: int,
+    manifold_size: int,
+    seed: Any
+) -> ResonanceOperator:
+    """The starting operator as a dense one (searches update an explicit W)."""
+    op = base_operator or ResonanceOperator(flux_dim, manifold_size, seed=seed)
+    return op.as_dense(seed=seed)
+
+
 def random_search(
     flux_dim: int,
     manifold_size: int,
@@ -20,7 +115,12 @@ def random_search(
     pop_size: int = 20,
     noise_scale: float = 0.1,
     null_penalty: float = 10.0,
-    return_history: bool = False
+    return_history: bool = False,
+    seed: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 10,
+    resume: bool = False,
+    history_path: Optional[str] = None
 ) -> Tuple[ResonanceOperator, float, List[Dict[str, Any]]]:
     """
     Perform a random search over ResonanceOperator weights to optimize semantic–
@@ -44,6 +144,21 @@ def random_search(
         Penalty multiplier for null‐flux violations.
     return_history : bool
         If True, returns a history of generation metrics.
+    seed : Optional[int]
+        Seed for the initial operator and the search RNG.
+    checkpoint_path : Optional[str]
+        If given, optimizer state (current/best W, RNG state, generation and
+        history length) is written atomically to this ``.npz`` file.
+    checkpoint_every : int
+        Checkpoint interval in generations. The final generation is always
+        checkpointed.
+    resume : bool
+        If True and `checkpoint_path` exists, continue from the saved state.
+        The resumed run is bit-identical to an uninterrupted one.
+    history_path : Optional[str]
+        JSON-lines file that receives one record per generation instead of
+        keeping the history in memory. Defaults to
+        ``<checkpoint_path>.history.jsonl`` when checkpointing is enabled.
 
     Returns
     -------
@@ -54,13 +169,37 @@ def random_search(
     history : List[Dict[str, Any]]
         If return_history, list of dicts with per-generation metrics.
     """
+    op_seed, search_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(search_seed)
+
     # Initialize operator
-    op = base_operator or ResonanceOperator(flux_dim, manifold_size)
+    op = _dense_start(base_operator, flux_dim, manifold_size, op_seed)
     best_op = op
     best_fitness = float('-inf')
     history: List[Dict[str, Any]] = []
+    start_gen = 1
+
+    if history_path is None and checkpoint_path is not None:
+        history_path = checkpoint_path + ".history.jsonl"
+
+    if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+        arrays, meta = load_checkpoint(checkpoint_path)
+        op = ResonanceOperator(flux_dim, manifold_size, damping=meta["damping"])
+        op.W = arrays["W"]
+        best_op = ResonanceOperator(flux_dim, manifold_size, damping=meta["damping"])
+        best_op.W = arrays["best_W"]
+        best_fitness = meta["best_fitness"]
+        rng.bit_generator.state = meta["rng_state"]
+        start_gen = meta["generation"] + 1
+        if history_path is not None:
+            truncate_history(history_path, meta["history_count"])
+        logger.info("Resumed random search from %s at generation %d",
+                    checkpoint_path, meta["generation"])
+    elif history_path is not None and os.path.exists(history_path):
+        # Fresh run: do not mix records with a previous run's history
+        os.remove(history_path)
 
-    for gen in range(1, iterations + 1):
+    for gen in range(start_gen, iterations + 1):
         gen_best: Dict[str, Any] = {
             "generation": gen,
             "fitness": float('-inf'),
@@ -72,37 +211,16 @@ def random_search(
         for _ in range(pop_size):
             # Create a candidate by perturbing weights
             candidate = ResonanceOperator(flux_dim, manifold_size, damping=op.damping)
-            candidate.W = op.W + np.random.randn(manifold_size, flux_dim) * noise_scale
+            candidate.W = op.W + rng.standard_normal((manifold_size, flux_dim)) * noise_scale
 
-            # Null-flux test: expect zero deformation
-            zero_flux = RelationalFlux(flux_dim, vector=[0.0] * flux_dim)
-            m_null = ContextualManifold(manifold_size)
-            candidate.operate(zero_flux, m_null)
-            null_violation = sum(abs(v) for row in m_null.adj for v in row)
-
-            # Positive-flux test: expect substantial deformation
-            flux = RelationalFlux.random(flux_dim, distribution="normal")
-            m_pos = ContextualManifold(manifold_size)
-            candidate.operate(flux, m_pos)
-            positive_delta = sum(abs(m_pos.adj[i][j]) 
-                                 for i in range(manifold_size) 
-                                 for j in range(manifold_size))
-
-            # Compute energy impact
-            energy = compute_energy(m_pos)
-
-            # Fitness: reward positive effect, penalize null violations
-            fitness = positive_delta - null_penalty * null_violation
+            flux = RelationalFlux(flux_dim, vector=rng.standard_normal(flux_dim))
+            scores = score_candidate(candidate, flux, null_penalty)
+            fitness = scores["fitness"]
 
             # Update generation best
             if fitness > gen_best["fitness"]:
-                gen_best.update({
-                    "fitness": fitness,
-                    "positive": positive_delta,
-                    "null": null_violation,
-                    "energy": energy,
-                    "operator": candidate
-                })
+                gen_best.update(scores)
+                gen_best["operator"] = candidate
 
         # Promote to global best if improved
         if gen_best["fitness"] > best_fitness:
@@ -110,20 +228,223 @@ def random_search(
             best_op = gen_best["operator"]
 
         logger.info(
-            f"Gen {gen}/{iterations} | fitness={gen_best['fitness']:.4f} "
-            f"(+Δ={gen_best['positive']:.4f}, null={gen_best['null']:.4f}, energy={gen_best['energy']:.4f})"
+            "Gen %d/%d | fitness=%.4f (+Δ=%.4f, null=%.4f, energy=%.4f)",
+            gen, iterations, gen_best["fitness"], gen_best["positive"], gen_best["null"], gen_best["energy"]
         )
 
-        if return_history:
-            history.append({
-                "generation": gen,
-                "fitness": gen_best["fitness"],
-                "positive": gen_best["positive"],
-                "null": gen_best["null"],
-                "energy": gen_best["energy"]
-            })
+        record = {
+            "generation": gen,
+            "fitness": gen_best["fitness"],
+            "positive": gen_best["positive"],
+            "null": gen_best["null"],
+            "energy": gen_best["energy"]
+        }
+        if history_path is not None:
+            append_history(history_path, record)
+        elif return_history:
+            history.append(record)
+
+        if checkpoint_path is not None and (gen % checkpoint_every == 0 or gen == iterations):
+            save_checkpoint(
+                checkpoint_path,
+                {"W": op.W, "best_W": best_op.W},
+                {
+                    "generation": gen,
+                    "best_fitness": best_fitness,
+                    "damping": op.damping,
+                    "rng_state": rng.bit_generator.state,
+                    "history_count": gen,
+                },
+            )
 
     # Return history if requested
     if return_history:
+        if history_path is not None:
+            history = read_history(history_path)
         return best_op, best_fitness, history
     return best_op, best_fitness, []
+
+
+# Epsilon that compute_delta adds to every projection
+_DELTA_EPS = 1e-6
+
+
+def batch_fitness(
+    W: np.ndarray,
+    damping: float,
+    fluxes: np.ndarray,
+    null_penalty: float = 10.0
+) -> Dict[str, np.ndarray]:
+    """
+    Closed-form `score_candidate` terms for a batch of flux vectors of shape
+    (batch, flux_dim), without building any manifold.
+
+    On a zero manifold `operate` adds c·d dᵀ with d = W f + ε, so the
+    positive deformation is |c|·‖d‖₁², the energy is |c|·‖d‖₂² and the
+    null-flux violation is the constant |c|·(m ε)². Returns per-flux arrays
+    "fitness", "positive", "null" and "energy", plus the projections "d".
+    """
+    F = np.atleast_2d(np.asarray(fluxes, dtype=float))
+    c = abs(float(damping))
+    d = F @ W.T + _DELTA_EPS
+    l1 = np.abs(d).sum(axis=1)
+    positive = c * l1 * l1
+    null = np.full(F.shape[0], c * (W.shape[0] * _DELTA_EPS) ** 2)
+    return {
+        "fitness": positive - null_penalty * null,
+        "positive": positive,
+        "null": null,
+        "energy": c * np.einsum("bi,bi->b", d, d),
+        "d": d,
+    }
+
+
+def gradient_train(
+    flux_dim: int,
+    manifold_size: int,
+    base_operator: Optional[ResonanceOperator] = None,
+    steps: int = 50,
+    batch_size: int = 32,
+    lr: float = 0.05,
+    optimizer: str = "adam",
+    momentum: float = 0.9,
+    betas: Tuple[float, float] = (0.9, 0.999),
+    weight_decay: float = 0.0,
+    null_penalty: float = 10.0,
+    return_history: bool = False,
+    seed: Optional[int] = None
+) -> Tuple[ResonanceOperator, float, List[Dict[str, Any]]]:
+    """
+    Maximize the `random_search` fitness by gradient ascent on W.
+
+    The mean fitness over a mini-batch of Gaussian fluxes F has the exact
+    (sub)gradient
+
+        ∇_W = 2|c| / B · (‖d_b‖₁ · sign(d_b))ᵀ F,    d_b = W f_b + ε,
+
+    one (manifold_size × batch) by (batch × flux_dim) product per step; the
+    null-flux penalty is constant in W. Each step samples a fresh batch and
+    applies an Adam or SGD-with-momentum update, with optional L2
+    `weight_decay` (the raw fitness grows without bound with ‖W‖). Every
+    iterate is scored on one fixed evaluation batch (see `batch_fitness`)
+    so that the best operator is not picked by mini-batch noise.
+
+    Parameters
+    ----------
+    steps : int
+        Number of update steps; each evaluates 2·`batch_size` fluxes (the
+        fixed evaluation batch and a fresh training batch).
+    optimizer : str
+        "adam" or "sgd".
+    Other parameters match `random_search`.
+
+    Returns
+    -------
+    (best_operator, best_fitness, history) as in `random_search`, where
+    best_fitness is the mean fitness on the evaluation batch and history
+    has one record per step.
+    """
+    if optimizer not in ("adam", "sgd"):
+        raise ValueError(f"Unknown optimizer: {optimizer} (expected 'adam' or 'sgd')")
+    op_seed, search_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(search_seed)
+
+    op = _dense_start(base_operator, flux_dim, manifold_size, op_seed)
+    flux_dim, manifold_size = op.flux_dim, op.manifold_size
+    W = np.array(op.W, dtype=float)
+    c = abs(float(op.damping))
+    best_W, best_fitness = W.copy(), float('-inf')
+    history: List[Dict[str, Any]] = []
+    eval_fluxes = rng.standard_normal((batch_size, flux_dim))
+
+    first = np.zeros_like(W)
+    second = np.zeros_like(W)
+    beta1, beta2 = betas
+    for step in range(1, steps + 1):
+        terms = batch_fitness(W, op.damping, eval_fluxes, null_penalty)
+        fitness = float(terms["fitness"].mean())
+        if fitness > best_fitness:
+            best_fitness, best_W = fitness, W.copy()
+
+        F = rng.standard_normal((batch_size, flux_dim))
+        d = F @ W.T + _DELTA_EPS
+        coeff = np.sign(d) * np.abs(d).sum(axis=1, keepdims=True)
+        grad = (2.0 * c / batch_size) * (coeff.T @ F) - weight_decay * W
+
+        if optimizer == "adam":
+            first = beta1 * first + (1.0 - beta1) * grad
+            second = beta2 * second + (1.0 - beta2) * grad * grad
+            m_hat = first / (1.0 - beta1 ** step)
+            v_hat = second / (1.0 - beta2 ** step)
+            W = W + lr * m_hat / (np.sqrt(v_hat) + 1e-8)
+        else:
+            first = momentum * first + grad
+            W = W + lr * first
+
+        logger.debug("Step %d/%d | fitness=%.4f", step, steps, fitness)
+        if return_history:
+            history.append({
+                "generation": step,
+                "fitness": fitness,
+                "positive": float(terms["positive"].mean()),
+                "null": float(terms["null"].mean()),
+                "energy": float(terms["energy"].mean()),
+                # flux evaluations so far: the eval batch plus the training batch
+                "evaluations": 2 * step * batch_size,
+            })
+
+    # Score the final weights too
+    fitness = float(batch_fitness(W, op.damping, eval_fluxes, null_penalty)["fitness"].mean())
+    if fitness > best_fitness:
+        best_fitness, best_W = fitness, W
+    logger.info("Gradient training: %d steps x %d fluxes | best fitness=%.4f",
+                steps, batch_size, best_fitness)
+
+    best_op = ResonanceOperator(flux_dim, manifold_size, damping=op.damping)
+    best_op.W = best_W
+    return best_op, best_fitness, history
+
+
+def meta_learn(
+    base_operator: ResonanceOperator,
+    meta_cfg: Optional[Dict[str, Any]] = None,
+    seed: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+    return_history: bool = False
+) -> Tuple[ResonanceOperator, float, List[Dict[str, Any]]]:
+    """
+    Run the trainer selected by the `meta_learning` config section
+    (`method: random | gradient`) with that section's options.
+    """
+    meta_cfg = meta_cfg or {}
+    method = meta_cfg.get('method', 'random')
+    flux_dim, manifold_size = base_operator.flux_dim, base_operator.manifold_size
+    if method == 'gradient':
+        if checkpoint_path is not None:
+            raise ValueError("Checkpointing is only supported by the random-search trainer")
+        return gradient_train(
+            flux_dim, manifold_size,
+            base_operator=base_operator,
+            steps=meta_cfg.get('iterations', 50),
+            batch_size=meta_cfg.get('batch_size', 32),
+            lr=meta_cfg.get('lr', 0.05),
+            optimizer=meta_cfg.get('optimizer', 'adam'),
+            weight_decay=meta_cfg.get('weight_decay', 0.0),
+            return_history=return_history,
+            seed=seed,
+        )
+    if method != 'random':
+        raise ValueError(f"Unknown meta-learning method: {method} (expected 'random' or 'gradient')")
+    return random_search(
+        flux_dim, manifold_size,
+        base_operator=base_operator,
+        iterations=meta_cfg.get('iterations', 50),
+        pop_size=meta_cfg.get('pop_size', 20),
+        noise_scale=meta_cfg.get('noise_scale', 0.1),
+        return_history=return_history,
+        seed=seed,
+        checkpoint_path=checkpoint_path,
+        checkpoint_every=meta_cfg.get('checkpoint_every', 10),
+        resume=resume,
+    )
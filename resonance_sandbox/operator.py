@@ -3,9 +3,13 @@
 import numpy as np
 import logging
 import json
-from typing import Optional, Union
+from typing import Dict, Optional, Sequence, Union, TYPE_CHECKING
 from .flux import RelationalFlux
 from .manifold import ContextualManifold
+from .tiled import get_engine
+
+if TYPE_CHECKING:
+    from .eventlog import DeformationLog
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +17,13 @@ class ResonanceOperator:
     """
     Operator mapping a RelationalFlux to deformations in a ContextualManifold.
     Guarantees a non-zero deformation even for edge‐case flux vectors.
+
+    The projection is a dense Gaussian matrix `W`; see `projections.py` for
+    structured kinds that avoid storing it.
     """
 
+    kind = "dense"
+
     def __init__(
         self,
         flux_dim: int,
@@ -42,51 +51,170 @@ class ResonanceOperator:
     def operate(
         self,
         flux: RelationalFlux,
-        manifold: ContextualManifold
+        manifold: ContextualManifold,
+        log: Optional["DeformationLog"] = None
     ) -> ContextualManifold:
         """
         Apply semantic flux → manifold deformation.
         Always injects a tiny epsilon so at least one entry changes.
-        """
-        # 1) Compute raw projection
-        delta = self.W @ flux.vector
 
-        # 2) Guarantee non-zero effect
-        epsilon = 1e-6
-        delta = delta + epsilon
-
-        # 3) Form outer-product deformation
-        delta_mat = np.outer(delta, delta) * self.damping
+        If `log` is given, the delta vector and damping are appended to it so
+        the manifold state can be replayed later.
+        """
+        # 1) Compute raw projection and 2) guarantee non-zero effect
+        delta = self.compute_delta(flux)
 
-        # 4) Apply and return
-        manifold.apply_deformation(delta_mat)
+        # 3) Form outer-product deformation and 4) apply; large and sparse
+        # manifolds take a rank-one kernel and never build the dense update
+        if manifold.low_rank_updates or get_engine().accepts(manifold.size):
+            manifold.apply_low_rank(delta[None, :], self.damping)
+        else:
+            delta_mat = np.outer(delta, delta)
+            delta_mat *= self.damping
+            manifold.apply_deformation(delta_mat)
+        if log is not None:
+            log.record(delta, self.damping, manifold)
         return manifold
 
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Project a flux vector of shape (flux_dim,) or a batch of shape
+        (batch, flux_dim) into manifold space, without epsilon.
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        if vectors.ndim == 1:
+            return self.W @ vectors
+        return vectors @ self.W.T
+
     def compute_delta(self, flux: RelationalFlux) -> np.ndarray:
         """Return the raw projection vector (with epsilon)."""
-        delta = self.W @ flux.vector
+        delta = self.project(flux.vector)
         return delta + 1e-6
 
+    def to_dense(self) -> np.ndarray:
+        """Return the projection as a dense (manifold_size, flux_dim) matrix."""
+        return self.W
+
+    def as_dense(self, seed: Optional[int] = None) -> 'ResonanceOperator':
+        """
+        This operator as a dense one with an explicit `W` (itself for the
+        dense kind). Code that reads or updates `W` directly, such as
+        checkpointing and weight searches, goes through this.
+        """
+        return self
+
+    def score_candidates(
+        self,
+        fluxes: Union[np.ndarray, Sequence[RelationalFlux]],
+        manifold: ContextualManifold,
+        spectral_bound: bool = False,
+        chunk: int = 4096
+    ) -> Dict[str, np.ndarray]:
+        """
+        Predict what `operate` would do to `manifold` for each candidate
+        flux, without copying or mutating it.
+
+        Each deformation is the rank-one c·d dᵀ (d = W f + ε), so with
+        E = ‖A‖_F² the result follows from dᵀAd and ‖d‖ alone:
+
+            E' = E + 2c dᵀAd + c²‖d‖⁴,   max |ΔA| = |c| max_i d_i².
+
+        Candidates are projected and scored in chunks of at most `chunk`
+        rows; the manifold is only read through `energy` and
+        `quadratic_form` (plus `spectral_radius` with `spectral_bound`). For
+        a pruned sparse manifold the prediction is before pruning.
+
+        Args:
+            fluxes: RelationalFlux objects or an array of shape
+                (n_candidates, flux_dim).
+            manifold: Manifold the candidates would be applied to.
+            spectral_bound: Also return an upper bound on the spectral
+                radius (costs one cached eigendecomposition of A).
+
+        Returns:
+            Dict of arrays of shape (n_candidates,):
+              - energy: predicted ‖A'‖_F² (as `manifold.energy()`)
+              - frobenius_norm: its square root (as `compute_energy`)
+              - energy_delta: E' - E
+              - max_delta: largest absolute entry change
+              - delta_norm: ‖d‖
+              - spectral_radius_bound: ρ(A) + |c|‖d‖² (Weyl; symmetric A),
+                only with `spectral_bound`
+        """
+        if manifold.size != self.manifold_size:
+            raise ValueError(f"Manifold must have {self.manifold_size} nodes, got {manifold.size}")
+        if isinstance(fluxes, np.ndarray):
+            F = np.atleast_2d(np.asarray(fluxes, dtype=float))
+        else:
+            F = np.array([f.vector for f in fluxes], dtype=float).reshape(-1, self.flux_dim)
+        if F.shape[1] != self.flux_dim:
+            raise ValueError(f"Fluxes must have {self.flux_dim} columns, got {F.shape[1]}")
+        c = float(self.damping)
+        E = manifold.energy()
+        n = F.shape[0]
+        # Keep each chunk's (rows, manifold_size) work arrays around 32 MiB
+        chunk = max(1, min(chunk, (1 << 22) // max(self.manifold_size, 1)))
+        quad, sq_norm, max_sq = np.empty(n), np.empty(n), np.empty(n)
+        for lo in range(0, n, chunk):
+            D = self.project(F[lo:lo + chunk]) + 1e-6
+            quad[lo:lo + chunk] = manifold.quadratic_form(D)
+            sq_norm[lo:lo + chunk] = np.einsum("bi,bi->b", D, D)
+            max_sq[lo:lo + chunk] = np.max(D * D, axis=1) if D.shape[1] else 0.0
+        energy = E + 2.0 * c * quad + c * c * sq_norm * sq_norm
+        # Rounding can push a cancelling deformation a hair below zero
+        energy = np.maximum(energy, 0.0)
+        scores = {
+            "energy": energy,
+            "frobenius_norm": np.sqrt(energy),
+            "energy_delta": energy - E,
+            "max_delta": abs(c) * max_sq,
+            "delta_norm": np.sqrt(sq_norm),
+        }
+        if spectral_bound:
+            scores["spectral_radius_bound"] = manifold.spectral_radius() + abs(c) * sq_norm
+        return scores
+
+    def _state(self) -> dict:
+        """Kind-specific serializable state (everything except the header)."""
+        return {"W": self.W.tolist()}
+
+    def _load_state(self, obj: dict) -> None:
+        self.W = np.array(obj["W"], dtype=float)
+
     def to_json(self) -> str:
         """Serialize internal state to JSON."""
         state = {
+            "kind": self.kind,
             "flux_dim": self.flux_dim,
             "manifold_size": self.manifold_size,
             "damping": self.damping,
-            "W": self.W.tolist()
         }
+        state.update(self._state())
         return json.dumps(state)
 
     @classmethod
     def from_json(cls, data: Union[str, dict]) -> 'ResonanceOperator':
-        """Deserialize from JSON."""
+        """
+        Deserialize from JSON. The "kind" field selects the operator class,
+        so any operator kind can be restored through this method.
+        """
         obj = json.loads(data) if isinstance(data, str) else data
-        op = cls(obj["flux_dim"], obj["manifold_size"], damping=obj["damping"])
-        op.W = np.array(obj["W"], dtype=float)
+        kind = obj.get("kind", "dense")
+        if kind != cls.kind:
+            from .projections import OPERATOR_KINDS
+            if kind not in OPERATOR_KINDS:
+                raise ValueError(f"Unknown operator kind: {kind}")
+            return OPERATOR_KINDS[kind].from_json(obj)
+        op = cls.__new__(cls)
+        op.flux_dim = obj["flux_dim"]
+        op.manifold_size = obj["manifold_size"]
+        op.damping = obj["damping"]
+        op.rng = np.random.default_rng()
+        op._load_state(obj)
         return op
 
     def __repr__(self) -> str:
         return (
-            f"ResonanceOperator(flux_dim={self.flux_dim}, "
+            f"{type(self).__name__}(flux_dim={self.flux_dim}, "
             f"manifold_size={self.manifold_size}, damping={self.damping})"
         )
@@ -0,0 +1,292 @@
+# resonance_sandbox/plan.py
+"""
+Multi-step run plans that share named objects in one process.
+
+A plan is a YAML list of steps. Each step names a `task` and refers to
+operators, manifolds and fluxes by name, so a later step reuses what an
+earlier one built or learned instead of recomputing it:
+
+    plan:
+      seed: 0
+      summary: runs/plan.json
+      steps:
+        - task: meta_learn          # learns into "op" (the configured operator)
+          iterations: 20
+        - task: save_operator
+          path: runs/op.json
+        - task: stability           # uses the learned "op"
+          repeat: 3
+        - task: energy_monitor
+          manifold: m
+          steps: 100
+
+Every step accepts `repeat: N`; each repetition gets its own seed derived
+from the plan seed. `run()` returns a JSON-serializable summary with the
+per-step results and timings.
+"""
+
+import json
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import yaml
+
+from .flux import RelationalFlux
+from .manifold import ContextualManifold
+from .operator import ResonanceOperator
+from .sparse_manifold import make_manifold, manifold_from_config
+from .projections import make_operator, operator_from_config
+from .stability import stability_test
+from .energy import compute_energy
+from .meta_learning import meta_learn
+from .human_interface import human_test, text_to_flux
+from .encoding import file_to_flux
+from .invariants import check_invariants
+from .streaming import MetricsAggregator
+from .checkpoint import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def load_plan(path: str) -> Dict[str, Any]:
+    """Load a plan from YAML (either top level or under a `plan:` key)."""
+    with open(path, "r") as f:
+        cfg = yaml.safe_load(f)
+    plan = cfg.get("plan", cfg)
+    if not isinstance(plan.get("steps"), list):
+        raise ValueError("Run plan needs a 'steps' list")
+    return plan
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert results (NumPy scalars/arrays, float dict keys) to plain JSON types."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class RunPlan:
+    """
+    Executes plan steps against a shared namespace of named objects.
+
+    Args:
+        cfg: Loaded config; supplies defaults for new operators/manifolds
+            and the `meta_learning` options.
+        operator: Initial operator, registered as "op" (default: built from
+            `cfg` with `seed`).
+        seed: Plan seed; None makes every step random.
+    """
+
+    def __init__(
+        self,
+        cfg: Dict[str, Any],
+        operator: Optional[ResonanceOperator] = None,
+        seed: Optional[int] = None
+    ):
+        self.cfg = cfg
+        self.seed = seed
+        self.objects: Dict[str, Any] = {
+            "op": operator if operator is not None else operator_from_config(cfg, seed=seed)
+        }
+        self._tasks: Dict[str, Callable[[Dict[str, Any], Any], Any]] = {
+            "operator": self._operator,
+            "manifold": self._manifold,
+            "flux": self._flux,
+            "operate": self._operate,
+            "energy": self._energy,
+            "energy_monitor": self._energy_monitor,
+            "stability": self._stability,
+            "meta_learn": self._meta_learn,
+            "human_test": self._human_test,
+            "invariants": self._invariants,
+            "save_operator": self._save_operator,
+            "load_operator": self._load_operator,
+            "save_manifold": self._save_manifold,
+        }
+
+    # -- object lookup ------------------------------------------------------
+
+    def _get(self, name: str, kind: type) -> Any:
+        obj = self.objects.get(name)
+        if not isinstance(obj, kind):
+            raise KeyError(f"No {kind.__name__} named {name!r} in the plan")
+        return obj
+
+    def _op(self, step: Dict[str, Any]) -> ResonanceOperator:
+        return self._get(step.get("operator", "op"), ResonanceOperator)
+
+    def _named_manifold(self, step: Dict[str, Any], size: int) -> ContextualManifold:
+        """The step's named manifold, created empty on first use."""
+        name = step.get("manifold", "m")
+        if name not in self.objects:
+            self.objects[name] = manifold_from_config(self.cfg, size)
+        return self._get(name, ContextualManifold)
+
+    # -- tasks --------------------------------------------------------------
+
+    def _operator(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        # Unset fields (and kind-specific options) fall back to the config
+        options = dict(self.cfg.get("operator") or {})
+        options.update({k: v for k, v in step.items() if k not in ("task", "name", "repeat")})
+        op = make_operator(
+            options.pop("kind", "dense"),
+            options.pop("flux_dim", self.cfg.get("flux_dim", 16)),
+            options.pop("manifold_size", self.cfg.get("manifold_size", 8)),
+            damping=options.pop("damping", self.cfg.get("damping", 1.0)),
+            seed=seed,
+            **options
+        )
+        self.objects[step.get("name", "op")] = op
+        return {"kind": op.kind, "flux_dim": op.flux_dim,
+                "manifold_size": op.manifold_size, "damping": op.damping}
+
+    def _manifold(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        if "load" in step:
+            with open(step["load"], "r", encoding="utf-8") as f:
+                manifold = ContextualManifold.from_json(f.read())
+        else:
+            # Unset fields fall back to the `manifold` config section
+            options = dict(self.cfg.get("manifold") or {})
+            options.update({k: v for k, v in step.items() if k not in ("task", "name", "repeat", "size")})
+            manifold = make_manifold(step.get("size", self.cfg.get("manifold_size", 8)),
+                                     options.pop("backend", "dense"), **options)
+        self.objects[step.get("name", "m")] = manifold
+        return {"size": manifold.size, "backend": manifold.backend, "energy": manifold.energy()}
+
+    def _flux(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        dim = step.get("dim", self.cfg.get("flux_dim", 16))
+        if "text" in step:
+            flux = text_to_flux(step["text"], dim, seed=seed)
+        elif "file" in step:
+            flux = file_to_flux(step["file"], dim, seed=seed)
+        else:
+            flux = RelationalFlux(dim, seed=seed)
+        self.objects[step.get("name", "flux")] = flux
+        return {"dim": flux.dim, "magnitude": flux.magnitude()}
+
+    def _operate(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        op = self._op(step)
+        flux = self._get(step.get("flux", "flux"), RelationalFlux)
+        manifold = self._named_manifold(step, op.manifold_size)
+        op.operate(flux, manifold)
+        return {"energy": manifold.energy()}
+
+    def _energy(self, step: Dict[str, Any], seed: Any) -> Any:
+        manifold = self._get(step.get("manifold", "m"), ContextualManifold)
+        return compute_energy(manifold, full=step.get("full", True))
+
+    def _energy_monitor(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        op = self._op(step)
+        # Accumulate into a named manifold if one is given, else a fresh one
+        if "manifold" in step:
+            manifold = self._named_manifold(step, op.manifold_size)
+        else:
+            manifold = manifold_from_config(self.cfg, op.manifold_size)
+        rng = np.random.default_rng(seed)
+        agg = MetricsAggregator()
+        for _ in range(step.get("steps", 1)):
+            op.operate(RelationalFlux(op.flux_dim, vector=rng.standard_normal(op.flux_dim)), manifold)
+            agg.update(compute_energy(manifold, full=True))
+        return {"steps": agg.steps, "stats": agg.snapshot()}
+
+    def _stability(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        return stability_test(scales=step.get("scales"), full_metrics=True,
+                              seed=seed, operator=self._op(step))
+
+    def _meta_learn(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        name = step.get("operator", "op")
+        meta_cfg = dict(self.cfg.get("meta_learning") or {}, **step)
+        op = self._op(step)
+        best_op, best_fitness, _ = meta_learn(op, meta_cfg, seed=seed,
+                                              checkpoint_path=step.get("checkpoint"))
+        self.objects[step.get("save_as", name)] = best_op
+        return {"best_fitness": best_fitness}
+
+    def _human_test(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        op = self._op(step)
+        flux = file_to_flux(step["file"], op.flux_dim, seed=seed) if "file" in step else None
+        return human_test(step.get("text", step.get("file", "")), include_metrics=True,
+                          flux=flux, seed=seed, operator=op)
+
+    def _invariants(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        report = check_invariants(self._op(step), n_fluxes=step.get("n_fluxes", 1000), seed=seed)
+        return {k: v for k, v in report.items() if k == "passed" or isinstance(v, dict)}
+
+    def _save_operator(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        atomic_write_bytes(step["path"], self._op(step).to_json().encode("utf-8"))
+        return {"path": step["path"]}
+
+    def _load_operator(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        with open(step["path"], "r", encoding="utf-8") as f:
+            op = ResonanceOperator.from_json(f.read())
+        self.objects[step.get("name", "op")] = op
+        return {"kind": op.kind, "flux_dim": op.flux_dim, "manifold_size": op.manifold_size}
+
+    def _save_manifold(self, step: Dict[str, Any], seed: Any) -> Dict[str, Any]:
+        manifold = self._get(step.get("manifold", "m"), ContextualManifold)
+        atomic_write_bytes(step["path"], manifold.to_json().encode("utf-8"))
+        return {"path": step["path"]}
+
+    # -- driver -------------------------------------------------------------
+
+    def run(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run `steps` in order and return the summary."""
+        for i, step in enumerate(steps):
+            if step.get("task") not in self._tasks:
+                raise ValueError(f"Step {i}: unknown task {step.get('task')!r} "
+                                 f"(expected one of {sorted(self._tasks)})")
+        step_seeds = np.random.SeedSequence(self.seed).spawn(len(steps)) if self.seed is not None else None
+
+        started = time.perf_counter()
+        records = []
+        for i, step in enumerate(steps):
+            repeat = int(step.get("repeat", 1))
+            if step_seeds is None:
+                seeds: List[Optional[int]] = [None] * repeat
+            else:
+                seeds = [int(ss.generate_state(1)[0]) for ss in step_seeds[i].spawn(repeat)]
+            t0 = time.perf_counter()
+            results = [_jsonable(self._tasks[step["task"]](step, seed)) for seed in seeds]
+            elapsed = time.perf_counter() - t0
+            logger.info("Plan step %d (%s) x%d: %.3fs", i, step["task"], repeat, elapsed)
+            records.append({
+                "index": i,
+                "task": step["task"],
+                "repeat": repeat,
+                "seconds": elapsed,
+                "seeds": seeds,
+                "results": results,
+            })
+        return {
+            "seed": self.seed,
+            "seconds": time.perf_counter() - started,
+            "objects": {name: type(obj).__name__ for name, obj in self.objects.items()},
+            "steps": records,
+        }
+
+
+def run_plan(
+    plan: Dict[str, Any],
+    cfg: Dict[str, Any],
+    operator: Optional[ResonanceOperator] = None,
+    seed: Optional[int] = None,
+    summary_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run a loaded plan and write its JSON summary to `summary_path` (default
+    plan["summary"], if set). `seed` overrides plan["seed"].
+    """
+    seed = plan.get("seed") if seed is None else seed
+    summary = RunPlan(cfg, operator=operator, seed=seed).run(plan["steps"])
+    summary_path = summary_path or plan.get("summary")
+    if summary_path:
+        atomic_write_bytes(summary_path, json.dumps(summary, indent=2).encode("utf-8"))
+    return summary
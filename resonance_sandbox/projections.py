@@ -0,0 +1,289 @@
+# resonance_sandbox/projections.py
+
+import abc
+
+import numpy as np
+from typing import Any, Dict, Optional, Tuple, Type
+
+from .operator import ResonanceOperator
+
+# Scale of the identity bias that ResonanceOperator adds to its dense W
+_IDENTITY_BIAS = 0.01
+
+
+def _segment_starts(
+    segments: np.ndarray,
+    manifold_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Start offsets of the non-empty segments of a sorted segment-id array."""
+    bounds = np.searchsorted(segments, np.arange(manifold_size + 1))
+    nonempty = bounds[:-1] < bounds[1:]
+    return bounds[:-1], nonempty
+
+
+def _segment_sum(
+    values: np.ndarray,
+    starts: np.ndarray,
+    nonempty: np.ndarray,
+    manifold_size: int
+) -> np.ndarray:
+    """Sum a (batch, nnz) array over sorted output-row segments."""
+    out = np.zeros((values.shape[0], manifold_size))
+    if values.shape[1]:
+        out[:, nonempty] = np.add.reduceat(values, starts[nonempty], axis=1)
+    return out
+
+
+def _fwht(x: np.ndarray) -> np.ndarray:
+    """
+    Unnormalized fast Walsh–Hadamard transform along the last axis of a
+    (batch, n) array, n a power of two. O(n log n) per row.
+    """
+    x = np.array(x, dtype=float)
+    batch, n = x.shape
+    h = 1
+    while h < n:
+        y = x.reshape(batch, n // (2 * h), 2, h)
+        top = y[:, :, 0, :].copy()
+        y[:, :, 0, :] += y[:, :, 1, :]
+        y[:, :, 1, :] = top - y[:, :, 1, :]
+        h *= 2
+    return x
+
+
+class _StructuredOperator(ResonanceOperator, metaclass=abc.ABCMeta):
+    """
+    Base class for operators that never materialize the dense W.
+
+    Subclasses implement `_project_batch` for a (batch, flux_dim) array; the
+    identity bias of the dense operator is added implicitly so all kinds
+    share the same null-flux and small-flux behaviour.
+    """
+
+    def __init__(
+        self,
+        flux_dim: int,
+        manifold_size: int,
+        damping: float = 1.0,
+        seed: Optional[int] = None
+    ):
+        self.flux_dim = flux_dim
+        self.manifold_size = manifold_size
+        self.damping = damping
+        self.rng = np.random.default_rng(seed)
+
+    @abc.abstractmethod
+    def _project_batch(self, vectors: np.ndarray) -> np.ndarray:
+        """Project a (batch, flux_dim) array, without the identity bias."""
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=float)
+        batch = vectors.reshape(-1, self.flux_dim)
+        out = self._project_batch(batch)
+        k = min(self.manifold_size, self.flux_dim)
+        out[:, :k] += _IDENTITY_BIAS * batch[:, :k]
+        return out[0] if vectors.ndim == 1 else out
+
+    def to_dense(self, chunk: int = 4096) -> np.ndarray:
+        """Materialize W column-block by column-block (O(manifold_size·flux_dim))."""
+        W = np.empty((self.manifold_size, self.flux_dim))
+        for start in range(0, self.flux_dim, chunk):
+            stop = min(start + chunk, self.flux_dim)
+            eye = np.zeros((stop - start, self.flux_dim))
+            eye[np.arange(stop - start), np.arange(start, stop)] = 1.0
+            W[:, start:stop] = self.project(eye).T
+        return W
+
+    def as_dense(self, seed: Optional[int] = None) -> ResonanceOperator:
+        """A dense operator with the same projection, damping and shape."""
+        dense = ResonanceOperator(self.flux_dim, self.manifold_size, damping=self.damping, seed=seed)
+        dense.W = self.to_dense()
+        return dense
+
+
+class SparseResonanceOperator(_StructuredOperator):
+    """
+    Very sparse random projection (Achlioptas / Li et al.).
+
+    Entries are ±sqrt(s) with probability 1/s each and zero otherwise, which
+    keeps the unit variance of the dense Gaussian W. Storage and projection
+    cost are O(nnz) ≈ manifold_size·flux_dim/s; s defaults to sqrt(flux_dim).
+    """
+
+    kind = "sparse"
+
+    def __init__(
+        self,
+        flux_dim: int,
+        manifold_size: int,
+        damping: float = 1.0,
+        seed: Optional[int] = None,
+        density: Optional[float] = None
+    ):
+        super().__init__(flux_dim, manifold_size, damping=damping, seed=seed)
+        if density is None:
+            density = 1.0 / np.sqrt(flux_dim)
+        if not 0.0 < density <= 1.0:
+            raise ValueError(f"density must be in (0, 1], got {density}")
+        total = manifold_size * flux_dim
+        nnz = int(self.rng.binomial(total, density))
+        positions = np.sort(self.rng.choice(total, size=nnz, replace=False))
+        self.rows = (positions // flux_dim).astype(np.int64)
+        self.cols = (positions % flux_dim).astype(np.int64)
+        signs = self.rng.choice(np.array([-1.0, 1.0]), size=nnz)
+        self.vals = signs / np.sqrt(density)
+        self._index()
+
+    def _index(self) -> None:
+        self._starts, self._nonempty = _segment_starts(self.rows, self.manifold_size)
+
+    def _project_batch(self, vectors: np.ndarray) -> np.ndarray:
+        contrib = vectors[:, self.cols] * self.vals
+        return _segment_sum(contrib, self._starts, self._nonempty, self.manifold_size)
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows.tolist(),
+            "cols": self.cols.tolist(),
+            "vals": self.vals.tolist(),
+        }
+
+    def _load_state(self, obj: Dict[str, Any]) -> None:
+        self.rows = np.array(obj["rows"], dtype=np.int64)
+        self.cols = np.array(obj["cols"], dtype=np.int64)
+        self.vals = np.array(obj["vals"], dtype=float)
+        self._index()
+
+
+class HashingResonanceOperator(_StructuredOperator):
+    """
+    Sign-hashing (count-sketch) projection.
+
+    Every flux coordinate is hashed to one manifold row with a random sign,
+    so storage is O(flux_dim) and projection is a single O(flux_dim) pass.
+    The output is scaled by sqrt(manifold_size) to match the per-row variance
+    of the dense Gaussian W.
+    """
+
+    kind = "hashing"
+
+    def __init__(
+        self,
+        flux_dim: int,
+        manifold_size: int,
+        damping: float = 1.0,
+        seed: Optional[int] = None
+    ):
+        super().__init__(flux_dim, manifold_size, damping=damping, seed=seed)
+        self.buckets = self.rng.integers(0, manifold_size, size=flux_dim)
+        self.signs = self.rng.choice(np.array([-1, 1], dtype=np.int8), size=flux_dim)
+        self._index()
+
+    def _index(self) -> None:
+        self._order = np.argsort(self.buckets, kind="stable")
+        self._starts, self._nonempty = _segment_starts(
+            self.buckets[self._order], self.manifold_size
+        )
+        self._weights = (self.signs * np.sqrt(self.manifold_size))[self._order]
+
+    def _project_batch(self, vectors: np.ndarray) -> np.ndarray:
+        contrib = vectors[:, self._order] * self._weights
+        return _segment_sum(contrib, self._starts, self._nonempty, self.manifold_size)
+
+    def _state(self) -> Dict[str, Any]:
+        return {"buckets": self.buckets.tolist(), "signs": self.signs.tolist()}
+
+    def _load_state(self, obj: Dict[str, Any]) -> None:
+        self.buckets = np.array(obj["buckets"], dtype=np.int64)
+        self.signs = np.array(obj["signs"], dtype=np.int8)
+        self._index()
+
+
+class HadamardResonanceOperator(_StructuredOperator):
+    """
+    Subsampled randomized Hadamard transform (SRHT).
+
+    The flux is multiplied by random signs, zero-padded to the next power of
+    two, passed through a fast Walsh–Hadamard transform and `manifold_size`
+    of its rows are kept. Storage is O(flux_dim) and projection is
+    O(flux_dim log flux_dim); the unnormalized ±1 transform keeps the
+    variance of the dense Gaussian W.
+    """
+
+    kind = "srht"
+
+    def __init__(
+        self,
+        flux_dim: int,
+        manifold_size: int,
+        damping: float = 1.0,
+        seed: Optional[int] = None
+    ):
+        super().__init__(flux_dim, manifold_size, damping=damping, seed=seed)
+        self.padded_dim = 1 << max(0, int(flux_dim - 1).bit_length())
+        self.signs = self.rng.choice(np.array([-1, 1], dtype=np.int8), size=flux_dim)
+        self.sample = self.rng.choice(
+            self.padded_dim, size=manifold_size,
+            replace=manifold_size > self.padded_dim
+        )
+
+    def _project_batch(self, vectors: np.ndarray) -> np.ndarray:
+        padded = np.zeros((vectors.shape[0], self.padded_dim))
+        padded[:, :self.flux_dim] = vectors * self.signs
+        return _fwht(padded)[:, self.sample]
+
+    def _state(self) -> Dict[str, Any]:
+        return {"signs": self.signs.tolist(), "sample": self.sample.tolist()}
+
+    def _load_state(self, obj: Dict[str, Any]) -> None:
+        self.signs = np.array(obj["signs"], dtype=np.int8)
+        self.sample = np.array(obj["sample"], dtype=np.int64)
+        self.padded_dim = 1 << max(0, int(self.flux_dim - 1).bit_length())
+
+
+OPERATOR_KINDS: Dict[str, Type[ResonanceOperator]] = {
+    "dense": ResonanceOperator,
+    "sparse": SparseResonanceOperator,
+    "hashing": HashingResonanceOperator,
+    "srht": HadamardResonanceOperator,
+}
+
+
+def make_operator(
+    kind: str,
+    flux_dim: int,
+    manifold_size: int,
+    damping: float = 1.0,
+    seed: Optional[int] = None,
+    **options: Any
+) -> ResonanceOperator:
+    """
+    Build an operator of the given kind ("dense" | "sparse" | "hashing" | "srht").
+
+    Extra keyword options are forwarded to the operator class (e.g. `density`
+    for the sparse kind).
+    """
+    if kind not in OPERATOR_KINDS:
+        raise ValueError(
+            f"Unknown operator kind: {kind} (expected one of {sorted(OPERATOR_KINDS)})"
+        )
+    return OPERATOR_KINDS[kind](flux_dim, manifold_size, damping=damping, seed=seed, **options)
+
+
+def operator_from_config(cfg: Dict[str, Any], seed: Optional[int] = None) -> ResonanceOperator:
+    """
+    Build the operator described by a loaded config dict.
+
+    Reads `flux_dim`, `manifold_size`, `damping` and the optional `operator`
+    section (`kind` plus kind-specific options).
+    """
+    op_cfg = dict(cfg.get('operator') or {})
+    kind = op_cfg.pop('kind', 'dense')
+    return make_operator(
+        kind,
+        cfg.get('flux_dim', 16),
+        cfg.get('manifold_size', 8),
+        damping=cfg.get('damping', 1.0),
+        seed=seed,
+        **op_cfg
+    )
@@ -6,69 +6,215 @@ Command-line interface for the Resonance Sandbox package.
 Supports null-test, positive-test, stability-test, energy-monitor, and meta-learn commands.
 """
 import argparse
+import json
+from contextlib import nullcontext
+import numpy as np
 import yaml
 from .flux import RelationalFlux
 from .manifold import ContextualManifold
-from .operator import ResonanceOperator
+from .sparse_manifold import manifold_from_config
+from .projections import operator_from_config
 from .stability import stability_test
 from .energy import compute_energy
-from .meta_learning import random_search
+from .meta_learning import meta_learn
 from .human_interface import human_test
+from .encoding import file_to_flux
+from .invariants import check_invariants, format_report
+from .sensitivity import analyze_sensitivity, format_sensitivity
+from .streaming import MetricsAggregator, format_snapshot
+from .sweep import load_sweep_spec, run_sweep
+from .plan import load_plan, run_plan
+from .tiled import configure, configure_from_config
+from .logger import logging_from_config
+from .cache import ResultCache, cache_from_config
+from .memory import (
+    MemoryBudgetError,
+    MemoryTracker,
+    budget_from_config,
+    check_budget,
+    estimate_memory,
+    estimate_sweep_memory,
+    format_estimate,
+    format_memory_report,
+)
+from .distributed import (
+    Coordinator,
+    parse_address,
+    run_worker,
+    distributed_sweep,
+    distributed_random_search,
+)
 import sys
 
 def null_test(op, flux_dim, manifold_size):
     zero_flux = RelationalFlux(flux_dim, vector=[0.0]*flux_dim)
     m = ContextualManifold(manifold_size)
-    before = [row[:] for row in m.adj]
+    before = np.array(m.adj, dtype=float)
     op.operate(zero_flux, m)
-    max_delta = max(abs(m.adj[i][j] - before[i][j]) for i in range(manifold_size) for j in range(manifold_size))
+    max_delta = float(np.max(np.abs(np.array(m.adj) - before)))
     print("Null Test Δ-max:", max_delta)
 
 
 def positive_test(op, flux_dim, manifold_size):
     flux = RelationalFlux(flux_dim)
     m = ContextualManifold(manifold_size)
-    before = [row[:] for row in m.adj]
+    before = np.array(m.adj, dtype=float)
     op.operate(flux, m)
-    max_delta = max(abs(m.adj[i][j] - before[i][j]) for i in range(manifold_size) for j in range(manifold_size))
+    max_delta = float(np.max(np.abs(np.array(m.adj) - before)))
     print("Positive Test Δ-max:", max_delta)
 
 
-def stability_cmd(op, flux_dim, manifold_size):
-    results = stability_test(flux_dim, manifold_size)
+def invariants_cmd(op, n_fluxes, seed=None):
+    report = check_invariants(op, n_fluxes=n_fluxes, seed=seed)
+    print(format_report(report))
+    return report["passed"]
+
+
+def stability_cmd(op, flux_dim, manifold_size, seed=None):
+    results = stability_test(flux_dim, manifold_size, seed=seed, operator=op)
     for scale, (E0, E1) in results.items():
         print(f"Noise {scale}: E0={E0}, E1={E1}")
 
 
-def energy_monitor(op, flux_dim, manifold_size):
-    flux = RelationalFlux(flux_dim)
-    m = ContextualManifold(manifold_size)
-    op.operate(flux, m)
-    e = compute_energy(m)
-    print("Energy:", e)
+def sensitivity_cmd(op, flux_dim, seed=None):
+    report = analyze_sensitivity(op, RelationalFlux(flux_dim, seed=seed))
+    print(format_sensitivity(report))
+
+
+def energy_monitor(op, flux_dim, manifold_size, steps=1, snapshot_every=None, seed=None, cfg=None):
+    # The `manifold:` config section selects the backend (dense or pruned CSR)
+    cfg = cfg or {}
+    if steps <= 1:
+        flux = RelationalFlux(flux_dim, seed=seed)
+        m = manifold_from_config(cfg, manifold_size)
+        op.operate(flux, m)
+        e = compute_energy(m)
+        print("Energy:", e)
+        return
 
+    # Stream diagnostics of an accumulating manifold in constant memory
+    rng = np.random.default_rng(seed)
+    agg = MetricsAggregator(
+        snapshot_every=snapshot_every,
+        on_snapshot=lambda step, snap: print(format_snapshot(step, snap))
+    )
+    m = manifold_from_config(cfg, manifold_size)
+    for _ in range(steps):
+        op.operate(RelationalFlux(flux_dim, vector=rng.standard_normal(flux_dim)), m)
+        agg.update(compute_energy(m, full=True))
+    if not snapshot_every or steps % snapshot_every:
+        print(format_snapshot(agg.steps, agg.snapshot()))
 
-def meta_learn_cmd(flux_dim, manifold_size):
-    op = ResonanceOperator(flux_dim, manifold_size)
-    best_op, best_score, _ = random_search(flux_dim, manifold_size, base_operator=op)
+
+def meta_learn_cmd(op, flux_dim, manifold_size, meta_cfg=None, checkpoint=None, resume=False, seed=None):
+    best_op, best_score, _ = meta_learn(op, meta_cfg, seed=seed,
+                                        checkpoint_path=checkpoint, resume=resume)
     print("Meta-learned best fitness:", best_score)
 
 
-def human_cmd(op, text, flux_dim, manifold_size):
-    result = human_test(text, flux_dim, manifold_size, include_metrics=True)
+def sweep_cmd(spec_path, results=None, workers=None, coordinator=None):
+    spec = load_sweep_spec(spec_path)
+    if coordinator is not None:
+        summary = distributed_sweep(coordinator, spec, results_path=results)
+    else:
+        summary = run_sweep(spec, results_path=results, workers=workers)
+    print(f"Sweep {summary['task']}: {summary['completed']} run, "
+          f"{summary['skipped']} skipped of {summary['total']} → {summary['results']}")
+
+
+def distributed_meta_learn_cmd(coordinator, op, flux_dim, manifold_size, meta_cfg=None, seed=None):
+    meta_cfg = meta_cfg or {}
+    _, best_score, _ = distributed_random_search(
+        coordinator, flux_dim, manifold_size,
+        base_operator=op,
+        iterations=meta_cfg.get('iterations', 50),
+        pop_size=meta_cfg.get('pop_size', 20),
+        noise_scale=meta_cfg.get('noise_scale', 0.1),
+        seed=seed
+    )
+    print("Meta-learned best fitness:", best_score)
+
+
+def human_cmd(op, text, flux_dim, manifold_size, flux=None, seed=None):
+    result = human_test(text, flux_dim, manifold_size, include_metrics=True, flux=flux,
+                        seed=seed, operator=op)
     print("Human Test snippet:", result['snippet'])
     print("Metrics:", result['metrics'])
 
 
+def plan_cmd(plan_path, cfg, summary_path=None, seed=None):
+    plan = load_plan(plan_path)
+    summary_path = summary_path or plan.get("summary")
+    summary = run_plan(plan, cfg, seed=seed, summary_path=summary_path)
+    if summary_path is None:
+        print(json.dumps(summary, indent=2))
+        return
+    for record in summary["steps"]:
+        print(f"Step {record['index']} {record['task']} x{record['repeat']}: "
+              f"{record['seconds']:.3f}s")
+    print("Plan summary:", summary_path)
+
+
+def cached(cache, key, fn, *args, **kwargs):
+    # Replay/record fn's output through the result cache when it is enabled
+    if cache is None:
+        fn(*args, **kwargs)
+    else:
+        cache.run(key, fn, *args, **kwargs)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Resonance Sandbox CLI v0.2.0")
     parser.add_argument("--config", "-c", default="config/config.yaml", help="Path to config file.")
     parser.add_argument("--null-test", action="store_true")
     parser.add_argument("--positive-test", action="store_true")
     parser.add_argument("--stability-test", action="store_true")
+    parser.add_argument("--sensitivity", action="store_true",
+                        help="Closed-form sensitivity and stability bounds (no sampling).")
     parser.add_argument("--energy-monitor", action="store_true")
+    parser.add_argument("--monitor-steps", type=int, default=1, metavar="N",
+                        help="Steps for --energy-monitor; N > 1 streams running statistics.")
+    parser.add_argument("--snapshot-every", type=int, default=None, metavar="K",
+                        help="Print --energy-monitor statistics every K steps.")
     parser.add_argument("--meta-learn", action="store_true")
+    parser.add_argument("--trainer", choices=["random", "gradient"], default=None,
+                        help="Meta-learning method (overrides meta_learning.method).")
     parser.add_argument("--human-test", type=str, metavar="TEXT")
+    parser.add_argument("--human-file", type=str, metavar="PATH",
+                        help="Like --human-test, streaming the text of a (large) file.")
+    parser.add_argument("--check-invariants", type=int, metavar="N",
+                        help="Check operator invariants over N random fluxes.")
+    parser.add_argument("--plan", type=str, metavar="PLAN",
+                        help="Run a multi-step YAML run plan sharing operators/manifolds/fluxes.")
+    parser.add_argument("--plan-out", type=str, metavar="PATH",
+                        help="JSON summary path for --plan (default: plan 'summary', else stdout).")
+    parser.add_argument("--sweep", type=str, metavar="SPEC",
+                        help="Run a parameter sweep described by a YAML spec.")
+    parser.add_argument("--sweep-out", type=str, metavar="PATH",
+                        help="Results table for --sweep (default: spec 'results').")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --sweep (default: all cores).")
+    parser.add_argument("--coordinator", type=str, metavar="HOST:PORT",
+                        help="Serve --sweep/--meta-learn work to remote workers on this address.")
+    parser.add_argument("--worker", type=str, metavar="HOST:PORT",
+                        help="Run as a worker for the coordinator at this address.")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Threads for tiled kernels on large manifolds (default: config/all cores).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs.")
+    parser.add_argument("--cache", dest="cache", action="store_true", default=None,
+                        help="Reuse cached results of seeded stability/energy/human tests.")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="Ignore the result cache even if enabled in the config.")
+    parser.add_argument("--checkpoint", type=str, metavar="PATH",
+                        help="Checkpoint file for --meta-learn (written periodically).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume --meta-learn from --checkpoint if it exists.")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Print traced and peak memory per command after the run.")
+    parser.add_argument("--memory-estimate", action="store_true",
+                        help="Print the estimated peak memory of the configured run and exit.")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="Memory budget in MiB (default: memory.budget_mb from the config).")
     args = parser.parse_args()
 
     try:
@@ -77,23 +223,110 @@ def main():
         print("Failed to load config:", e, file=sys.stderr)
         sys.exit(1)
 
+    logging_from_config(cfg)
+    if args.trainer is not None:
+        cfg['meta_learning'] = dict(cfg.get('meta_learning') or {}, method=args.trainer)
+    method = (cfg.get('meta_learning') or {}).get('method', 'random')
+    if args.coordinator and args.meta_learn and method != 'random':
+        print(f"Distributed --meta-learn only supports the random trainer, not {method!r}",
+              file=sys.stderr)
+        sys.exit(1)
+    configure_from_config(cfg)
+    if args.threads is not None:
+        configure(threads=args.threads)
+
+    if args.worker:
+        host, port = parse_address(args.worker)
+        print("Worker completed units:", run_worker(host, port))
+        return
+
+    # Check the predicted footprint before anything large is allocated
+    estimate = estimate_memory(cfg)
+    if args.sweep and not args.coordinator:
+        # Each local sweep process builds its own operator and manifold
+        sweep_estimate = estimate_sweep_memory(cfg, load_sweep_spec(args.sweep),
+                                               workers=args.workers)
+        if sweep_estimate['peak'] > estimate['peak']:
+            estimate = sweep_estimate
+    if args.memory_estimate:
+        print(format_estimate(estimate))
+        return
+    try:
+        check_budget(estimate, budget_from_config(cfg, args.memory_budget),
+                     (cfg.get('memory') or {}).get('on_exceed', 'warn'))
+    except MemoryBudgetError as e:
+        print("Refusing to run:", e, file=sys.stderr)
+        sys.exit(1)
+
+    coordinator = None
+    if args.coordinator:
+        host, port = parse_address(args.coordinator)
+        coordinator = Coordinator(host, port).start()
+
+    tracker = MemoryTracker().start() if args.memory_report else None
+    stage = tracker.stage if tracker is not None else (lambda name: nullcontext())
+
     flux_dim = cfg.get('flux_dim', 16)
     manifold_size = cfg.get('manifold_size', 8)
-    damping = cfg.get('damping', 1.0)
-    op = ResonanceOperator(flux_dim, manifold_size, damping=damping)
+    with stage("operator"):
+        op = operator_from_config(cfg, seed=args.seed)
 
     if args.null_test:
-        null_test(op, flux_dim, manifold_size)
+        with stage("null-test"):
+            null_test(op, flux_dim, manifold_size)
     if args.positive_test:
-        positive_test(op, flux_dim, manifold_size)
+        with stage("positive-test"):
+            positive_test(op, flux_dim, manifold_size)
+    if args.check_invariants:
+        with stage("check-invariants"):
+            passed = invariants_cmd(op, args.check_invariants, seed=args.seed)
+        if not passed:
+            sys.exit(1)
+    cache = cache_from_config(cfg, enabled=args.cache)
+
     if args.stability_test:
-        stability_cmd(op, flux_dim, manifold_size)
+        with stage("stability-test"):
+            key = ResultCache.key("stability-test", cfg, args.seed, op)
+            cached(cache, key, stability_cmd, op, flux_dim, manifold_size, seed=args.seed)
+    if args.sensitivity:
+        with stage("sensitivity"):
+            key = ResultCache.key("sensitivity", cfg, args.seed, op)
+            cached(cache, key, sensitivity_cmd, op, flux_dim, seed=args.seed)
     if args.energy_monitor:
-        energy_monitor(op, flux_dim, manifold_size)
-    if args.meta_learn:
-        meta_learn_cmd(flux_dim, manifold_size)
+        with stage("energy-monitor"):
+            key = ResultCache.key("energy-monitor", cfg, args.seed, op, steps=args.monitor_steps,
+                                  snapshot_every=args.snapshot_every)
+            cached(cache, key, energy_monitor, op, flux_dim, manifold_size, steps=args.monitor_steps,
+                   snapshot_every=args.snapshot_every, seed=args.seed, cfg=cfg)
+    if args.meta_learn and coordinator is not None:
+        with stage("meta-learn"):
+            distributed_meta_learn_cmd(coordinator, op, flux_dim, manifold_size,
+                                       cfg.get('meta_learning'), seed=args.seed)
+    elif args.meta_learn:
+        with stage("meta-learn"):
+            meta_learn_cmd(op, flux_dim, manifold_size, cfg.get('meta_learning'),
+                           checkpoint=args.checkpoint, resume=args.resume, seed=args.seed)
+    if args.plan:
+        with stage("plan"):
+            plan_cmd(args.plan, cfg, summary_path=args.plan_out, seed=args.seed)
+    if args.sweep:
+        with stage("sweep"):
+            sweep_cmd(args.sweep, results=args.sweep_out, workers=args.workers,
+                      coordinator=coordinator)
     if args.human_test:
-        human_cmd(op, args.human_test, flux_dim, manifold_size)
+        with stage("human-test"):
+            key = ResultCache.key("human-test", cfg, args.seed, op, text=args.human_test)
+            cached(cache, key, human_cmd, op, args.human_test, flux_dim, manifold_size, seed=args.seed)
+    if args.human_file:
+        with stage("human-file"):
+            human_cmd(op, args.human_file, flux_dim, manifold_size,
+                      flux=file_to_flux(args.human_file, flux_dim, seed=args.seed), seed=args.seed)
+
+    if coordinator is not None:
+        coordinator.shutdown(grace=2.0)
+    if tracker is not None:
+        tracker.stop()
+        print(format_memory_report(tracker.report()))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+bench_tiled.py
+
+Thread-scaling benchmark for the tiled manifold kernels:
+- Times rank-one deformation (the `operate` hot path), dense deformation
+  and energy on an n×n symmetric manifold for each thread count.
+- Reports best-of-N wall time, speedup and parallel efficiency against one
+  thread, plus the plain single-call NumPy baseline.
+
+Example:
+    python -m resonance_sandbox.scripts.bench_tiled --size 8192 --threads 1 2 4 8 16
+"""
+
+import time
+import argparse
+import numpy as np
+
+from resonance_sandbox.tiled import TiledEngine
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tiled manifold kernels")
+    parser.add_argument("--size", type=int, default=8192, help="Manifold size n")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--tile", type=int, default=256, help="Tile edge length")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    n = args.size
+    rng = np.random.default_rng(0)
+    adj = rng.standard_normal((n, n))
+    adj = (adj + adj.T) / 2
+    delta = rng.standard_normal(n)
+    vectors, coeffs = delta[None, :], np.array([1e-3])
+    mat = np.outer(delta, delta) * 1e-3
+    out = np.empty_like(adj)
+
+    print(f"n={n} tile={args.tile} ({adj.nbytes / 2**20:.0f} MiB matrix)")
+    baseline = {
+        "rank-one": best_time(lambda: adj + np.outer(delta, delta) * 1e-3, args.repeat),
+        "deform": best_time(lambda: adj + (mat + mat.T) / 2.0, args.repeat),
+        "energy": best_time(lambda: np.sum(adj * adj), args.repeat),
+    }
+    print("numpy   " + "  ".join(f"{k}={v * 1e3:8.1f}ms" for k, v in baseline.items()))
+
+    single = None
+    for threads in args.threads:
+        engine = TiledEngine(threads=threads, tile=args.tile, min_size=0)
+        engine.energy(adj, symmetric=True)  # start the pool outside the timings
+        timings = {
+            "rank-one": best_time(lambda: engine.low_rank(adj, vectors, coeffs, True, out), args.repeat),
+            "deform": best_time(lambda: engine.deform(adj, mat, True, out), args.repeat),
+            "energy": best_time(lambda: engine.energy(adj, symmetric=True), args.repeat),
+        }
+        engine.close()
+        single = single or timings
+        print(f"{threads:>3} thr " + "  ".join(
+            f"{k}={v * 1e3:8.1f}ms x{single[k] / v:5.2f} ({single[k] / v / threads:4.0%})"
+            for k, v in timings.items()
+        ))
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ Advanced asset generation for Resonance Sandbox:
 - Generates semantic–physical "resonance" samples.
 - Outputs adjacency matrices (CSV), graph visualizations (PNG), and metadata (JSON).
 - Supports CLI overrides and progress reporting.
+- With --seed, assets are reproducible and can be served from the result cache.
+- With --memory-report, prints traced/peak memory per stage; a memory budget
+  (--memory-budget or `memory.budget_mb`) is checked before generation starts.
 """
 
 import os
@@ -15,14 +18,25 @@ import json
 import yaml
 import argparse
 import logging
+from contextlib import nullcontext
 import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 
 from resonance_sandbox.flux import RelationalFlux
-from resonance_sandbox.manifold import ContextualManifold
-from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.sparse_manifold import manifold_from_config
+from resonance_sandbox.projections import operator_from_config
+from resonance_sandbox.cache import ResultCache, cache_from_config
+from resonance_sandbox.memory import (
+    MemoryBudgetError,
+    MemoryTracker,
+    budget_from_config,
+    check_budget,
+    estimate_memory,
+    format_estimate,
+    format_memory_report,
+)
 
 def setup_logger(log_file=None):
     logger = logging.getLogger()
@@ -41,68 +55,143 @@ def load_config(path):
     with open(path, 'r') as f:
         return yaml.safe_load(f)
 
-def save_metadata(meta, out_path):
-    with open(out_path, 'w') as f:
-        json.dump(meta, f, indent=2)
-
-def generate_assets(cfg_path, logger):
-    cfg = load_config(cfg_path)
-    flux_dim      = cfg['flux_dim']
-    manifold_size = cfg['manifold_size']
-    damping       = cfg['damping']
-    count         = cfg['generate_assets']['count']
-    out_dir       = cfg['generate_assets']['output_dir']
-    os.makedirs(out_dir, exist_ok=True)
-
-    logger.info(f"Generating {count} assets to '{out_dir}'…")
-    metadata_list = []
-
-    for i in tqdm(range(count), desc="Assets"):
-        flux     = RelationalFlux(flux_dim)
-        manifold = ContextualManifold(manifold_size)
-        op       = ResonanceOperator(flux_dim, manifold_size, damping=damping)
-        op.operate(flux, manifold)
-        adj = np.array(manifold.adj)
-
-        # 1) Save adjacency CSV
-        csv_path = os.path.join(out_dir, f"adj_{i:03d}.csv")
-        np.savetxt(csv_path, adj, delimiter=",")
-        logger.debug(f"Saved CSV: {csv_path}")
-
-        # 2) Build and save graph PNG
-        G = nx.from_numpy_array(adj)
-        plt.figure(figsize=(6,6))
-        pos = nx.circular_layout(G)
-        weights = [abs(G[u][v]['weight']) for u,v in G.edges()]
-        nx.draw(
-            G, pos,
-            with_labels=True,
-            node_size=300,
-            edge_color=weights,
-            edge_cmap=plt.cm.viridis,
-            width=[max(0.5, w*5) for w in weights]
-        )
-        plt.title(f"Resonance Graph #{i:03d}")
-        png_path = os.path.join(out_dir, f"graph_{i:03d}.png")
-        plt.savefig(png_path, bbox_inches='tight')
-        plt.close()
-        logger.debug(f"Saved PNG: {png_path}")
-
-        # 3) Collect per‐asset metadata
-        metadata_list.append({
-            "index": i,
-            "flux_vector": flux.vector.tolist(),
-            "damping": damping,
-            "max_edge_weight": float(adj.max()),
-            "min_edge_weight": float(adj.min()),
-            "csv_path": csv_path,
-            "png_path": png_path
-        })
-
-    # Save metadata JSON
+def save_metadata(entries, out_path):
+    # Entries are written as they are produced instead of held in a list;
+    # the file only replaces out_path once it is complete
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write("[")
+        sep = "\n"
+        for entry in entries:
+            f.write(sep + json.dumps(entry, indent=2))
+            sep = ",\n"
+        f.write("\n]" if sep != "\n" else "]")
+    os.replace(tmp_path, out_path)
+
+def _csr_rows(manifold, lo, hi):
+    # Dense copy of rows lo:hi of a sparse (CSR) manifold
+    indptr, indices, data = manifold.csr
+    block = np.zeros((hi - lo, manifold.size))
+    start, stop = indptr[lo], indptr[hi]
+    rows = np.repeat(np.arange(hi - lo), np.diff(indptr[lo:hi + 1]))
+    block[rows, indices[start:stop]] = data[start:stop]
+    return block
+
+def save_adjacency_csv(manifold, csv_path, block_rows=1024):
+    """Dense adjacency CSV; sparse manifolds are written a block of rows at a time."""
+    if manifold.backend != "csr":
+        np.savetxt(csv_path, manifold.adj, delimiter=",")
+        return
+    with open(csv_path, "wb") as f:
+        for lo in range(0, manifold.size, block_rows):
+            hi = min(lo + block_rows, manifold.size)
+            np.savetxt(f, _csr_rows(manifold, lo, hi), delimiter=",")
+
+def manifold_graph(manifold):
+    """Weighted graph of the nonzero entries; O(edges) for the sparse backend."""
+    if manifold.backend != "csr":
+        return nx.from_numpy_array(manifold.adj)
+    indptr, indices, data = manifold.csr
+    rows = np.repeat(np.arange(manifold.size), np.diff(indptr))
+    G = nx.Graph()
+    G.add_nodes_from(range(manifold.size))
+    G.add_weighted_edges_from(zip(rows.tolist(), indices.tolist(), data.tolist()))
+    return G
+
+def edge_extremes(manifold):
+    """Largest and smallest adjacency entry (pruned entries count as zero)."""
+    if manifold.backend != "csr":
+        adj = manifold.adj
+        return {"max_edge_weight": float(adj.max()), "min_edge_weight": float(adj.min())}
+    _, _, data = manifold.csr
+    values = data if manifold.nnz == manifold.size ** 2 else np.append(data, 0.0)
+    return {"max_edge_weight": float(values.max()), "min_edge_weight": float(values.min())}
+
+def render_asset(flux, op, manifold, i, csv_path, png_path, logger):
+    op.operate(flux, manifold)
+
+    # 1) Save adjacency CSV
+    save_adjacency_csv(manifold, csv_path)
+    logger.debug("Saved CSV: %s", csv_path)
+
+    # 2) Build and save graph PNG (entries pruned by a sparse backend are not edges)
+    G = manifold_graph(manifold)
+    plt.figure(figsize=(6,6))
+    pos = nx.circular_layout(G)
+    weights = [abs(G[u][v]['weight']) for u,v in G.edges()]
+    nx.draw(
+        G, pos,
+        with_labels=True,
+        node_size=300,
+        edge_color=weights,
+        edge_cmap=plt.cm.viridis,
+        width=[max(0.5, w*5) for w in weights]
+    )
+    plt.title(f"Resonance Graph #{i:03d}")
+    plt.savefig(png_path, bbox_inches='tight')
+    plt.close()
+    logger.debug("Saved PNG: %s", png_path)
+    return edge_extremes(manifold)
+
+def generate_assets(cfg_path, logger, seed=None, cache=None, tracker=None):
+    stage = tracker.stage if tracker is not None else (lambda name: nullcontext())
+    with stage("setup"):
+        cfg = load_config(cfg_path)
+        flux_dim      = cfg['flux_dim']
+        manifold_size = cfg['manifold_size']
+        damping       = cfg['damping']
+        count         = cfg['generate_assets']['count']
+        out_dir       = cfg['generate_assets']['output_dir']
+        os.makedirs(out_dir, exist_ok=True)
+
+    logger.info("Generating %d assets to '%s'…", count, out_dir)
+    # Independent (flux, operator) seeds per asset; None keeps runs random
+    asset_seeds = np.random.SeedSequence(seed).spawn(count) if seed is not None else [None] * count
+
+    def assets():
+        for i in tqdm(range(count), desc="Assets"):
+            with stage("render asset"):
+                flux_seed, op_seed = asset_seeds[i].spawn(2) if asset_seeds[i] is not None else (None, None)
+                flux     = RelationalFlux(flux_dim, seed=flux_seed)
+                op       = operator_from_config(cfg, seed=op_seed)
+                csv_path = os.path.join(out_dir, f"adj_{i:03d}.csv")
+                png_path = os.path.join(out_dir, f"graph_{i:03d}.png")
+
+                key = ResultCache.key("generate_assets", cfg, seed, op, index=i) if cache else None
+                files = cache.get_files(key) if cache else None
+                if files is not None:
+                    # Cache hit: restore the rendered files instead of recomputing
+                    for path, name in ((csv_path, "adj.csv"), (png_path, "graph.png")):
+                        with open(path, "wb") as f:
+                            f.write(files[name])
+                    edges = json.loads(files["edges.json"])
+                    logger.debug("Restored asset %03d from cache", i)
+                else:
+                    edges = render_asset(flux, op, manifold_from_config(cfg, manifold_size), i,
+                                         csv_path, png_path, logger)
+                    if key is not None:
+                        with open(csv_path, "rb") as f_csv, open(png_path, "rb") as f_png:
+                            cache.put_files(key, {
+                                "adj.csv": f_csv.read(),
+                                "graph.png": f_png.read(),
+                                "edges.json": json.dumps(edges).encode("utf-8"),
+                            })
+
+            # 3) Per-asset metadata
+            yield {
+                "index": i,
+                "flux_vector": flux.vector.tolist(),
+                "damping": damping,
+                "max_edge_weight": edges["max_edge_weight"],
+                "min_edge_weight": edges["min_edge_weight"],
+                "csv_path": csv_path,
+                "png_path": png_path
+            }
+
+    # Save metadata JSON (written while the assets are generated)
     meta_path = os.path.join(out_dir, "metadata.json")
-    save_metadata(metadata_list, meta_path)
-    logger.info(f"Saved metadata JSON: {meta_path}")
+    save_metadata(assets(), meta_path)
+    logger.info("Saved metadata JSON: %s", meta_path)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -116,15 +205,49 @@ def main():
         "--log", "-l", default=None,
         help="Optional logfile to record debug messages."
     )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed for reproducible (and cacheable) assets."
+    )
+    parser.add_argument(
+        "--cache", dest="cache", action="store_true", default=None,
+        help="Reuse cached assets of seeded runs."
+    )
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_false",
+        help="Ignore the result cache even if enabled in the config."
+    )
+    parser.add_argument(
+        "--memory-report", action="store_true",
+        help="Print traced and peak memory per stage after generation."
+    )
+    parser.add_argument(
+        "--memory-budget", type=float, default=None, metavar="MB",
+        help="Memory budget in MiB (default: memory.budget_mb from the config)."
+    )
     args = parser.parse_args()
 
     logger = setup_logger(args.log)
+    tracker = MemoryTracker().start() if args.memory_report else None
     try:
-        generate_assets(args.config, logger)
+        cfg = load_config(args.config)
+        estimate = estimate_memory(cfg, assets=True)
+        logger.info("%s", format_estimate(estimate))
+        check_budget(estimate, budget_from_config(cfg, args.memory_budget),
+                     (cfg.get("memory") or {}).get("on_exceed", "warn"))
+        cache = cache_from_config(cfg, enabled=args.cache)
+        generate_assets(args.config, logger, seed=args.seed, cache=cache, tracker=tracker)
         logger.info("Asset generation completed successfully.")
+    except MemoryBudgetError as e:
+        logger.error("Refusing to generate assets: %s", e)
+        sys.exit(1)
     except Exception as e:
-        logger.error(f"Asset generation failed: {e}", exc_info=True)
+        logger.error("Asset generation failed: %s", e, exc_info=True)
         sys.exit(1)
+    finally:
+        if tracker is not None:
+            tracker.stop()
+            print(format_memory_report(tracker.report()))
 
 if __name__ == "__main__":
     main()
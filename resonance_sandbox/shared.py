@@ -0,0 +1,233 @@
+# resonance_sandbox/shared.py
+"""
+Shared-memory manifolds and operators for zero-copy multi-process readers.
+
+A SharedManifold keeps its adjacency in a `multiprocessing.shared_memory`
+block. Child processes attach to the same buffer through a small picklable
+handle instead of receiving a copy. A seqlock counter in the block header
+lets readers detect a concurrent write: the single writer makes the counter
+odd while it updates the matrix and even again afterwards, and readers retry
+until they observe the same even value before and after reading.
+
+Requires Python 3.8+ (multiprocessing.shared_memory).
+"""
+
+import json
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, NamedTuple, Optional, Union, List
+
+import numpy as np
+
+from .manifold import ContextualManifold
+from .operator import ResonanceOperator
+
+# Header: int64 sequence counter, padded to one cache line
+_HEADER_BYTES = 64
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without registering it with this process's
+    resource tracker, which would otherwise unlink it when we exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None  # type: ignore[assignment]
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register  # type: ignore[assignment]
+
+
+class SharedManifoldHandle(NamedTuple):
+    """Picklable reference to a SharedManifold block."""
+    name: str
+    size: int
+
+    def attach(self) -> 'SharedManifold':
+        return SharedManifold.attach(self)
+
+
+class SharedManifold(ContextualManifold):
+    """
+    ContextualManifold whose adjacency lives in shared memory.
+
+    The creating process owns the block and must call `unlink()` when done;
+    attached processes only `close()`. Exactly one process may write
+    (apply deformations or assign `adj`) at a time. Readers should go
+    through `read()`/`snapshot()` or the memoized diagnostics, which are
+    computed under the seqlock and invalidated when the writer bumps it.
+    """
+
+    def __init__(self, size: int, adj: Optional[Union[List[List[float]], np.ndarray]] = None):
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + max(size * size, 1) * 8)
+        self._setup(shm, size, owner=True)
+        self._seq[0] = 0
+        if adj is None:
+            self._adj[...] = 0.0
+        else:
+            arr = np.asarray(adj, dtype=float)
+            if arr.shape != (size, size):
+                raise ValueError(f"Adjacency must be {size}x{size}, got {arr.shape}")
+            self._adj[...] = arr
+
+    def _setup(self, shm: shared_memory.SharedMemory, size: int, owner: bool) -> None:
+        self._shm = shm
+        self._owner = owner
+        self._seq = np.ndarray((1,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self._adj = np.ndarray((size, size), dtype=np.float64, buffer=shm.buf,
+                               offset=_HEADER_BYTES)
+        self._cache: Dict[str, Any] = {}
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._seen_seq = -1
+
+    @classmethod
+    def from_manifold(cls, manifold: ContextualManifold) -> 'SharedManifold':
+        """Copy an existing manifold into a new shared block."""
+        return cls(manifold.size, manifold.adj)
+
+    @classmethod
+    def attach(cls, handle: SharedManifoldHandle) -> 'SharedManifold':
+        """Attach to the block named by `handle` without copying."""
+        obj = cls.__new__(cls)
+        obj._setup(_attach_block(handle.name), handle.size, owner=False)
+        return obj
+
+    @property
+    def handle(self) -> SharedManifoldHandle:
+        return SharedManifoldHandle(self._shm.name, self.size)
+
+    @property
+    def sequence(self) -> int:
+        """Current seqlock value; even when no write is in progress."""
+        return int(self._seq[0])
+
+    def __reduce__(self) -> Any:
+        # Pickle as a handle so pools and queues never copy the matrix
+        return (SharedManifold.attach, (self.handle,))
+
+    # -- writer side --------------------------------------------------------
+
+    def _store(self, adj: np.ndarray) -> None:
+        self._seq[0] += 1          # odd: write in progress
+        self._adj[...] = adj
+        self._seq[0] += 1          # even: consistent again
+        self.invalidate()
+        self._seen_seq = int(self._seq[0])
+
+    # -- reader side --------------------------------------------------------
+
+    def read(self, fn: Callable[[np.ndarray], Any], spin: float = 1e-4) -> Any:
+        """
+        Run `fn` on the shared adjacency (zero-copy, read-only view) and
+        return its result, retrying if a write overlapped the call.
+        """
+        view = self.adj
+        while True:
+            before = int(self._seq[0])
+            if before % 2:
+                time.sleep(spin)
+                continue
+            result = fn(view)
+            if int(self._seq[0]) == before:
+                return result
+
+    def snapshot(self) -> ContextualManifold:
+        """Consistent private copy of the current state."""
+        return ContextualManifold(self.size, self.read(np.array))
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        seq = int(self._seq[0])
+        if seq != self._seen_seq:
+            # Another process wrote since we last looked
+            self._cache.clear()
+            self._seen_seq = seq
+        if key in self._cache:
+            self._hits += 1
+            return self._cache[key]
+        self._misses += 1
+        value = self.read(lambda _: compute())
+        if int(self._seq[0]) == self._seen_seq:
+            self._cache[key] = value
+        return value
+
+    def close(self) -> None:
+        """
+        Detach from the block. Any `adj` views still held by the caller must
+        be dropped first, or the underlying buffer cannot be released.
+        """
+        self._cache.clear()
+        self._seq = None  # type: ignore[assignment]
+        self._adj = None  # type: ignore[assignment]
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the block; only the creating process should call this."""
+        self._shm.unlink()
+
+
+class SharedOperatorHandle(NamedTuple):
+    """
+    Picklable reference to a shared operator. Dense operators keep W in the
+    named block; structured kinds are small and travel as their JSON state.
+    """
+    name: Optional[str]
+    state: str
+    shape: tuple
+
+    def attach(self) -> ResonanceOperator:
+        return attach_operator(self)
+
+
+def share_operator(op: ResonanceOperator) -> SharedOperatorHandle:
+    """
+    Place a dense operator's W in shared memory and return a handle.
+
+    The caller owns the block; free it with `release_operator(handle)`.
+    """
+    if op.kind != "dense":
+        return SharedOperatorHandle(None, op.to_json(), ())
+    shm = shared_memory.SharedMemory(create=True, size=max(op.W.nbytes, 1))
+    W = np.ndarray(op.W.shape, dtype=np.float64, buffer=shm.buf)
+    W[...] = op.W
+    state = json.dumps({
+        "kind": op.kind,
+        "flux_dim": op.flux_dim,
+        "manifold_size": op.manifold_size,
+        "damping": op.damping,
+        "W": [],
+    })
+    _OWNED[shm.name] = shm
+    return SharedOperatorHandle(shm.name, state, op.W.shape)
+
+
+def attach_operator(handle: SharedOperatorHandle) -> ResonanceOperator:
+    """Rebuild an operator whose W is a read-only view of the shared block."""
+    op = ResonanceOperator.from_json(handle.state)
+    if handle.name is None:
+        return op
+    shm = _attach_block(handle.name)
+    W = np.ndarray(handle.shape, dtype=np.float64, buffer=shm.buf)
+    W.flags.writeable = False
+    op.W = W
+    op._shm = shm  # keep the mapping alive as long as the operator
+    return op
+
+
+def release_operator(handle: SharedOperatorHandle) -> None:
+    """Close and unlink a block created by `share_operator` in this process."""
+    shm = _OWNED.pop(handle.name, None) if handle.name else None
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+
+
+# Blocks created by share_operator in this process, kept open until released
+_OWNED: Dict[str, shared_memory.SharedMemory] = {}
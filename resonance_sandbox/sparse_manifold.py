@@ -0,0 +1,533 @@
+# resonance_sandbox/sparse_manifold.py
+"""
+Sparse (CSR) manifold backend with magnitude pruning.
+
+After many small-damping deformations most adjacency entries are
+negligible. `SparseManifold` keeps only the entries that survive pruning
+after every update: those with |A[i, j]| >= `threshold` and, with `top_k`,
+those among the k largest in row i *or* in row j (so the pattern of a
+symmetric matrix stays symmetric and each node keeps its strongest edges).
+
+Storage is three NumPy arrays (indptr, indices, data) and energy, degrees,
+edge statistics and the spectral radius (power iteration on the sparse
+matvec) cost O(retained edges). The rank-one updates that
+`ResonanceOperator.operate` produces are applied output-sensitively:
+per row, the only new entries that can survive are the columns with the
+largest |d_j|, found with one sort of d, so a step never touches n²
+entries. General rank-k updates and dense deltas are evaluated in blocks
+of rows, bounding memory at `block_rows · n`.
+
+Select it with `manifold: {backend: sparse, threshold: ..., top_k: ...}`
+in the config (see `manifold_from_config`).
+"""
+
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+import numpy as np
+
+from .manifold import ContextualManifold
+
+# Sizes up to this use a dense eigendecomposition for the spectral radius
+_DENSE_EIG_LIMIT = 1024
+# Elements per dense row block in the blocked update path (32 MiB of float64)
+_BLOCK_ELEMENTS = 1 << 22
+
+_CSR = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class SparseManifold(ContextualManifold):
+    """
+    ContextualManifold stored in CSR form and pruned after every mutation.
+
+    Args:
+        size: Number of nodes.
+        adj: Optional dense adjacency to start from (pruned on load).
+        threshold: Entries with smaller magnitude are dropped (exact zeros
+            are always dropped).
+        top_k: If set, keep only entries in the top-k of their row or of
+            their transposed row.
+    """
+
+    backend = "csr"
+    low_rank_updates = True
+
+    def __init__(
+        self,
+        size: int,
+        adj: Optional[Union[List[List[float]], np.ndarray]] = None,
+        threshold: float = 0.0,
+        top_k: Optional[int] = None
+    ):
+        if threshold < 0:
+            raise ValueError(f"threshold must be non-negative, got {threshold}")
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"top_k must be positive, got {top_k}")
+        self._cache: Dict[str, Any] = {}
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._size = int(size)
+        self.threshold = float(threshold)
+        self.top_k = None if top_k is None else int(top_k)
+        self._indptr = np.zeros(self._size + 1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int64)
+        self._data = np.zeros(0, dtype=float)
+        if adj is not None:
+            self._store_csr(self._from_dense(self._check_dense(adj)))
+
+    # -- storage ------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored entries."""
+        return int(self._data.size)
+
+    @property
+    def csr(self) -> _CSR:
+        """Read-only (indptr, indices, data) arrays."""
+        arrays = (self._indptr.view(), self._indices.view(), self._data.view())
+        for a in arrays:
+            a.flags.writeable = False
+        return arrays
+
+    @property
+    def adj(self) -> np.ndarray:
+        """Read-only dense copy of the adjacency (O(n²); avoid for large n)."""
+        def compute() -> np.ndarray:
+            dense = np.zeros((self._size, self._size))
+            dense[self._rows(), self._indices] = self._data
+            dense.flags.writeable = False
+            return dense
+        return self._cached("dense", compute)
+
+    @adj.setter
+    def adj(self, value: Union[List[List[float]], np.ndarray]) -> None:
+        self._store_csr(self._from_dense(self._check_dense(value)))
+
+    def _check_dense(self, value: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        arr = np.array(value, dtype=float)
+        if arr.shape != (self._size, self._size):
+            raise ValueError(f"Adjacency must be {self._size}x{self._size}, got {arr.shape}")
+        return arr
+
+    def copy(self) -> 'SparseManifold':
+        clone = SparseManifold(self._size, threshold=self.threshold, top_k=self.top_k)
+        clone._store_csr((self._indptr.copy(), self._indices.copy(), self._data.copy()))
+        return clone
+
+    def _store(self, adj: np.ndarray) -> None:
+        self._store_csr(self._from_dense(adj))
+
+    def _store_csr(self, csr: _CSR) -> None:
+        self._indptr, self._indices, self._data = csr
+        self.invalidate()
+
+    def _rows(self) -> np.ndarray:
+        return self._cached("rows", lambda: np.repeat(
+            np.arange(self._size, dtype=np.int64), np.diff(self._indptr)))
+
+    def _keys(self) -> np.ndarray:
+        """Sorted linear indices row·n + col of the stored entries."""
+        return self._cached("keys", lambda: self._rows() * self._size + self._indices)
+
+    def _contains(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Membership of linear indices in the stored pattern, and their positions."""
+        stored = self._keys()
+        if not stored.size:
+            return np.zeros(keys.shape, dtype=bool), np.zeros(keys.shape, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(stored, keys), stored.size - 1)
+        return stored[pos] == keys, pos
+
+    def lookup(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Values A[rows, cols] (zero where nothing is stored)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        hit, pos = self._contains(rows * self._size + np.asarray(cols, dtype=np.int64))
+        return np.where(hit, self._data[pos] if self._data.size else 0.0, 0.0)
+
+    def matvec(self, x: np.ndarray) -> np.ndarray:
+        """A @ x in O(nnz)."""
+        return np.bincount(self._rows(), weights=self._data * x[self._indices],
+                           minlength=self._size)
+
+    def quadratic_form(self, vectors: np.ndarray, chunk: Optional[int] = None) -> np.ndarray:
+        """
+        vᵀ A v per row of a (batch, size) array in O(batch · nnz). Rows are
+        processed `chunk` at a time; by default the (chunk, nnz) gathers stay
+        around 32 MiB each.
+        """
+        V = np.atleast_2d(np.asarray(vectors, dtype=float))
+        rows = self._rows()
+        if chunk is None:
+            chunk = max(1, (1 << 22) // max(self.nnz, 1))
+        out = np.empty(V.shape[0])
+        for lo in range(0, V.shape[0], chunk):
+            block = V[lo:lo + chunk]
+            gathered = block[:, rows]
+            gathered *= block[:, self._indices]
+            out[lo:lo + chunk] = gathered @ self._data
+        return out
+
+    # -- pruning ------------------------------------------------------------
+
+    def _select(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        vals: np.ndarray,
+        value_fn: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    ) -> _CSR:
+        """
+        Prune candidate entries (which must include every entry that could
+        survive in its row) and assemble CSR arrays. `value_fn(rows, cols)`
+        gives the new value of arbitrary entries, for the transposed
+        partners that top-k selection adds back.
+        """
+        n = self._size
+        keep = vals != 0
+        if self.threshold > 0:
+            keep &= np.abs(vals) >= self.threshold
+        idx = np.flatnonzero(keep)
+        if self.top_k is not None:
+            # Group by row, largest magnitude first: one int64 sort on
+            # row·m + magnitude rank instead of a two-key lexsort
+            by_mag = np.argsort(-np.abs(vals[idx]))
+            mag_rank = np.empty_like(by_mag)
+            mag_rank[by_mag] = np.arange(by_mag.size)
+            idx = idx[np.argsort(rows[idx] * max(idx.size, 1) + mag_rank)]
+            grouped = rows[idx]
+            rank = np.arange(idx.size) - np.searchsorted(grouped, np.arange(n))[grouped]
+            idx = idx[rank < self.top_k]
+        rows, cols, vals = rows[idx], cols[idx], vals[idx]
+        keys = rows * n + cols
+        order = np.argsort(keys)
+        if self.top_k is not None and keys.size:
+            # Add back transposed partners so the pattern stays symmetric
+            kept = keys[order]
+            t_keys = cols * n + rows
+            missing = kept[np.minimum(np.searchsorted(kept, t_keys), kept.size - 1)] != t_keys
+            if missing.any():
+                t_rows, t_cols = cols[missing], rows[missing]
+                t_vals = value_fn(t_rows, t_cols)
+                ok = (t_vals != 0) & (np.abs(t_vals) >= self.threshold)
+                rows = np.concatenate([rows, t_rows[ok]])
+                cols = np.concatenate([cols, t_cols[ok]])
+                vals = np.concatenate([vals, t_vals[ok]])
+                order = np.argsort(rows * n + cols)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order].astype(np.int64), vals[order].astype(float)
+
+    def prune(self, threshold: Optional[float] = None, top_k: Optional[int] = None) -> None:
+        """Re-prune the current entries, optionally tightening the settings first."""
+        if threshold is not None:
+            self.threshold = float(threshold)
+        if top_k is not None:
+            self.top_k = int(top_k)
+        symmetric = self.is_symmetric()
+        self._store_csr(self._select(self._rows(), self._indices, self._data, self.lookup))
+        self._keep_symmetric(symmetric)
+
+    def _block_rows(self) -> int:
+        return max(1, _BLOCK_ELEMENTS // max(self._size, 1))
+
+    def _blocked(
+        self,
+        block_fn: Callable[[int, int], np.ndarray],
+        value_fn: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    ) -> _CSR:
+        """
+        New CSR arrays for A + U, where `block_fn(r0, r1)` returns the dense
+        rows r0:r1 of U and `value_fn` its entries; rows are materialized a
+        block at a time and pruned before the next block.
+        """
+        n = self._size
+        old_rows = self._rows()
+        parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for r0 in range(0, n, self._block_rows()):
+            r1 = min(n, r0 + self._block_rows())
+            block = np.array(block_fn(r0, r1), dtype=float)
+            lo, hi = self._indptr[r0], self._indptr[r1]
+            np.add.at(block, (old_rows[lo:hi] - r0, self._indices[lo:hi]), self._data[lo:hi])
+            mask = block != 0
+            if self.threshold > 0:
+                mask &= np.abs(block) >= self.threshold
+            if self.top_k is not None and self.top_k < n:
+                scores = np.where(mask, np.abs(block), -1.0)
+                top = np.argpartition(-scores, self.top_k - 1, axis=1)[:, :self.top_k]
+                in_top = np.zeros_like(mask)
+                np.put_along_axis(in_top, top, True, axis=1)
+                mask &= in_top
+            r, c = np.nonzero(mask)
+            parts.append((r + r0, c, block[r, c]))
+        if parts:
+            rows, cols, vals = (np.concatenate(p) for p in zip(*parts))
+        else:
+            rows, cols, vals = np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0)
+        return self._select(rows.astype(np.int64), cols.astype(np.int64), vals,
+                            lambda r, c: self.lookup(r, c) + value_fn(r, c))
+
+    def _from_dense(self, arr: np.ndarray) -> _CSR:
+        empty = SparseManifold(self._size, threshold=self.threshold, top_k=self.top_k)
+        return empty._blocked(lambda r0, r1: arr[r0:r1], lambda r, c: arr[r, c])
+
+    # -- mutation -----------------------------------------------------------
+
+    def apply_deformation(
+        self,
+        delta_matrix: Union[List[List[float]], np.ndarray]
+    ) -> None:
+        """Add the symmetric part of a dense delta, then prune."""
+        mat = np.asarray(delta_matrix, dtype=float)
+        if mat.shape != (self._size, self._size):
+            raise ValueError(f"Delta must be {self._size}x{self._size}, got {mat.shape}")
+        symmetric = self.is_symmetric()
+        self._store_csr(self._blocked(
+            lambda r0, r1: (mat[r0:r1] + mat[:, r0:r1].T) / 2.0,
+            lambda r, c: (mat[r, c] + mat[c, r]) / 2.0,
+        ))
+        self._keep_symmetric(symmetric)
+
+    def apply_low_rank(
+        self,
+        vectors: np.ndarray,
+        coeffs: Union[float, np.ndarray] = 1.0
+    ) -> None:
+        """
+        A += sum_k coeffs[k] · v_k v_k^T, then prune. A single vector takes
+        the output-sensitive rank-one path; k > 1 uses row blocks.
+        """
+        V = np.atleast_2d(np.asarray(vectors, dtype=float))
+        if V.shape[1] != self._size:
+            raise ValueError(f"Vectors must have {self._size} columns, got {V.shape[1]}")
+        if V.shape[0] == 0:
+            return
+        c = np.broadcast_to(np.asarray(coeffs, dtype=float), (V.shape[0],))
+        symmetric = self.is_symmetric()
+        if V.shape[0] == 1:
+            self._store_csr(self._rank_one(V[0], float(c[0])))
+        else:
+            cV = V * c[:, None]
+            self._store_csr(self._blocked(
+                lambda r0, r1: cV[:, r0:r1].T @ V,
+                lambda r, col: np.einsum("kp,kp->p", cV[:, r], V[:, col]),
+            ))
+        self._keep_symmetric(symmetric)
+
+    def _rank_one(self, d: np.ndarray, c: float) -> _CSR:
+        n = self._size
+        rows_old = self._rows()
+        # Existing entries, updated
+        old_vals = self._data + c * d[rows_old] * d[self._indices]
+
+        # New entries: |c d_i d_j| is monotone in |d_j|, so each row's
+        # candidates are a prefix of the columns sorted by |d_j|
+        mag = np.abs(d)
+        order = np.argsort(-mag, kind="stable")
+        row_scale = abs(c) * mag
+        if self.threshold > 0:
+            ascending = mag[order][::-1]
+            with np.errstate(divide="ignore"):
+                limit = np.where(row_scale > 0, self.threshold / row_scale, np.inf)
+            # A hair below the limit so rounding never loses a borderline entry
+            count = n - np.searchsorted(ascending, limit * (1.0 - 1e-12), side="left")
+        else:
+            count = np.where(row_scale > 0, n, 0)
+        if self.top_k is not None:
+            count = np.minimum(count, self.top_k + np.diff(self._indptr))
+        count = count.astype(np.int64)
+        total = int(count.sum())
+        new_rows = np.repeat(np.arange(n, dtype=np.int64), count)
+        offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(count) - count, count)
+        new_cols = order[offsets].astype(np.int64)
+        fresh = ~self._contains(new_rows * n + new_cols)[0]
+        new_rows, new_cols = new_rows[fresh], new_cols[fresh]
+        new_vals = c * d[new_rows] * d[new_cols]
+
+        return self._select(
+            np.concatenate([rows_old, new_rows]),
+            np.concatenate([self._indices, new_cols]),
+            np.concatenate([old_vals, new_vals]),
+            lambda r, col: self.lookup(r, col) + c * d[r] * d[col],
+        )
+
+    # -- diagnostics --------------------------------------------------------
+
+    def is_symmetric(self) -> bool:
+        """True if the adjacency equals its transpose exactly."""
+        def compute() -> bool:
+            rows = self._rows()
+            t_keys = self._indices * self._size + rows
+            order = np.argsort(t_keys, kind="stable")
+            return bool(np.array_equal(t_keys[order], self._keys())
+                        and np.array_equal(self._data[order], self._data))
+        return self._cached("symmetric", compute)
+
+    def energy(self) -> float:
+        """Sum of squares of the stored entries."""
+        return self._cached("energy", lambda: float(self._data @ self._data))
+
+    def frobenius_norm(self) -> float:
+        return self._cached("frobenius_norm", lambda: math.sqrt(self.energy()))
+
+    def spectral_radius(self, iters: int = 1000, tol: float = 1e-9) -> float:
+        """
+        Largest absolute eigenvalue: dense for small manifolds, otherwise
+        power iteration on the sparse matvec (NaN if it fails to converge).
+        """
+        def compute() -> float:
+            n = self._size
+            if n == 0 or not self._data.size:
+                return 0.0
+            if n <= _DENSE_EIG_LIMIT:
+                return ContextualManifold(n, self.adj).spectral_radius()
+            x = np.random.default_rng(0).standard_normal(n)
+            x /= np.linalg.norm(x)
+            estimate = 0.0
+            for _ in range(iters):
+                y = self.matvec(x)
+                norm = float(np.linalg.norm(y))
+                if norm == 0.0:
+                    return 0.0
+                x = y / norm
+                if abs(norm - estimate) <= tol * norm:
+                    return norm
+                estimate = norm
+            return estimate if self.is_symmetric() else float('nan')
+        return self._cached("spectral_radius", compute)
+
+    def edge_stats(self) -> Tuple[float, float]:
+        """Mean and variance of the upper-triangle weights, zeros included."""
+        def compute() -> Tuple[float, float]:
+            n = self._size
+            pairs = n * (n - 1) // 2
+            if pairs == 0:
+                return 0.0, 0.0
+            upper = self._data[self._indices > self._rows()]
+            mean = float(upper.sum()) / pairs
+            var = max(float(upper @ upper) / pairs - mean * mean, 0.0)
+            return mean, var
+        return self._cached("edge_stats", compute)
+
+    def _pattern(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows and columns of the undirected pattern of A | A^T."""
+        def compute() -> Tuple[np.ndarray, np.ndarray]:
+            n = self._size
+            keys = np.union1d(self._keys(), self._indices * n + self._rows())
+            return keys // n, keys % n
+        return self._cached("pattern", compute)
+
+    def degrees(self) -> np.ndarray:
+        """Node degrees of A | A^T; self-loops count twice (NetworkX convention)."""
+        def compute() -> np.ndarray:
+            rows, cols = self._pattern()
+            deg = np.bincount(rows, minlength=self._size) + np.bincount(
+                rows[rows == cols], minlength=self._size)
+            deg.flags.writeable = False
+            return deg
+        return self._cached("degrees", compute)
+
+    def edge_count(self) -> int:
+        """Number of undirected edges, self-loops included."""
+        def compute() -> int:
+            rows, cols = self._pattern()
+            return int(np.count_nonzero(rows <= cols))
+        return self._cached("edge_count", compute)
+
+    # -- conversion ---------------------------------------------------------
+
+    @classmethod
+    def from_manifold(
+        cls,
+        manifold: ContextualManifold,
+        threshold: float = 0.0,
+        top_k: Optional[int] = None
+    ) -> 'SparseManifold':
+        """Prune a (dense) manifold into a new sparse one."""
+        return cls(manifold.size, manifold.adj, threshold=threshold, top_k=top_k)
+
+    def to_dense(self) -> ContextualManifold:
+        """Dense copy as a plain ContextualManifold."""
+        return ContextualManifold(self._size, np.array(self.adj))
+
+    def to_json(self) -> str:
+        """Serialize as CSR arrays; `ContextualManifold.from_json` restores it."""
+        return json.dumps({
+            "backend": self.backend,
+            "size": self._size,
+            "threshold": self.threshold,
+            "top_k": self.top_k,
+            "indptr": self._indptr.tolist(),
+            "indices": self._indices.tolist(),
+            "data": self._data.tolist(),
+        })
+
+    @classmethod
+    def from_json(
+        cls,
+        data: Union[str, Dict[str, Any]]
+    ) -> 'SparseManifold':
+        """
+        Deserialize CSR JSON, or prune the dense ("adj") JSON format using
+        its own settings (none: only zeros are dropped).
+        """
+        obj = json.loads(data) if isinstance(data, str) else data
+        manifold = cls(obj["size"], threshold=obj.get("threshold", 0.0), top_k=obj.get("top_k"))
+        if "adj" in obj:
+            manifold.adj = obj["adj"]
+        else:
+            manifold._store_csr((
+                np.asarray(obj["indptr"], dtype=np.int64),
+                np.asarray(obj["indices"], dtype=np.int64),
+                np.asarray(obj["data"], dtype=float),
+            ))
+        return manifold
+
+    def __repr__(self) -> str:
+        return (f"SparseManifold(size={self.size}, nnz={self.nnz}, "
+                f"energy={self.energy():.4f})")
+
+
+MANIFOLD_BACKENDS: Dict[str, Type[ContextualManifold]] = {
+    "dense": ContextualManifold,
+    "csr": SparseManifold,
+}
+# Config alias
+MANIFOLD_BACKENDS["sparse"] = SparseManifold
+
+
+def make_manifold(size: int, backend: str = "dense", **options: Any) -> ContextualManifold:
+    """
+    Build an empty manifold of the given backend ("dense" | "sparse"/"csr").
+    Extra options (`threshold`, `top_k`) go to the sparse backend; passing
+    them with the dense backend raises ValueError.
+    """
+    if backend not in MANIFOLD_BACKENDS:
+        raise ValueError(
+            f"Unknown manifold backend: {backend} (expected one of {sorted(MANIFOLD_BACKENDS)})"
+        )
+    cls = MANIFOLD_BACKENDS[backend]
+    if cls is ContextualManifold:
+        # Unset (null) options are harmless; pruning options need the sparse backend
+        given = sorted(k for k, v in options.items() if v is not None)
+        if given:
+            raise ValueError(f"Manifold options {given} require backend 'sparse', not {backend!r}")
+        return cls(size)
+    return cls(size, **options)
+
+
+def manifold_from_config(cfg: Dict[str, Any], size: Optional[int] = None) -> ContextualManifold:
+    """
+    Build an empty manifold described by a loaded config dict: `size`
+    (default `manifold_size`) nodes, with the backend and options from the
+    optional `manifold` section.
+    """
+    options = dict(cfg.get('manifold') or {})
+    backend = options.pop('backend', 'dense')
+    return make_manifold(size if size is not None else cfg.get('manifold_size', 8),
+                         backend, **options)
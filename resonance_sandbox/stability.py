@@ -1,5 +1,6 @@
 # resonance_sandbox/stability.py
 
+import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from .flux import RelationalFlux
 from .manifold import ContextualManifold
@@ -9,9 +10,18 @@ def stability_test(
     flux_dim: int = 16,
     manifold_size: int = 8,
     scales: Optional[List[float]] = None,
-    full_metrics: bool = False
+    full_metrics: bool = False,
+    damping: float = 1.0,
+    seed: Optional[int] = None,
+    operator: Optional[ResonanceOperator] = None
 ) -> Dict[float, Any]:
     """
+    Apply one randomly perturbed flux per noise scale to a fresh manifold and
+    compare energies before and after.
+
+    `seed` makes the operator and fluxes reproducible; `operator` replaces
+    the freshly built dense operator (its flux_dim/manifold_size win).
+
     If full_metrics=False (default), returns:
         { scale: (E_before, E_after) }
     matching the original tests’ expectations.
@@ -29,15 +39,20 @@ def stability_test(
         scales = [1e-4, 1e-3, 1e-2]
 
     results: Dict[float, Any] = {}
-    op = ResonanceOperator(flux_dim, manifold_size)
+    op_seed, *flux_seeds = np.random.SeedSequence(seed).spawn(len(scales) + 1)
+    if operator is None:
+        op = ResonanceOperator(flux_dim, manifold_size, damping=damping, seed=op_seed)
+    else:
+        op = operator
+        flux_dim, manifold_size = op.flux_dim, op.manifold_size
 
-    for scale in scales:
+    for scale, flux_seed in zip(scales, flux_seeds):
         # Baseline manifold with zero flux
         base = ContextualManifold(manifold_size)
         E0 = base.energy()
 
         # Perturb with a small random flux
-        flux = RelationalFlux(flux_dim)
+        flux = RelationalFlux(flux_dim, seed=flux_seed)
         perturbed = op.operate(flux.perturb(scale), base)
         E1 = perturbed.energy()
 
@@ -0,0 +1,199 @@
+# resonance_sandbox/streaming.py
+
+import math
+from numbers import Number
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+
+class P2Quantile:
+    """
+    Constant-memory quantile estimate using the P² algorithm
+    (Jain & Chlamtac, 1985): five markers whose heights are adjusted with a
+    piecewise-parabolic update as observations arrive.
+    """
+
+    def __init__(self, p: float):
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"Quantile must be in (0, 1), got {p}")
+        self.p = p
+        self._initial: List[float] = []
+        self._q: List[float] = []
+        self._n: List[int] = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        """Consume one observation."""
+        if len(self._initial) < 5:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                self._q = sorted(self._initial)
+            return
+
+        q, n = self._q, self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._step[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                candidate = self._parabolic(i, s)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                n[i] += s
+
+    def _parabolic(self, i: int, s: int) -> float:
+        q, n = self._q, self._n
+        return q[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """Current estimate (exact while fewer than five observations were seen)."""
+        if len(self._initial) < 5:
+            if not self._initial:
+                return float('nan')
+            data = sorted(self._initial)
+            pos = self.p * (len(data) - 1)
+            lo = int(math.floor(pos))
+            hi = min(lo + 1, len(data) - 1)
+            return data[lo] + (pos - lo) * (data[hi] - data[lo])
+        return self._q[2]
+
+
+class RunningStats:
+    """
+    Constant-memory statistics of one scalar stream: count, Welford mean and
+    variance, min/max, P² quantiles, and exponentially-weighted mean and
+    per-step rate of change.
+    """
+
+    def __init__(self, quantiles: Sequence[float] = (0.5, 0.9, 0.99), alpha: float = 0.05):
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.ewm: Optional[float] = None
+        self.ewm_rate: Optional[float] = None
+        self._last: Optional[float] = None
+        self._quantiles = [P2Quantile(p) for p in quantiles]
+
+    def add(self, x: float) -> None:
+        """Consume one observation."""
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        for q in self._quantiles:
+            q.add(x)
+
+        if self.ewm is None:
+            self.ewm = x
+        else:
+            self.ewm += self.alpha * (x - self.ewm)
+        if self._last is not None:
+            step = x - self._last
+            if self.ewm_rate is None:
+                self.ewm_rate = step
+            else:
+                self.ewm_rate += self.alpha * (step - self.ewm_rate)
+        self._last = x
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 for fewer than two observations)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current statistics as a flat dict."""
+        snap: Dict[str, float] = {
+            "count": self.count,
+            "mean": self.mean,
+            "std": math.sqrt(self.variance),
+            "min": self.min,
+            "max": self.max,
+            "ewm": self.ewm if self.ewm is not None else float('nan'),
+            "ewm_rate": self.ewm_rate if self.ewm_rate is not None else 0.0,
+        }
+        for q in self._quantiles:
+            snap[f"p{q.p * 100:g}"] = q.value()
+        return snap
+
+
+class MetricsAggregator:
+    """
+    Streaming aggregator for `compute_energy` results.
+
+    Accepts either the float returned by `compute_energy(m)` or the dict
+    returned by `compute_energy(m, full=True)` and keeps one RunningStats per
+    numeric key, so memory stays constant no matter how many steps are fed.
+    If `snapshot_every` is set, `on_snapshot(step, snapshot)` is called every
+    that many updates.
+    """
+
+    def __init__(
+        self,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        alpha: float = 0.05,
+        snapshot_every: Optional[int] = None,
+        on_snapshot: Optional[Callable[[int, Dict[str, Dict[str, float]]], None]] = None
+    ):
+        self.quantiles = tuple(quantiles)
+        self.alpha = alpha
+        self.snapshot_every = snapshot_every
+        self.on_snapshot = on_snapshot
+        self.steps = 0
+        self.stats: Dict[str, RunningStats] = {}
+
+    def update(self, metrics: Union[float, Dict[str, Any]]) -> None:
+        """Consume one diagnostics result."""
+        if not isinstance(metrics, dict):
+            metrics = {"frobenius_norm": metrics}
+        for key, value in metrics.items():
+            if not isinstance(value, Number) or isinstance(value, bool):
+                continue
+            if key not in self.stats:
+                self.stats[key] = RunningStats(self.quantiles, self.alpha)
+            self.stats[key].add(value)
+        self.steps += 1
+        if (self.snapshot_every and self.on_snapshot is not None
+                and self.steps % self.snapshot_every == 0):
+            self.on_snapshot(self.steps, self.snapshot())
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return {metric: statistics} for every metric seen so far."""
+        return {key: stats.snapshot() for key, stats in self.stats.items()}
+
+
+def format_snapshot(step: int, snapshot: Dict[str, Dict[str, float]]) -> str:
+    """Render a MetricsAggregator snapshot as one line per metric."""
+    lines = [f"Step {step}:"]
+    for key, s in snapshot.items():
+        quantiles = " ".join(f"{k}={v:.6g}" for k, v in s.items() if k.startswith("p"))
+        lines.append(
+            f"  {key:<16} mean={s['mean']:.6g} std={s['std']:.6g} "
+            f"min={s['min']:.6g} max={s['max']:.6g} {quantiles} "
+            f"ewm={s['ewm']:.6g} rate={s['ewm_rate']:.6g}"
+        )
+    return "\n".join(lines)
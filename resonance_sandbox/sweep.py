@@ -0,0 +1,329 @@
+# resonance_sandbox/sweep.py
+
+import os
+import json
+import struct
+import hashlib
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import yaml
+
+from .flux import RelationalFlux
+from .manifold import ContextualManifold
+from .projections import make_operator
+from .stability import stability_test
+from .energy import compute_energy
+from .meta_learning import random_search
+
+logger = logging.getLogger(__name__)
+
+TASKS = ("stability", "energy", "meta_learn")
+
+# ---------------------------------------------------------------------------
+# Columnar results table
+# ---------------------------------------------------------------------------
+
+_HEADER = struct.Struct("<Q")
+
+
+class ResultsTable:
+    """
+    Append-only columnar binary table in a single file.
+
+    The file is a sequence of record batches. Each batch is a little-endian
+    uint64 header length, a JSON header listing the row count and each
+    column's name, dtype and byte length, followed by the raw column buffers.
+    A batch is written with one write+fsync; a truncated trailing batch
+    (from a crash) is ignored on read and dropped on the next append.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._valid_bytes: Optional[int] = None
+
+    def _batches(self) -> Iterator[Dict[str, np.ndarray]]:
+        if not os.path.exists(self.path):
+            self._valid_bytes = 0
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            (header_len,) = _HEADER.unpack_from(data, pos)
+            start = pos + _HEADER.size
+            if start + header_len > len(data):
+                break
+            header = json.loads(data[start:start + header_len].decode("utf-8"))
+            offset = start + header_len
+            end = offset + sum(col["nbytes"] for col in header["columns"])
+            if end > len(data):
+                break
+            batch: Dict[str, np.ndarray] = {}
+            for col in header["columns"]:
+                raw = data[offset:offset + col["nbytes"]]
+                batch[col["name"]] = np.frombuffer(raw, dtype=np.dtype(col["dtype"]))
+                offset += col["nbytes"]
+            yield batch
+            pos = end
+        self._valid_bytes = pos
+
+    def read(self) -> Dict[str, np.ndarray]:
+        """Concatenate all complete batches into {column: array}."""
+        batches = list(self._batches())
+        names: List[str] = []
+        for batch in batches:
+            names.extend(k for k in batch if k not in names)
+        columns: Dict[str, np.ndarray] = {}
+        for name in names:
+            parts = []
+            for batch in batches:
+                rows = len(next(iter(batch.values())))
+                parts.append(batch[name] if name in batch else np.full(rows, np.nan))
+            columns[name] = np.concatenate(parts)
+        return columns
+
+    def append(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Append rows (dicts of scalars) as one record batch."""
+        if not rows:
+            return
+        names: List[str] = []
+        for row in rows:
+            names.extend(k for k in row if k not in names)
+        arrays = []
+        for name in names:
+            values = [row.get(name, np.nan) for row in rows]
+            arr = np.ascontiguousarray(np.array(values))
+            if arr.dtype == object:
+                raise TypeError(f"Column {name!r} has non-scalar values")
+            arrays.append(arr)
+        header = json.dumps({
+            "rows": len(rows),
+            "columns": [
+                {"name": n, "dtype": a.dtype.str, "nbytes": a.nbytes}
+                for n, a in zip(names, arrays)
+            ],
+        }).encode("utf-8")
+        payload = b"".join([_HEADER.pack(len(header)), header] + [a.tobytes() for a in arrays])
+
+        # Locate the end of the last complete batch once, dropping a torn tail
+        if self._valid_bytes is None:
+            for _ in self._batches():
+                pass
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) != self._valid_bytes:
+            os.truncate(self.path, self._valid_bytes)
+        with open(self.path, "ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._valid_bytes += len(payload)
+
+
+# ---------------------------------------------------------------------------
+# Spec expansion
+# ---------------------------------------------------------------------------
+
+def load_sweep_spec(path: str) -> Dict[str, Any]:
+    """Load a sweep spec from YAML (either top level or under a `sweep:` key)."""
+    with open(path, "r") as f:
+        cfg = yaml.safe_load(f)
+    return cfg.get("sweep", cfg)
+
+
+def expand_points(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand a spec into a list of parameter dicts.
+
+    `grid` maps parameter names to lists and yields their cartesian product.
+    `random` has `samples` and `params`, each either a list of choices or a
+    range {low, high, log: bool, int: bool}, sampled with the spec seed.
+    """
+    if "grid" in spec:
+        grid = spec["grid"]
+        names = list(grid)
+        return [dict(zip(names, values))
+                for values in itertools.product(*(grid[n] for n in names))]
+    if "random" in spec:
+        rnd = spec["random"]
+        rng = np.random.default_rng(spec.get("seed", 0))
+        points = []
+        for _ in range(rnd["samples"]):
+            point = {}
+            for name, dist in rnd["params"].items():
+                if isinstance(dist, list):
+                    point[name] = dist[rng.integers(len(dist))]
+                    continue
+                low, high = float(dist["low"]), float(dist["high"])
+                if dist.get("log"):
+                    value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    value = float(rng.uniform(low, high))
+                point[name] = int(round(value)) if dist.get("int") else value
+            points.append(point)
+        return points
+    raise ValueError("Sweep spec needs a 'grid' or 'random' section")
+
+
+def point_key(
+    params: Dict[str, Any],
+    task: str = "stability",
+    options: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Stable 63-bit key of a parameter point, used to skip completed work.
+    The task and its options are part of the key, so changing either
+    recomputes the point instead of reusing results from other settings.
+    """
+    canon = json.dumps({"task": task, "options": options or {}, "params": params},
+                       sort_keys=True).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(canon, digest_size=8).digest(), "little") >> 1
+
+
+def task_seed(base_seed: int, key: int) -> int:
+    """Independent per-task seed derived from the sweep seed and point key."""
+    return int(np.random.SeedSequence([base_seed, key]).generate_state(1)[0])
+
+
+# ---------------------------------------------------------------------------
+# Tasks
+# ---------------------------------------------------------------------------
+
+def run_task(task: str, params: Dict[str, Any], seed: int) -> Dict[str, float]:
+    """
+    Run one job and return its scalar metrics.
+
+    `params` may contain flux_dim, manifold_size, damping, kind plus
+    task-specific options (scales; steps; iterations/pop_size/noise_scale).
+    """
+    flux_dim = int(params.get("flux_dim", 16))
+    manifold_size = int(params.get("manifold_size", 8))
+    damping = float(params.get("damping", 1.0))
+    op = make_operator(params.get("kind", "dense"), flux_dim, manifold_size,
+                       damping=damping, seed=seed)
+
+    if task == "stability":
+        results = stability_test(scales=params.get("scales"), full_metrics=True,
+                                 seed=seed, operator=op)
+        deltas = [r["delta"] for r in results.values()]
+        return {
+            "min_delta": float(min(deltas)),
+            "max_delta": float(max(deltas)),
+            "stable": float(all(r["stable"] for r in results.values())),
+        }
+    if task == "energy":
+        rng = np.random.default_rng(seed)
+        m = ContextualManifold(manifold_size)
+        for _ in range(int(params.get("steps", 1))):
+            op.operate(RelationalFlux(flux_dim, vector=rng.standard_normal(flux_dim)), m)
+        return {k: float(v) for k, v in compute_energy(m, full=True).items()}
+    if task == "meta_learn":
+        _, best_fitness, _ = random_search(
+            flux_dim, manifold_size, base_operator=op,
+            iterations=int(params.get("iterations", 10)),
+            pop_size=int(params.get("pop_size", 10)),
+            noise_scale=float(params.get("noise_scale", 0.1)),
+            seed=seed,
+        )
+        return {"best_fitness": float(best_fitness)}
+    raise ValueError(f"Unknown sweep task: {task} (expected one of {TASKS})")
+
+
+def _run_chunk(task: str, options: Dict[str, Any], chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker entry point: evaluate a chunk of points and return result rows."""
+    rows = []
+    for item in chunk:
+        metrics = run_task(task, dict(options, **item["params"]), item["seed"])
+        row = {"point_key": item["key"], "seed": item["seed"]}
+        row.update(item["params"])
+        row.update(metrics)
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def pending_points(spec: Dict[str, Any], table: ResultsTable) -> List[Dict[str, Any]]:
+    """Expand the spec and drop the points already present in `table`."""
+    done = set()
+    existing = table.read()
+    if "point_key" in existing:
+        done = set(int(k) for k in existing["point_key"])
+    base_seed = int(spec.get("seed", 0))
+    task, options = spec.get("task", "stability"), spec.get("options") or {}
+    items = []
+    for params in expand_points(spec):
+        key = point_key(params, task, options)
+        if key not in done:
+            done.add(key)
+            items.append({"key": key, "seed": task_seed(base_seed, key), "params": params})
+    return items
+
+
+def run_sweep(
+    spec: Dict[str, Any],
+    results_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run every pending point of a sweep spec across a local process pool.
+
+    Points are shipped to a single long-lived pool in chunks so process
+    startup and IPC are amortized; each finished chunk is appended to the
+    results table as one batch, so an interrupted sweep resumes by skipping
+    the point keys already on disk.
+
+    Args:
+        spec: Parsed sweep spec (task, seed, grid/random, options, results).
+        results_path: Results table path; defaults to spec["results"].
+        workers: Process count (default spec["workers"] or os.cpu_count()).
+            0 or 1 runs in-process.
+        chunksize: Points per work unit (default: ~8 units per worker).
+
+    Returns:
+        Summary dict with total/skipped/completed counts and the table path.
+    """
+    task = spec.get("task", "stability")
+    if task not in TASKS:
+        raise ValueError(f"Unknown sweep task: {task} (expected one of {TASKS})")
+    results_path = results_path or spec.get("results", "sweeps/results.rtab")
+    options = spec.get("options") or {}
+    table = ResultsTable(results_path)
+
+    total = len(expand_points(spec))
+    items = pending_points(spec, table)
+    workers = spec.get("workers") if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(256, len(items) // (workers * 8) or 1))
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+    logger.info("Sweep %s: %d points, %d pending, %d chunks on %d workers",
+                task, total, len(items), len(chunks), workers)
+
+    completed = 0
+    if workers <= 1:
+        for chunk in chunks:
+            rows = _run_chunk(task, options, chunk)
+            table.append(rows)
+            completed += len(rows)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, task, options, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                rows = future.result()
+                table.append(rows)
+                completed += len(rows)
+
+    return {
+        "task": task,
+        "total": total,
+        "skipped": total - len(items),
+        "completed": completed,
+        "results": results_path,
+    }
@@ -0,0 +1,203 @@
+# resonance_sandbox/tiled.py
+"""
+Tiled, multi-threaded kernels for large manifolds.
+
+The n×n adjacency is split into square tiles small enough to stay in cache,
+and tiles are processed on a thread pool. NumPy releases the GIL inside its
+elementwise loops and matmuls, so tiles run truly in parallel. When the
+adjacency is symmetric only the upper-triangle tiles are computed and each
+off-diagonal tile is mirrored into its transpose position; energy is reduced
+from per-tile partial sums (off-diagonal tiles counted twice).
+
+The process-wide engine is used by ContextualManifold for sizes at or above
+`min_size`; smaller manifolds keep the plain single-call NumPy path. The
+thread count comes from `configure(threads=...)`, the `tiling:` config
+section, or the RESONANCE_THREADS environment variable, in that order.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+Tile = Tuple[slice, slice, bool]
+
+
+class TiledEngine:
+    """
+    Thread-pool executor for tile-wise deformation and energy kernels.
+
+    Args:
+        threads: Worker threads (default: RESONANCE_THREADS or os.cpu_count()).
+        tile: Tile edge length; 256 float64 rows × 256 columns is 512 KiB.
+        min_size: Smallest manifold size routed through the engine.
+    """
+
+    def __init__(self, threads: Optional[int] = None, tile: int = 256, min_size: int = 2048):
+        if threads is None:
+            threads = int(os.environ.get("RESONANCE_THREADS", 0)) or os.cpu_count() or 1
+        if threads < 1 or tile < 1:
+            raise ValueError(f"threads and tile must be positive, got {threads}, {tile}")
+        self.threads = threads
+        self.tile = tile
+        self.min_size = min_size
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def accepts(self, size: int) -> bool:
+        """True if a manifold of this size should use the tiled kernels."""
+        return size >= self.min_size
+
+    def tiles(self, n: int, symmetric: bool) -> List[Tile]:
+        """
+        (rows, cols, mirror) for every tile to compute: the upper triangle
+        when `symmetric`, all tiles otherwise. `mirror` marks off-diagonal
+        tiles whose transpose must also be written.
+        """
+        starts = range(0, n, self.tile)
+        out = []
+        for i in starts:
+            for j in starts:
+                if symmetric and j < i:
+                    continue
+                out.append((slice(i, min(i + self.tile, n)),
+                            slice(j, min(j + self.tile, n)),
+                            symmetric and i != j))
+        return out
+
+    def _map(self, fn: Callable[[Tile], Any], tiles: List[Tile]) -> List[Any]:
+        if self.threads == 1 or len(tiles) == 1:
+            return [fn(t) for t in tiles]
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.threads, thread_name_prefix="tiled")
+        # Contiguous runs of tiles per task keep scheduling overhead small
+        step = max(1, len(tiles) // (self.threads * 4))
+        runs = [tiles[k:k + step] for k in range(0, len(tiles), step)]
+        results = self._pool.map(lambda run: [fn(t) for t in run], runs)
+        return [r for run in results for r in run]
+
+    def deform(
+        self,
+        adj: np.ndarray,
+        delta: np.ndarray,
+        symmetric: bool = False,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Return adj + (delta + deltaᵀ) / 2, written into `out` (a new array
+        by default; may be `adj` itself for an in-place update).
+
+        Pass `symmetric=True` only if `adj` is exactly symmetric; the result
+        is then computed on the upper triangle and mirrored.
+        """
+        if out is None:
+            out = np.empty_like(adj)
+
+        def kernel(t: Tile) -> None:
+            r, c, mirror = t
+            block = delta[r, c] + delta[c, r].T
+            block *= 0.5
+            block += adj[r, c]
+            out[r, c] = block
+            if mirror:
+                out[c, r] = block.T
+
+        self._map(kernel, self.tiles(adj.shape[0], symmetric))
+        return out
+
+    def low_rank(
+        self,
+        adj: np.ndarray,
+        vectors: np.ndarray,
+        coeffs: np.ndarray,
+        symmetric: bool = False,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Return adj + Σ_k coeffs[k] · v_k v_kᵀ without forming the dense
+        update; each tile is one small (k × tile)ᵀ @ (k × tile) product.
+        """
+        if out is None:
+            out = np.empty_like(adj)
+        scaled = vectors * coeffs[:, None]
+
+        def kernel(t: Tile) -> None:
+            r, c, mirror = t
+            block = scaled[:, r].T @ vectors[:, c]
+            if not symmetric:
+                # Match the symmetrized update of the dense path
+                block += (scaled[:, c].T @ vectors[:, r]).T
+                block *= 0.5
+            elif r == c:
+                # Diagonal tiles must be exactly symmetric on their own
+                block = (block + block.T) * 0.5
+            block += adj[r, c]
+            out[r, c] = block
+            if mirror:
+                out[c, r] = block.T
+
+        self._map(kernel, self.tiles(adj.shape[0], symmetric))
+        return out
+
+    def energy(self, adj: np.ndarray, symmetric: bool = False) -> float:
+        """Sum of squares of `adj`, reduced from per-tile partials."""
+        def kernel(t: Tile) -> float:
+            r, c, mirror = t
+            block = adj[r, c]
+            partial = float(np.einsum("ij,ij->", block, block))
+            return 2.0 * partial if mirror else partial
+
+        return float(sum(self._map(kernel, self.tiles(adj.shape[0], symmetric))))
+
+    def close(self) -> None:
+        """Shut down the thread pool (it is recreated on next use)."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __repr__(self) -> str:
+        return (f"TiledEngine(threads={self.threads}, tile={self.tile}, "
+                f"min_size={self.min_size})")
+
+
+_engine: Optional[TiledEngine] = None
+
+
+def get_engine() -> TiledEngine:
+    """Return the process-wide engine, creating it with defaults if needed."""
+    global _engine
+    if _engine is None:
+        _engine = TiledEngine()
+    return _engine
+
+
+def configure(
+    threads: Optional[int] = None,
+    tile: Optional[int] = None,
+    min_size: Optional[int] = None
+) -> TiledEngine:
+    """Replace the process-wide engine; unset options keep their current values."""
+    global _engine
+    current = get_engine()
+    engine = TiledEngine(
+        threads=threads if threads is not None else current.threads,
+        tile=tile if tile is not None else current.tile,
+        min_size=min_size if min_size is not None else current.min_size,
+    )
+    current.close()
+    _engine = engine
+    return engine
+
+
+def configure_from_config(cfg: Dict[str, Any]) -> TiledEngine:
+    """Configure the engine from the optional `tiling:` section of a config dict."""
+    section = cfg.get("tiling") or {}
+    return configure(
+        threads=section.get("threads"),
+        tile=section.get("tile"),
+        min_size=section.get("min_size"),
+    )
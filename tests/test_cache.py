@@ -0,0 +1,45 @@
+import os
+import time
+from resonance_sandbox.cache import ResultCache, cache_from_config, operator_digest
+from resonance_sandbox.operator import ResonanceOperator
+
+def test_key_covers_inputs_and_requires_seed():
+    op = ResonanceOperator(4, 3, seed=0)
+    base = ResultCache.key("energy", {"a": 1}, 1, op, steps=2)
+    assert base == ResultCache.key("energy", {"a": 1}, 1, ResonanceOperator(4, 3, seed=0), steps=2)
+    assert base != ResultCache.key("energy", {"a": 2}, 1, op, steps=2)
+    assert base != ResultCache.key("energy", {"a": 1}, 2, op, steps=2)
+    assert base != ResultCache.key("energy", {"a": 1}, 1, op, steps=3)
+    assert operator_digest(op) != operator_digest(ResonanceOperator(4, 3, seed=1))
+    assert ResultCache.key("energy", {"a": 1}, None, op) is None
+
+def test_run_replays_output_and_evicts_lru(tmp_path, capsys):
+    cache = ResultCache(str(tmp_path), max_bytes=350)
+    calls = []
+    def command(n):
+        calls.append(n)
+        print("x" * n)
+
+    key = ResultCache.key("cmd", {}, 0)
+    cache.run(key, command, 100)
+    cache.run(key, command, 100)
+    assert calls == [100]
+    assert capsys.readouterr().out == ("x" * 100 + "\n") * 2
+
+    cache.put("b" * 64, b"1" * 100)
+    time.sleep(0.01)
+    cache.get(key)  # refresh: "b..." is now least recently used
+    time.sleep(0.01)
+    cache.put_files("c" * 64, {"one": b"1", "two": b"22"})
+    assert cache.get("b" * 64) is None
+    assert cache.get(key) is not None
+    assert cache.get_files("c" * 64) == {"one": b"1", "two": b"22"}
+    assert cache.info()["bytes"] <= 350
+    assert not [n for n in os.listdir(tmp_path / key[:2]) if n.startswith(".tmp-")]
+
+def test_cache_from_config_flags(tmp_path):
+    cfg = {"cache": {"enabled": True, "dir": str(tmp_path), "max_mb": 1}}
+    assert cache_from_config(cfg).max_bytes == 2**20
+    assert cache_from_config(cfg, enabled=False) is None
+    assert cache_from_config({}) is None
+    assert cache_from_config({}, enabled=True) is not None
@@ -0,0 +1,18 @@
+import numpy as np
+from resonance_sandbox.meta_learning import random_search
+from resonance_sandbox.checkpoint import load_checkpoint, read_history
+
+def test_resume_is_bit_identical(tmp_path):
+    kwargs = dict(flux_dim=4, manifold_size=3, pop_size=3, seed=7, return_history=True)
+    full_op, full_fit, full_hist = random_search(iterations=6, **kwargs)
+
+    ckpt = str(tmp_path / "search.npz")
+    random_search(iterations=3, checkpoint_path=ckpt, checkpoint_every=1, **kwargs)
+    _, meta = load_checkpoint(ckpt)
+    assert meta["generation"] == 3
+    assert len(read_history(ckpt + ".history.jsonl")) == 3
+
+    op, fit, hist = random_search(iterations=6, checkpoint_path=ckpt, resume=True, **kwargs)
+    assert fit == full_fit
+    assert np.array_equal(op.W, full_op.W)
+    assert hist == full_hist
@@ -0,0 +1,101 @@
+import socket
+import multiprocessing
+import numpy as np
+import pytest
+from resonance_sandbox.distributed import (
+    Coordinator, UnitFailedError, run_worker, send_message, recv_message,
+    decode_array, distributed_sweep, distributed_random_search,
+)
+from resonance_sandbox.projections import make_operator
+from resonance_sandbox.sweep import ResultsTable, run_sweep
+
+SPEC = {
+    "task": "energy",
+    "seed": 2,
+    "grid": {"flux_dim": [3, 4, 5], "manifold_size": [2, 3], "damping": [0.1]},
+}
+
+def _start_workers(coord, n):
+    host, port = coord.address
+    procs = [multiprocessing.Process(target=run_worker, args=(host, port)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    return procs
+
+def test_sweep_over_localhost_workers_with_lost_unit(tmp_path):
+    coord = Coordinator(lease_timeout=5.0, heartbeat_interval=0.5).start()
+    try:
+        # A "node" that takes a unit and dies before answering
+        dead = socket.create_connection(coord.address)
+        send_message(dead, {"type": "hello", "worker": "doomed"})
+        recv_message(dead)
+        ids = coord.submit([{"kind": "sweep_chunk", "task": "energy", "options": {},
+                             "chunk": []}])
+        send_message(dead, {"type": "request"})
+        assert recv_message(dead)["unit_id"] == ids[0]
+        dead.close()
+
+        procs = _start_workers(coord, 3)
+        assert coord.gather(ids, timeout=30) == [[]]
+        assert coord.redispatched == 1
+
+        path = str(tmp_path / "dist.rtab")
+        summary = distributed_sweep(coord, SPEC, path, chunksize=2)
+        assert summary["completed"] == 6
+
+        submitted = []
+        submit = coord.submit
+        coord.submit = lambda payloads: submitted.extend(payloads) or submit(payloads)
+        op, fitness, history = distributed_random_search(
+            coord, 4, 3, iterations=2, pop_size=4, batch_size=2, seed=0)
+        assert len(history) == 2 and fitness == max(h["fitness"] for h in history)
+        # Units carry only the weights' key; each worker fetches W at most once
+        assert len(submitted) == 4 and all("W" not in p for p in submitted)
+        assert len({p["operator"] for p in submitted}) == 1
+        assert 1 <= coord.fetches <= 3
+    finally:
+        coord.shutdown(grace=1.5)
+    for p in procs:
+        p.join(timeout=10)
+        assert p.exitcode == 0
+
+    local = str(tmp_path / "local.rtab")
+    run_sweep(SPEC, local, workers=1)
+    a, b = ResultsTable(path).read(), ResultsTable(local).read()
+    assert np.array_equal(np.sort(a["frobenius_norm"]), np.sort(b["frobenius_norm"]))
+
+def test_failing_unit_is_reported_and_workers_survive():
+    coord = Coordinator(lease_timeout=5.0, heartbeat_interval=0.5, max_attempts=2).start()
+    try:
+        procs = _start_workers(coord, 2)
+        bad = coord.submit([{"kind": "no_such_unit"}])
+        with pytest.raises(UnitFailedError, match="no_such_unit"):
+            coord.gather(bad, timeout=30)
+
+        # The same workers still serve later units, including structured operators
+        base = make_operator("srht", 4, 3, damping=0.1, seed=1)
+        op, fitness, history = distributed_random_search(
+            coord, 4, 3, base_operator=base, iterations=1, pop_size=2, batch_size=1, seed=0)
+        assert op.kind == "dense" and len(history) == 1
+    finally:
+        coord.shutdown(grace=1.5)
+    for p in procs:
+        p.join(timeout=10)
+        assert p.exitcode == 0
+
+def test_shared_array_round_trip():
+    coord = Coordinator().start()
+    try:
+        W = np.random.default_rng(0).standard_normal((3, 5))
+        key = coord.share("w", W)
+        sock = socket.create_connection(coord.address)
+        send_message(sock, {"type": "hello", "worker": "probe"})
+        recv_message(sock)
+        send_message(sock, {"type": "fetch", "key": key})
+        assert np.array_equal(decode_array(recv_message(sock)["array"]), W)
+        coord.unshare(key)
+        send_message(sock, {"type": "fetch", "key": key})
+        assert recv_message(sock)["type"] == "error"
+        sock.close()
+    finally:
+        coord.shutdown()
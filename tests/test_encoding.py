@@ -0,0 +1,55 @@
+import tracemalloc
+import numpy as np
+import pytest
+from resonance_sandbox.encoding import file_to_flux, iter_fluxes, iter_segment_counts, iter_text_chunks
+from resonance_sandbox.human_interface import text_to_flux
+
+TEXT = "Résonance ∑ flux — 共鳴\nsecond line 🌀\n\nlast line without newline"
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    return str(path)
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_chunked_decoding_survives_split_characters(text_file, use_mmap):
+    chunks = list(iter_text_chunks(text_file, chunk_size=3, use_mmap=use_mmap))
+    assert len(chunks) > 1
+    assert "".join(chunks) == TEXT
+
+def test_file_flux_matches_text_to_flux(text_file):
+    for dim in (7, 16):
+        expected = text_to_flux(TEXT, dim, distribution=None)
+        streamed = file_to_flux(text_file, dim, distribution=None, chunk_size=5)
+        assert np.array_equal(streamed.vector, expected.vector)
+    noisy = file_to_flux(text_file, 16, chunk_size=4, seed=3)
+    assert np.allclose(noisy.vector, text_to_flux(TEXT, 16, seed=3).vector)
+
+def test_window_and_line_fluxes(text_file):
+    lines = list(iter_fluxes(text_file, 16, lines=True, chunk_size=4))
+    expected = TEXT.split("\n")
+    assert len(lines) == len(expected)
+    for flux, line in zip(lines, expected):
+        assert np.array_equal(flux.vector, text_to_flux(line, 16, distribution=None).vector)
+
+    windows = list(iter_fluxes(text_file, 16, window=10, normalize=False, chunk_size=7))
+    assert len(windows) == -(-len(TEXT) // 10)
+    for k, flux in enumerate(windows):
+        segment = TEXT[k * 10:(k + 1) * 10]
+        assert np.array_equal(flux.vector, text_to_flux(segment, 16, False, None).vector)
+
+def test_many_segments_per_chunk_stay_small():
+    # 5000 lines in one chunk at a large dim: memory must not scale with lines x dim
+    chunk = "ab\n" * 5000
+    dim = 1 << 14
+    tracemalloc.start()
+    try:
+        total = 0
+        for row in iter_segment_counts([chunk], dim, lines=True):
+            total += int(row.sum())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert total == 10000
+    assert peak < 16 * 2**20
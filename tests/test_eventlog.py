@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from resonance_sandbox.eventlog import DeformationLog
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.sparse_manifold import SparseManifold
+
+def test_replay_reconstructs_every_step(tmp_path):
+    op = ResonanceOperator(5, 4, damping=0.1, seed=0)
+    m = ContextualManifold(4)
+    states = [np.array(m.adj)]
+    with DeformationLog(str(tmp_path / "log"), 4, snapshot_every=3) as log:
+        log.start(m)
+        for i in range(8):
+            op.operate(RelationalFlux(5, seed=i), m, log=log)
+            states.append(np.array(m.adj))
+        assert log.snapshot_steps() == [0, 3, 6]
+
+    log = DeformationLog.open(str(tmp_path / "log"))
+    assert log.steps == 8
+    for t, expected in enumerate(states):
+        assert np.allclose(log.replay(t).adj, expected, atol=1e-12)
+    log.close()
+
+
+def test_replay_matches_pruned_sparse_manifold(tmp_path):
+    op = ResonanceOperator(6, 30, damping=0.1, seed=0)
+    m = SparseManifold(30, threshold=0.05, top_k=3)
+    states = [m.copy()]
+    with DeformationLog(str(tmp_path / "log"), 30, snapshot_every=4) as log:
+        log.start(m)
+        for i in range(10):
+            op.operate(RelationalFlux(6, seed=i), m, log=log)
+            states.append(m.copy())
+        with pytest.raises(ValueError):
+            log.record(np.zeros(30), 0.1, ContextualManifold(30))
+
+    log = DeformationLog.open(str(tmp_path / "log"))
+    assert log.manifold_options == {"backend": "csr", "threshold": 0.05, "top_k": 3}
+    for t, expected in enumerate(states):
+        replayed = log.replay(t)
+        assert isinstance(replayed, SparseManifold)
+        assert replayed.nnz == expected.nnz
+        assert np.allclose(replayed.adj, expected.adj, atol=1e-12)
+    log.close()
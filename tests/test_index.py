@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from resonance_sandbox.index import VectorIndex, manifold_signature
+from resonance_sandbox.manifold import ContextualManifold
+
+def brute_force(data, queries, k, metric):
+    if metric == "cosine":
+        d = data / np.linalg.norm(data, axis=1, keepdims=True)
+        q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        return np.argsort(-(q @ d.T), axis=1)[:, :k]
+    dist = np.linalg.norm(queries[:, None, :] - data[None, :, :], axis=2)
+    return np.argsort(dist, axis=1)[:, :k]
+
+@pytest.mark.parametrize("metric", ["cosine", "l2"])
+def test_exact_search_matches_brute_force(metric):
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((500, 12))
+    queries = rng.standard_normal((7, 12))
+    index = VectorIndex(12, metric=metric, dtype=np.float64, block_rows=64)
+    index.add(np.arange(1000, 1500), data)
+    ids, scores = index.search(queries, k=5)
+    assert np.array_equal(ids - 1000, brute_force(data, queries, 5, metric))
+    if metric == "l2":
+        assert np.allclose(scores[:, 0], np.linalg.norm(data[ids[:, 0] - 1000] - queries, axis=1))
+
+def test_deletes_replacements_and_persistence(tmp_path):
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((100, 8))
+    index = VectorIndex(8, lsh_bits=6, lsh_tables=6, seed=0)
+    index.add(range(100), data)
+    ids, _ = index.search(data[3], k=1, exact=True)
+    assert ids[0, 0] == 3
+    index.remove([3, 4])
+    assert len(index) == 98 and 3 not in index
+    assert 3 not in index.search(data[3], k=10)[0]
+    index.add(5, data[3])
+    assert index.search(data[3], k=1, exact=True)[0][0, 0] == 5
+
+    index.save(str(tmp_path / "idx.npz"))
+    loaded = VectorIndex.load(str(tmp_path / "idx.npz"))
+    assert len(loaded) == 98
+    queries = data[10:20]
+    for exact in (True, False):
+        a, sa = index.search(queries, k=3, exact=exact)
+        b, sb = loaded.search(queries, k=3, exact=exact)
+        assert np.array_equal(a, b) and np.allclose(sa, sb)
+
+def test_lsh_finds_near_duplicates():
+    rng = np.random.default_rng(2)
+    data = rng.standard_normal((5000, 16))
+    index = VectorIndex(16, lsh_bits=12, lsh_tables=8, seed=0)
+    index.add(np.arange(5000), data)
+    noisy = data[:50] + 0.01 * rng.standard_normal((50, 16))
+    ids, _ = index.search(noisy, k=1)
+    assert np.mean(ids[:, 0] == np.arange(50)) > 0.95
+
+def test_manifold_signature_is_permutation_invariant():
+    rng = np.random.default_rng(3)
+    a = rng.standard_normal((6, 6))
+    m = ContextualManifold(6, a + a.T)
+    perm = rng.permutation(6)
+    p = ContextualManifold(6, (a + a.T)[perm][:, perm])
+    assert np.allclose(manifold_signature(m), manifold_signature(p))
+    assert manifold_signature(m, k=3).shape == (3,)
+
+def test_manifold_signature_is_continuous_across_symmetry():
+    rng = np.random.default_rng(4)
+    a = rng.standard_normal((6, 6))
+    sym = a + a.T
+    skew = np.zeros((6, 6))
+    skew[0, 1] = 1e-9
+    near = manifold_signature(ContextualManifold(6, sym + skew))
+    assert np.allclose(near, manifold_signature(ContextualManifold(6, sym)), atol=1e-6)
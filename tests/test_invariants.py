@@ -0,0 +1,41 @@
+import numpy as np
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.sparse_manifold import SparseManifold
+from resonance_sandbox.invariants import check_invariants, assert_invariants
+
+def test_invariants_hold_for_default_operator():
+    op = ResonanceOperator(6, 4, damping=1e-3, seed=0)
+    report = assert_invariants(op, n_fluxes=2000, batch_size=300, seed=1)
+    assert report["positivity"]["value"] > 0
+
+def test_asymmetric_manifold_is_reported():
+    op = ResonanceOperator(4, 3, seed=0)
+    adj = np.zeros((3, 3))
+    adj[0, 1] = 1.0
+    report = check_invariants(op, manifold=ContextualManifold(3, adj), n_fluxes=50, seed=2)
+    assert not report["passed"]
+    assert not report["symmetry"]["passed"]
+    assert report["null_flux"]["passed"]
+
+def test_broken_operate_is_caught():
+    class Lopsided(ResonanceOperator):
+        # Projects correctly but writes only the upper triangle
+        def operate(self, flux, manifold, log=None):
+            d = self.compute_delta(flux)
+            manifold.adj = manifold.adj + np.triu(np.outer(d, d)) * self.damping
+            return manifold
+
+    report = check_invariants(Lopsided(4, 3, seed=0), n_fluxes=50, seed=2)
+    assert not report["symmetry"]["passed"]
+    assert report["operated"] > 1
+
+def test_sparse_manifold_is_not_mutated():
+    op = ResonanceOperator(5, 6, damping=1e-2, seed=0)
+    m = SparseManifold(6, top_k=2)
+    op.operate(RelationalFlux(5, seed=3), m)
+    version = m.version
+    report = check_invariants(op, manifold=m, n_fluxes=100, seed=4)
+    assert m.version == version
+    assert report["null_flux"]["passed"] and report["positivity"]["passed"]
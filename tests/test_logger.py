@@ -0,0 +1,54 @@
+import json
+import logging
+from resonance_sandbox.logger import RateLimitFilter, setup_logger, shutdown_logging
+
+
+def _record(msg, *args, level=logging.INFO, name="resonance_sandbox.test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_per_key_with_suppressed_count():
+    now = [0.0]
+    limiter = RateLimitFilter(rate=1.0, burst=2, clock=lambda: now[0])
+    kept = [limiter.filter(_record("Gen %d", i)) for i in range(5)]
+    assert kept == [True, True, False, False, False]
+    # A different template has its own budget; warnings are never dropped
+    assert limiter.filter(_record("other %s", "x"))
+    assert limiter.filter(_record("Gen %d", 9, level=logging.WARNING))
+    assert limiter.suppressed() == {("resonance_sandbox.test", "Gen %d"): 3}
+    now[0] = 1.5
+    record = _record("Gen %d", 5)
+    assert limiter.filter(record) and record.suppressed == 3
+
+
+def test_sampling_keeps_one_in_n():
+    limiter = RateLimitFilter(sample=3)
+    kept = [limiter.filter(_record("step %d", i)) for i in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+
+
+def test_queued_logger_formats_on_listener(tmp_path):
+    log_file = tmp_path / "run.log"
+    log = setup_logger("resonance_test_queue", log_file=str(log_file), queued=True,
+                       rate=1000.0, burst=3, level=logging.CRITICAL)
+    values = [1.0]
+    for i in range(5):
+        log.debug("value %d %s", i, values)
+    values.append(2.0)  # mutable args are snapshotted when enqueued
+    shutdown_logging("resonance_test_queue")
+    entries = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [e["message"] for e in entries] == ["value 0 [1.0]", "value 1 [1.0]", "value 2 [1.0]"]
+    assert not logging.getLogger("resonance_test_queue").handlers
+
+
+def test_console_notes_suppressed_records():
+    now = [0.0]
+    limiter = RateLimitFilter(rate=1.0, burst=1, clock=lambda: now[0])
+    assert [limiter.filter(_record("gen %d", i)) for i in range(3)] == [True, False, False]
+    now[0] = 1.0
+    record = _record("gen %d", 3)
+    assert limiter.filter(record)
+    log = setup_logger("resonance_test_console", log_file=None)
+    console = log.logger.handlers[0].formatter.format(record)
+    assert "gen 3 (+2 suppressed)" in console
+    assert "suppressed" not in log.logger.handlers[0].formatter.format(_record("gen %d", 4))
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.energy import compute_energy
+
+def test_diagnostics_are_cached_until_deformation():
+    m = ContextualManifold(4)
+    op = ResonanceOperator(3, 4, seed=0)
+    op.operate(RelationalFlux(3, seed=1), m)
+    first = compute_energy(m, full=True)
+    misses = m.cache_info()["misses"]
+    assert compute_energy(m, full=True) == first
+    assert m.cache_info()["misses"] == misses
+    assert m.cache_info()["hits"] >= 4
+
+    op.operate(RelationalFlux(3, seed=2), m)
+    second = compute_energy(m, full=True)
+    assert second["frobenius_norm"] != first["frobenius_norm"]
+    assert np.isclose(second["frobenius_norm"], np.linalg.norm(np.array(m.adj)))
+
+def test_adj_is_read_only_and_assignment_invalidates():
+    m = ContextualManifold(2)
+    with pytest.raises(ValueError):
+        m.adj[0][0] = 1.0
+    assert m.energy() == 0.0
+    m.adj = [[1.0, 0.0], [0.0, 2.0]]
+    assert m.energy() == 5.0
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.memory import (
+    MemoryBudgetError,
+    MemoryTracker,
+    check_budget,
+    estimate_memory,
+    estimate_sweep_memory,
+)
+
+
+def test_tracker_records_stage_peaks():
+    tracker = MemoryTracker().start()
+    try:
+        for _ in range(2):
+            with tracker.stage("alloc"):
+                block = np.ones(2**20)
+                del block
+        with tracker.stage("idle"):
+            pass
+    finally:
+        tracker.stop()
+    alloc, idle = tracker.report()
+    assert alloc["stage"] == "alloc" and alloc["calls"] == 2
+    assert alloc["traced_peak"] >= 8 * 2**20
+    assert abs(alloc["traced_net"]) < 2**20
+    assert idle["traced_peak"] < 2**20
+
+
+def test_deformation_estimate_matches_traced_peak():
+    n, f = 1000, 16
+    cfg = {"flux_dim": f, "manifold_size": n}
+    op = ResonanceOperator(f, n, damping=0.01, seed=0)
+    manifold = ContextualManifold(n)
+    flux = RelationalFlux(f, seed=1)
+    tracker = MemoryTracker().start()
+    try:
+        with tracker.stage("operate"):
+            op.operate(flux, manifold)
+    finally:
+        tracker.stop()
+    measured = tracker.report()[0]["traced_peak"]
+    predicted = estimate_memory(cfg)["components"]["deformation"]
+    assert 0.5 <= measured / predicted <= 2.0
+
+
+def test_asset_estimate_covers_traced_render(tmp_path):
+    """The assets component bounds operate plus the networkx graph; with
+    matplotlib available it tracks a full traced render_asset."""
+    nx = pytest.importorskip("networkx")
+    n, f = 100, 16
+    predicted = estimate_memory({"flux_dim": f, "manifold_size": n},
+                                assets=True)["components"]["assets"]
+    op = ResonanceOperator(f, n, damping=0.01, seed=0)
+    tracker = MemoryTracker().start()
+    try:
+        with tracker.stage("graph"):
+            manifold = ContextualManifold(n)
+            op.operate(RelationalFlux(f, seed=1), manifold)
+            graph = nx.from_numpy_array(manifold.adj)
+            del graph
+    finally:
+        tracker.stop()
+    assert tracker.report()[0]["traced_peak"] <= predicted
+
+    pytest.importorskip("matplotlib")
+    import logging
+    from resonance_sandbox.scripts.generate_assets import render_asset
+    tracker = MemoryTracker().start()
+    try:
+        with tracker.stage("render asset"):
+            render_asset(RelationalFlux(f, seed=1), op, ContextualManifold(n), 0,
+                         str(tmp_path / "a.csv"), str(tmp_path / "a.png"),
+                         logging.getLogger(__name__))
+    finally:
+        tracker.stop()
+    measured = tracker.report()[0]["traced_peak"]
+    assert 0.5 <= measured / predicted <= 2.0
+
+
+def test_estimate_scales_with_workers_and_sweep_points():
+    cfg = {"flux_dim": 16, "manifold_size": 64}
+    single = estimate_memory(cfg)
+    assert estimate_memory(cfg, workers=4)["peak"] == 4 * single["peak"]
+    spec = {"task": "stability", "workers": 3,
+            "grid": {"flux_dim": [16, 32], "manifold_size": [64, 512]}}
+    sweep = estimate_sweep_memory(cfg, spec)
+    assert sweep["workers"] == 3
+    assert (sweep["flux_dim"], sweep["manifold_size"]) == (32, 512)
+    largest = estimate_memory({"flux_dim": 32, "manifold_size": 512})
+    assert sweep["peak"] == 3 * largest["peak"]
+    assert estimate_sweep_memory(cfg, spec, workers=1)["peak"] == largest["peak"]
+
+
+def test_budget_warns_or_refuses(caplog):
+    estimate = estimate_memory({"flux_dim": 64, "manifold_size": 4096})
+    assert check_budget(estimate, None)
+    assert check_budget(estimate, estimate["peak"] / 2**20 + 1)
+    with caplog.at_level("WARNING", logger="resonance_sandbox.memory"):
+        assert not check_budget(estimate, 1, "warn")
+    assert "exceeds the budget" in caplog.text
+    with pytest.raises(MemoryBudgetError):
+        check_budget(estimate, 1, "refuse")
@@ -0,0 +1,43 @@
+import json
+import pytest
+from resonance_sandbox.plan import RunPlan, run_plan
+from resonance_sandbox.operator import ResonanceOperator
+
+CFG = {"flux_dim": 6, "manifold_size": 4, "damping": 0.01}
+
+def test_steps_share_named_objects_and_repeat(tmp_path):
+    steps = [
+        {"task": "meta_learn", "iterations": 3, "pop_size": 4},
+        {"task": "save_operator", "path": str(tmp_path / "op.json")},
+        {"task": "stability", "repeat": 2},
+        {"task": "flux", "name": "f", "text": "hello"},
+        {"task": "operate", "flux": "f", "manifold": "m"},
+        {"task": "energy_monitor", "manifold": "m", "steps": 5},
+    ]
+    plan = RunPlan(CFG, seed=3)
+    initial = plan.objects["op"]
+    summary = plan.run(steps)
+
+    learned = plan.objects["op"]
+    assert learned is not initial
+    saved = ResonanceOperator.from_json((tmp_path / "op.json").read_text())
+    assert (saved.W == learned.W).all()
+    assert [r["repeat"] for r in summary["steps"]] == [1, 1, 2, 1, 1, 1]
+    assert len(summary["steps"][2]["results"]) == 2
+    # energy_monitor kept deforming the manifold built by the operate step
+    assert summary["steps"][5]["results"][0]["stats"]["frobenius_norm"]["min"] > 0
+    assert plan.objects["m"].version == 6
+    json.dumps(summary)
+
+def test_seeded_plans_are_reproducible_and_validated(tmp_path):
+    plan = {"seed": 1, "summary": str(tmp_path / "s.json"),
+            "steps": [{"task": "operator", "kind": "srht"},
+                      {"task": "meta_learn", "iterations": 2, "pop_size": 3},
+                      {"task": "stability"}]}
+    first = run_plan(plan, CFG)
+    second = run_plan(plan, CFG)
+    assert first["steps"][1]["results"] == second["steps"][1]["results"]
+    assert json.loads((tmp_path / "s.json").read_text())["steps"][2]["results"] \
+        == second["steps"][2]["results"]
+    with pytest.raises(ValueError):
+        RunPlan(CFG).run([{"task": "nope"}])
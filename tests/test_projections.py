@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.projections import make_operator
+
+@pytest.mark.parametrize("kind", ["sparse", "hashing", "srht"])
+def test_structured_matches_dense_equivalent(kind):
+    op = make_operator(kind, 37, 5, damping=0.5, seed=3)
+    flux = RelationalFlux(37, seed=1)
+    W = op.to_dense()
+    assert np.allclose(op.compute_delta(flux), W @ flux.vector + 1e-6)
+
+    m = ContextualManifold(5)
+    op.operate(flux, m)
+    assert np.abs(np.array(m.adj)).max() > 0
+
+    restored = ResonanceOperator.from_json(op.to_json())
+    assert type(restored) is type(op)
+    assert np.array_equal(restored.to_dense(), W)
+
+    dense = op.as_dense(seed=0)
+    assert dense.kind == "dense" and dense.damping == op.damping
+    assert np.allclose(dense.compute_delta(flux), op.compute_delta(flux))
@@ -0,0 +1,72 @@
+import numpy as np
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.projections import make_operator
+from resonance_sandbox.sensitivity import analyze_sensitivity, analytic_stability
+
+
+def _setup():
+    op = ResonanceOperator(10, 6, damping=0.3, seed=0)
+    flux = RelationalFlux(10, seed=1)
+    a = np.random.default_rng(2).standard_normal((6, 6))
+    return op, flux, ContextualManifold(6, a + a.T)
+
+
+def _energy_after(op, vec, adj):
+    m = ContextualManifold(adj.shape[0], adj)
+    op.operate(RelationalFlux(op.flux_dim, vector=vec), m)
+    return m.energy()
+
+
+def test_energy_and_gradient_match_operate():
+    op, flux, m = _setup()
+    report = analyze_sensitivity(op, flux, m)
+    adj = np.array(m.adj)
+    assert np.isclose(report["E_after"], _energy_after(op, flux.vector, adj))
+    eps = 1e-6
+    fd = np.array([
+        (_energy_after(op, flux.vector + eps * e, adj) - _energy_after(op, flux.vector - eps * e, adj)) / (2 * eps)
+        for e in np.eye(10)
+    ])
+    np.testing.assert_allclose(report["energy_gradient"], fd, rtol=1e-5, atol=1e-6)
+
+
+def test_worst_direction_attains_lipschitz_bound():
+    op, flux, _ = _setup()
+    report = analyze_sensitivity(op, flux)
+
+    def jvp(h, eps=1e-6):
+        plus = op.compute_delta(RelationalFlux(10, vector=flux.vector + eps * h))
+        minus = op.compute_delta(RelationalFlux(10, vector=flux.vector - eps * h))
+        return op.damping * (np.outer(plus, plus) - np.outer(minus, minus)) / (2 * eps)
+
+    assert np.isclose(np.linalg.norm(jvp(report["worst_direction"])), report["lipschitz"], rtol=1e-6)
+    for j, e in enumerate(np.eye(10)):
+        assert np.isclose(np.linalg.norm(jvp(e)), report["sensitivities"][j], rtol=1e-6)
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        h = rng.standard_normal(10)
+        assert np.linalg.norm(jvp(h / np.linalg.norm(h))) <= report["lipschitz"] * (1 + 1e-6)
+
+
+def test_expected_energy_matches_monte_carlo():
+    op, flux, m = _setup()
+    scale = 0.5
+    report = analyze_sensitivity(op, flux, m, scales=[scale])
+    rng = np.random.default_rng(4)
+    adj = np.array(m.adj)
+    samples = [_energy_after(op, flux.vector + scale * rng.standard_normal(10), adj) for _ in range(5000)]
+    expected = report["scales"][scale]["E_expected"]
+    assert abs(np.mean(samples) - expected) < 4 * np.std(samples) / np.sqrt(len(samples))
+    assert report["scales"][scale]["E_bound"] >= report["E_after"]
+
+
+def test_structured_operator_and_analytic_stability():
+    op = make_operator("srht", 16, 8, damping=0.5, seed=0)
+    report = analyze_sensitivity(op, RelationalFlux(16, seed=0))
+    assert report["lipschitz"] > 0 and report["sensitivities"].shape == (16,)
+    results = analytic_stability(16, 8, seed=0)
+    assert set(results) == {1e-4, 1e-3, 1e-2}
+    for entry in results.values():
+        assert entry["stable"] and entry["E_bound"] >= entry["E_after"] > 0
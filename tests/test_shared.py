@@ -0,0 +1,56 @@
+import multiprocessing
+import numpy as np
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.shared import (
+    SharedManifold, share_operator, release_operator,
+)
+
+def _child_energy(manifold, op_handle, out):
+    op = op_handle.attach()
+    out.put((manifold.energy(), float(op.W.sum()), manifold.sequence))
+    manifold.close()
+
+def _child_reader(handle, rounds, out):
+    m = handle.attach()
+    torn = 0
+    for _ in range(rounds):
+        snap = np.array(m.snapshot().adj)
+        if not np.all(snap == snap[0, 0]):
+            torn += 1
+    m.close()
+    out.put(torn)
+
+def test_children_attach_without_copy():
+    op = ResonanceOperator(5, 4, damping=0.1, seed=0)
+    m = SharedManifold(4)
+    op_handle = share_operator(op)
+    try:
+        op.operate(RelationalFlux(5, seed=1), m)
+        out = multiprocessing.Queue()
+        p = multiprocessing.Process(target=_child_energy, args=(m, op_handle, out))
+        p.start()
+        energy, w_sum, seq = out.get(timeout=20)
+        p.join()
+        assert np.isclose(energy, m.energy())
+        assert np.isclose(w_sum, op.W.sum())
+        assert seq == m.sequence == 2
+    finally:
+        release_operator(op_handle)
+        m.close()
+        m.unlink()
+
+def test_readers_never_see_torn_writes():
+    n = 64
+    m = SharedManifold(n)
+    out = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_child_reader, args=(m.handle, 200, out))
+    p.start()
+    value = 0.0
+    while p.is_alive() and out.empty():
+        value += 1.0
+        m.adj = np.full((n, n), value)
+    assert out.get(timeout=20) == 0
+    p.join()
+    m.close()
+    m.unlink()
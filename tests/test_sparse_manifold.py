@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.sparse_manifold import SparseManifold, manifold_from_config
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.flux import RelationalFlux
+from resonance_sandbox.energy import compute_energy
+
+
+def _pruned(adj, threshold, top_k):
+    """Reference pruning on a dense matrix."""
+    keep = (adj != 0) & (np.abs(adj) >= threshold)
+    if top_k is not None:
+        scores = np.where(keep, np.abs(adj), -1.0)
+        ranks = np.argsort(np.argsort(-scores, axis=1, kind="stable"), axis=1)
+        in_top = keep & (ranks < top_k)
+        keep &= in_top | in_top.T
+    return np.where(keep, adj, 0.0)
+
+
+@pytest.mark.parametrize("threshold,top_k", [(0.0, None), (0.5, None), (0.0, 7), (0.3, 5)])
+def test_updates_match_dense_then_prune(threshold, top_k):
+    rng = np.random.default_rng(0)
+    n = 120
+    sparse = SparseManifold(n, threshold=threshold, top_k=top_k)
+    ref = np.zeros((n, n))
+    for _ in range(5):
+        d = rng.standard_normal(n) * (rng.random(n) < 0.3)
+        sparse.apply_low_rank(d[None, :], 0.7)
+        ref = _pruned(ref + 0.7 * np.outer(d, d), threshold, top_k)
+        np.testing.assert_allclose(sparse.adj, ref)
+    V = rng.standard_normal((3, n))
+    sparse.apply_low_rank(V, [0.1, 0.2, 0.3])
+    ref = _pruned(ref + (V.T * [0.1, 0.2, 0.3]) @ V, threshold, top_k)
+    np.testing.assert_allclose(sparse.adj, ref)
+    M = np.outer(V[0], V[1])
+    sparse.apply_deformation(M)
+    ref = _pruned(ref + (M + M.T) / 2.0, threshold, top_k)
+    np.testing.assert_allclose(sparse.adj, ref)
+    assert sparse.is_symmetric()
+
+
+def test_diagnostics_match_dense():
+    op = ResonanceOperator(6, 40, damping=0.5, seed=0)
+    sparse, dense = SparseManifold(40, threshold=0.05), ContextualManifold(40)
+    for seed in range(4):
+        flux = RelationalFlux(6, seed=seed)
+        op.operate(flux, sparse)
+        op.operate(flux, dense)
+        dense.adj = _pruned(np.array(dense.adj), 0.05, None)
+    assert 0 < sparse.nnz < 40 * 40
+    expected = compute_energy(dense, full=True)
+    for key, value in compute_energy(sparse, full=True).items():
+        assert np.isclose(value, expected[key]), key
+    np.testing.assert_array_equal(sparse.degrees(), dense.degrees())
+    x = np.arange(40.0)
+    np.testing.assert_allclose(sparse.matvec(x), np.array(dense.adj) @ x)
+
+
+def test_large_spectral_radius_uses_power_iteration():
+    rng = np.random.default_rng(1)
+    d = rng.standard_normal(1500)
+    sparse = SparseManifold(1500, threshold=1.0)
+    sparse.apply_low_rank(d[None, :], 1.0)
+    dense_radius = ContextualManifold(1500, sparse.adj).spectral_radius()
+    assert np.isclose(sparse.spectral_radius(), dense_radius, rtol=1e-6)
+
+
+def test_json_round_trip_and_config():
+    sparse = manifold_from_config({"manifold_size": 5, "manifold": {"backend": "sparse", "top_k": 2}})
+    assert isinstance(sparse, SparseManifold) and sparse.top_k == 2
+    sparse.adj = np.arange(25.0).reshape(5, 5)
+    restored = ContextualManifold.from_json(sparse.to_json())
+    assert isinstance(restored, SparseManifold) and restored.top_k == 2
+    np.testing.assert_array_equal(restored.adj, sparse.adj)
+    # Dense JSON loads into the sparse backend and vice versa
+    dense = ContextualManifold(3, np.eye(3))
+    assert SparseManifold.from_json(dense.to_json()).nnz == 3
+    assert np.array_equal(sparse.to_dense().adj, sparse.adj)
+    assert type(manifold_from_config({})) is ContextualManifold
+    # Sparse-only options are an error for the dense backend, unless unset
+    with pytest.raises(ValueError, match="top_k"):
+        manifold_from_config({"manifold": {"backend": "dense", "top_k": 32}})
+    assert type(manifold_from_config({"manifold": {"backend": "dense", "threshold": None}})) \
+        is ContextualManifold
@@ -0,0 +1,24 @@
+import numpy as np
+from resonance_sandbox.streaming import MetricsAggregator, RunningStats
+
+def test_running_stats_match_numpy():
+    data = np.random.default_rng(0).standard_normal(20000)
+    stats = RunningStats(quantiles=(0.5, 0.9))
+    for x in data:
+        stats.add(x)
+    snap = stats.snapshot()
+    assert np.isclose(snap["mean"], data.mean())
+    assert np.isclose(snap["std"], data.std(ddof=1))
+    assert snap["min"] == data.min() and snap["max"] == data.max()
+    assert abs(snap["p50"] - np.quantile(data, 0.5)) < 0.05
+    assert abs(snap["p90"] - np.quantile(data, 0.9)) < 0.05
+
+def test_aggregator_emits_snapshots():
+    seen = []
+    agg = MetricsAggregator(snapshot_every=2, on_snapshot=lambda step, snap: seen.append(step))
+    for e in [1.0, 2.0, 3.0, 4.0, 5.0]:
+        agg.update({"frobenius_norm": e, "node_count": 3, "note": "x"})
+    assert seen == [2, 4]
+    snap = agg.snapshot()
+    assert set(snap) == {"frobenius_norm", "node_count"}
+    assert snap["frobenius_norm"]["ewm_rate"] == 1.0
@@ -0,0 +1,46 @@
+import numpy as np
+from resonance_sandbox.sweep import ResultsTable, expand_points, run_sweep
+
+SPEC = {
+    "task": "energy",
+    "seed": 1,
+    "grid": {"flux_dim": [3, 5], "manifold_size": [2, 4], "damping": [0.1]},
+    "options": {"steps": 2},
+}
+
+def test_sweep_resumes_and_is_reproducible(tmp_path):
+    path = str(tmp_path / "results.rtab")
+    first = run_sweep(SPEC, path, workers=2, chunksize=1)
+    assert first["completed"] == 4
+
+    # Simulate a crash mid-append: a torn batch must be ignored and dropped
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00")
+    again = run_sweep(SPEC, path, workers=1)
+    assert again["skipped"] == 4 and again["completed"] == 0
+
+    table = ResultsTable(path).read()
+    assert len(table["point_key"]) == 4
+    serial = str(tmp_path / "serial.rtab")
+    run_sweep(SPEC, serial, workers=1)
+    other = ResultsTable(serial).read()
+    order, other_order = np.argsort(table["point_key"]), np.argsort(other["point_key"])
+    assert np.array_equal(table["frobenius_norm"][order], other["frobenius_norm"][other_order])
+
+def test_random_spec_is_seeded():
+    spec = {"seed": 4, "random": {"samples": 5, "params": {
+        "flux_dim": {"low": 4, "high": 64, "log": True, "int": True},
+        "kind": ["dense", "hashing"]}}}
+    assert expand_points(spec) == expand_points(spec)
+    assert all(4 <= p["flux_dim"] <= 64 for p in expand_points(spec))
+
+def test_changed_options_or_task_recompute(tmp_path):
+    path = str(tmp_path / "results.rtab")
+    run_sweep(SPEC, path, workers=1)
+    rerun = run_sweep(dict(SPEC, options={"steps": 3}), path, workers=1)
+    assert rerun["skipped"] == 0 and rerun["completed"] == 4
+
+    spec = dict(SPEC, task="meta_learn", grid={"flux_dim": [4], "manifold_size": [3],
+                                                "kind": ["dense", "sparse", "hashing", "srht"]},
+                options={"iterations": 2, "pop_size": 2})
+    assert run_sweep(spec, str(tmp_path / "meta.rtab"), workers=1)["completed"] == 4
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from resonance_sandbox import tiled
+from resonance_sandbox.tiled import TiledEngine
+from resonance_sandbox.manifold import ContextualManifold
+from resonance_sandbox.operator import ResonanceOperator
+from resonance_sandbox.flux import RelationalFlux
+
+@pytest.fixture
+def small_tiles():
+    previous = tiled.get_engine()
+    engine = tiled.configure(threads=3, tile=7, min_size=0)
+    yield engine
+    engine.close()
+    tiled._engine = previous
+
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_kernels_match_numpy(symmetric):
+    rng = np.random.default_rng(0)
+    engine = TiledEngine(threads=4, tile=5)
+    adj = rng.standard_normal((23, 23))
+    if symmetric:
+        adj = adj + adj.T
+    mat = rng.standard_normal((23, 23))
+    V, c = rng.standard_normal((3, 23)), rng.standard_normal(3)
+
+    out = engine.deform(adj, mat, symmetric=symmetric)
+    assert np.allclose(out, adj + (mat + mat.T) / 2)
+    update = (V.T * c) @ V
+    out = engine.low_rank(adj, V, c, symmetric=symmetric)
+    assert np.allclose(out, adj + (update + update.T) / 2)
+    if symmetric:
+        assert np.array_equal(out, out.T)
+    assert np.isclose(engine.energy(adj, symmetric=symmetric), np.sum(adj * adj))
+    engine.close()
+
+def test_manifold_uses_engine_above_min_size(small_tiles):
+    op = ResonanceOperator(6, 30, seed=0)
+    tiled_m = ContextualManifold(30)
+    plain_adj = np.zeros((30, 30))
+    for s in range(3):
+        flux = RelationalFlux(6, seed=s)
+        op.operate(flux, tiled_m)
+        delta = op.compute_delta(flux)
+        plain_adj += np.outer(delta, delta) * op.damping
+    assert np.allclose(tiled_m.adj, plain_adj)
+    assert np.array_equal(tiled_m.adj, tiled_m.adj.T)
+    assert np.isclose(tiled_m.energy(), np.sum(plain_adj ** 2))
+    assert np.isclose(tiled_m.frobenius_norm(), np.linalg.norm(plain_adj))